@@ -1,28 +1,92 @@
-from dataclasses import dataclass, field
+import asyncio
+import math
+import os
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field, replace
 from typing import Any
 
 import numpy as np
-from tlz.itertoolz import cons, first, get, groupby, partition_all, second
+from fsspec.core import split_protocol
+from fsspec.implementations.dirfs import DirFileSystem
+from fsspec.implementations.local import LocalFileSystem
+from tlz.dicttoolz import get_in, valfilter
+from tlz.itertoolz import concat, first, get, partition_all, second
+from tlz.recipes import partitionby
 
+from ceos_alos2.blocks import block_url
+from ceos_alos2.columns import decode_columns
+from ceos_alos2.handles import handle_pool
 from ceos_alos2.utils import parse_bytes
 
 raw_dtypes = {
-    "C*8": np.dtype([("real", ">f4"), ("imag", ">f4")]),
+    "C*8": np.dtype(">c8"),
     "IU2": np.dtype(">u2"),
 }
 
 
-def parse_data(content, type_code):
+# quantities derived from complex image data
+derived_quantities = {
+    "intensity": lambda values: np.square(values.real) + np.square(values.imag),
+    "amplitude": np.abs,
+    "phase": np.angle,
+}
+derived_dtype = np.dtype("float32")
+
+
+def derive(values, quantity, scale=None, decibel=False):
+    if quantity is None:
+        return values
+
+    if values.dtype.kind in "ui":
+        # avoid overflows when squaring
+        values = values.astype(derived_dtype)
+
+    derived = derived_quantities[quantity](values)
+    if scale is not None:
+        derived *= scale
+    if decibel:
+        with np.errstate(divide="ignore"):
+            derived = 10 * np.log10(derived)
+
+    return derived
+
+
+def parse_data(content, type_code, out=None, quantity=None, scale=None, decibel=False):
     dtype = raw_dtypes.get(type_code)
     if dtype is None:
         raise ValueError(f"unknown type code: {type_code}")
 
     raw = np.frombuffer(content, dtype)
-    if type_code == "C*8":
-        return raw["real"] + 1j * raw["imag"]
+    if quantity is not None:
+        # compute the derived quantity directly from the big-endian values
+        raw = derive(raw, quantity, scale=scale, decibel=decibel)
+
+    if out is not None:
+        # decode straight into the destination, converting the byte order on the way
+        out[...] = raw
+        return out
+    elif type_code == "C*8" and quantity is None:
+        # a big-endian complex64 has the same layout as two big-endian float32, so
+        # converting to native byte order is a single byteswapping copy
+        return raw.astype(dtype.newbyteorder("="))
     return raw
 
 
+# gaps between selected ranges of up to this many bytes are read instead of skipped
+default_max_gap = 64 * 2**10
+# the fields of the record prefixes are separated by the payloads, which are not read
+default_field_max_gap = 4 * 2**10
+
+# fraction of columns up to which only the selected parts of the records are requested
+column_subset_threshold = 0.5
+
+# decoded buffers of at least this many bytes are split across threads
+default_decode_threshold = 16 * 2**20
+decode_workers = min(os.cpu_count() or 1, 8)
+
+
 def normalize_chunksize(chunksize, dim_size):
     if chunksize in (None, -1) or chunksize > dim_size:
         return dim_size
@@ -57,9 +121,214 @@ def compute_chunk_offsets(byte_ranges, chunks):
     return to_offset_size(ranges)
 
 
+def determine_records_per_chunk(records_per_chunk, sizes, n_records):
+    if records_per_chunk is None:
+        return 1024
+    elif isinstance(records_per_chunk, str):
+        if records_per_chunk == "auto":
+            size = 100 * 2**20
+        else:
+            size = parse_bytes(records_per_chunk)
+
+        return determine_nearest_chunksize(sizes, size)
+    else:
+        return normalize_chunksize(records_per_chunk, n_records)
+
+
+def determine_columns_per_chunk(columns_per_chunk, dtype, records_per_chunk, n_columns):
+    if isinstance(columns_per_chunk, str):
+        # bytes per chunk of decoded data
+        size = parse_bytes(columns_per_chunk)
+        columns_per_chunk = max(size // (np.dtype(dtype).itemsize * records_per_chunk), 1)
+
+    return normalize_chunksize(columns_per_chunk, n_columns)
+
+
+def compute_stride(byte_ranges):
+    """determine the distance between equally sized, regularly spaced byte ranges
+
+    Returns ``None`` if the ranges are not regularly spaced.
+    """
+    if not byte_ranges:
+        return None
+
+    starts, stops = np.array(byte_ranges).T
+    sizes = stops - starts
+    steps = np.diff(starts)
+    if np.any(sizes != sizes[0]) or np.any(steps != steps[:1]):
+        return None
+
+    stride = int(steps[0]) if steps.size else int(sizes[0])
+
+    return stride if stride >= sizes[0] else None
+
+
+def is_async(fs):
+    if isinstance(fs, DirFileSystem):
+        fs = fs.fs
+
+    return getattr(fs, "async_impl", False)
+
+
+async def run_async(fs, coroutine):
+    if isinstance(fs, DirFileSystem):
+        fs = fs.fs
+
+    if fs.asynchronous:
+        return await coroutine
+
+    # the filesystem's coroutines have to run on its own event loop
+    return await asyncio.wrap_future(asyncio.run_coroutine_threadsafe(coroutine, fs.loop))
+
+
+def local_path(fs, url):
+    if not isinstance(fs, DirFileSystem) or not isinstance(fs.fs, LocalFileSystem):
+        return None
+
+    return fs.fs._strip_protocol(fs.sep.join([fs.path, url]))
+
+
+def is_scalar(indexer):
+    return isinstance(indexer, (int, np.integer))
+
+
+def compute_selected_rows(n_rows, indexer):
+    rows = range(n_rows)
+    if isinstance(indexer, slice):
+        return list(rows[indexer])
+    elif is_scalar(indexer):
+        return [rows[indexer]]
+
+    return [rows[index] for index in indexer]
+
+
+def compute_column_window(n_columns, indexer):
+    """determine the contiguous window of columns covered by the indexer
+
+    Returns the window as a slice and the indexer relative to the window start.
+    """
+    columns = compute_selected_rows(n_columns, indexer)
+    if not columns:
+        return slice(0, n_columns), indexer
+
+    start = min(columns)
+    stop = max(columns) + 1
+    window = slice(start, stop)
+
+    if is_scalar(indexer):
+        return window, 0
+    elif isinstance(indexer, slice):
+        selected = range(n_columns)[indexer]
+        relative_stop = selected.stop - start
+
+        return window, slice(
+            selected.start - start, relative_stop if relative_stop >= 0 else None, selected.step
+        )
+
+    return window, [column - start for column in columns]
+
+
+def crop_range(byte_range, window, itemsize):
+    start, _ = byte_range
+
+    return start + window.start * itemsize, start + window.stop * itemsize
+
+
+def crop_to_spans(selected_ranges, spans, window, itemsize):
+    """crop the selected ranges to the valid span of each row within the window
+
+    Returns the cropped ranges and the column offset of each range in the window.
+    """
+    cropped = []
+    offsets = []
+    for row, range_ in selected_ranges:
+        first, last = spans[row]
+        start = min(max(first, window.start), window.stop)
+        stop = min(max(last, start), window.stop)
+
+        cropped.append((row, crop_range(range_, slice(start, stop), itemsize)))
+        offsets.append(start - window.start)
+
+    return cropped, offsets
+
+
+def only_fill(ranges):
+    """whether the cropped ranges of a chunk contain nothing but fill pixels"""
+    return all(start == stop for start, stop in ranges)
+
+
+def coalesce_ranges(ranges, max_gap):
+    """merge byte ranges into as few requests as possible
+
+    Ranges separated by at most ``max_gap`` bytes are merged into the same
+    request. Returns the requests and, for each range, the index of the request
+    containing it.
+    """
+    requests = []
+    membership = [None] * len(ranges)
+    for index in sorted(range(len(ranges)), key=lambda index: ranges[index]):
+        start, stop = ranges[index]
+        if requests and start - requests[-1][1] <= max_gap:
+            requests[-1] = (requests[-1][0], max(requests[-1][1], stop))
+        else:
+            requests.append((start, stop))
+
+        membership[index] = len(requests) - 1
+
+    return requests, membership
+
+
+def split_requests(contents, ranges, requests, membership):
+    return [
+        memoryview(contents[request])[start - requests[request][0] : stop - requests[request][0]]
+        for (start, stop), request in zip(ranges, membership)
+    ]
+
+
+class SharedExecutor:
+    """thread pool shared by all callers, created on first use
+
+    The pool is recreated in forked processes, since its threads belong to the parent.
+    """
+
+    def __init__(self, max_workers):
+        self.max_workers = max_workers
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pid = None
+
+    def get(self):
+        with self._lock:
+            if self._executor is None or self._pid != os.getpid():
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="ceos-alos2-decode"
+                )
+                self._pid = os.getpid()
+
+            return self._executor
+
+
+# bounds the number of decoding threads, no matter how many reads run concurrently
+decode_executor = SharedExecutor(max_workers=decode_workers)
+
+
+def map_row_batches(func, n_rows, max_workers):
+    """apply ``func`` to contiguous batches of rows, one batch per task
+
+    ``func`` receives a slice of the rows. The batches run on the shared
+    decoding thread pool.
+    """
+    batchsize = -(-n_rows // max_workers)
+    batches = [slice(start, start + batchsize) for start in range(0, n_rows, batchsize)]
+
+    # consume the iterator to raise errors
+    list(decode_executor.get().map(func, batches))
+
+
 def compute_selected_ranges(byte_ranges, indexer):
     n_rows = len(byte_ranges)
-    if isinstance(indexer, int):
+    if is_scalar(indexer):
         indexer = [indexer]
 
     if isinstance(indexer, slice):
@@ -71,12 +340,13 @@ def compute_selected_ranges(byte_ranges, indexer):
 
 
 def groupby_chunks(byte_ranges, chunksize):
-    grouped = groupby(lambda it: it[0] // chunksize, byte_ranges)
-    return {key: [value for _, value in ranges] for key, ranges in grouped.items()}
+    # only merge consecutive rows to preserve the order of arbitrary indexers
+    grouped = partitionby(lambda it: it[0] // chunksize, byte_ranges)
+    return [(ranges[0][0] // chunksize, [value for _, value in ranges]) for ranges in grouped]
 
 
 def merge_chunk_info(selected, chunk_offsets):
-    return [(chunk_offsets[index], ranges) for index, ranges in selected.items()]
+    return [(index, chunk_offsets[index], ranges) for index, ranges in selected]
 
 
 def relocate_ranges(chunk_info, ranges):
@@ -95,6 +365,188 @@ def read_chunk(f, offset, size):
     return f.read(size)
 
 
+def refers_to(image_url, url):
+    """whether ``url`` refers to the image file at ``image_url``
+
+    ``url`` may be the url of the image file, the url of a directory containing it (e.g.
+    the product), or the path of the image file relative to the product (e.g. its
+    filename). Protocols are ignored.
+    """
+
+    def normalize(url):
+        _, path = split_protocol(url)
+        return path.strip("/")
+
+    image_path = normalize(image_url)
+    path = normalize(url)
+
+    return (
+        image_path == path or image_path.startswith(f"{path}/") or image_path.endswith(f"/{path}")
+    )
+
+
+class ChunkCache:
+    """in-memory LRU cache of decoded chunks with a byte budget
+
+    Chunks are keyed by the full url of the image file (including the protocol) and
+    the chunk number. The cache can be shared by multiple arrays, but its contents
+    are not pickled.
+    """
+
+    def __init__(self, max_bytes):
+        self.max_bytes = parse_bytes(max_bytes)
+
+        self.hits = 0
+        self.misses = 0
+
+        self._lock = threading.Lock()
+        self._chunks = OrderedDict()
+        self._nbytes = 0
+
+    @classmethod
+    def from_option(cls, option):
+        if option is None or isinstance(option, cls):
+            return option
+
+        return cls(option)
+
+    def __getstate__(self):
+        return {"max_bytes": self.max_bytes}
+
+    def __setstate__(self, state):
+        self.__init__(state["max_bytes"])
+
+    def __len__(self):
+        return len(self._chunks)
+
+    @property
+    def nbytes(self):
+        return self._nbytes
+
+    def get(self, key):
+        with self._lock:
+            chunk = self._chunks.get(key)
+            if chunk is None:
+                self.misses += 1
+                return None
+
+            self.hits += 1
+            self._chunks.move_to_end(key)
+
+            return chunk
+
+    def put(self, key, chunk):
+        if chunk.nbytes > self.max_bytes:
+            return
+
+        with self._lock:
+            previous = self._chunks.pop(key, None)
+            if previous is not None:
+                self._nbytes -= previous.nbytes
+
+            self._chunks[key] = chunk
+            self._nbytes += chunk.nbytes
+
+            while self._nbytes > self.max_bytes:
+                _, evicted = self._chunks.popitem(last=False)
+                self._nbytes -= evicted.nbytes
+
+    def invalidate(self, url=None):
+        """remove the chunks of ``url`` or, if not given, all chunks
+
+        ``url`` may be the url of an image file or of the product containing it, or
+        the path of an image file as given to ``open_image``, e.g. its filename.
+        """
+        with self._lock:
+            keys = [key for key in self._chunks if url is None or refers_to(key[0], url)]
+            for key in keys:
+                self._nbytes -= self._chunks.pop(key).nbytes
+
+
+class Readahead:
+    """prefetch the chunks following sequential reads in background threads
+
+    Once a read starts at or right after the last chunk of the previous read,
+    the next ``n_chunks`` chunks are requested. At most ``n_chunks`` prefetched
+    chunks are kept. Reads are tracked per ``source``, such that an instance can
+    be shared by multiple arrays.
+    """
+
+    def __init__(self, n_chunks=2):
+        self.n_chunks = n_chunks
+
+        self._lock = threading.Lock()
+        self._executor = None
+        self._pending = OrderedDict()
+        self._last = {}
+
+    @classmethod
+    def from_option(cls, option):
+        if option in (None, False, 0):
+            return None
+        elif isinstance(option, cls):
+            return option
+        elif option is True:
+            return cls()
+
+        return cls(option)
+
+    def __getstate__(self):
+        return {"n_chunks": self.n_chunks}
+
+    def __setstate__(self, state):
+        self.__init__(state["n_chunks"])
+
+    def __len__(self):
+        return len(self._pending)
+
+    def take(self, index, source=None):
+        with self._lock:
+            future = self._pending.pop((source, index), None)
+
+        if future is None:
+            return None
+
+        try:
+            return future.result()
+        except Exception:
+            # fall back to reading the chunk directly
+            return None
+
+    def observe(self, indices, fetch, n_chunks_total, source=None):
+        """record the chunks of a read and prefetch the following chunks"""
+        if not indices:
+            return
+
+        with self._lock:
+            previous = self._last.get(source)
+            sequential = (
+                previous is not None
+                and indices[0] in (previous, previous + 1)
+                and indices == sorted(indices)
+            )
+            last = self._last[source] = indices[-1]
+            if not sequential:
+                return
+
+            # chunks that were skipped are not going to be read anymore
+            skipped = [key for key in self._pending if key[0] == source and key[1] <= last]
+            for key in skipped:
+                self._pending.pop(key).cancel()
+
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(max_workers=self.n_chunks)
+
+            following = range(last + 1, min(last + 1 + self.n_chunks, n_chunks_total))
+            for index in following:
+                if (source, index) not in self._pending:
+                    self._pending[source, index] = self._executor.submit(fetch, index)
+
+            while len(self._pending) > self.n_chunks:
+                _, future = self._pending.popitem(last=False)
+                future.cancel()
+
+
 @dataclass(order=False, unsafe_hash=True)
 class Array:
     """2d array from chunked data"""
@@ -116,22 +568,67 @@ class Array:
 
     # chunk sizes: chunks in (rows, cols)
     records_per_chunk: int | None = field(repr=True, default=None)
+    # columns per chunk, either a number of columns or the size of a chunk in bytes.
+    # Default: all columns
+    columns_per_chunk: int | str | None = field(repr=True, default=None)
     chunk_offsets: list[tuple[int, int]] = field(repr=False, init=False)
 
+    # local store for blocks of image data that were already downloaded
+    block_store: Any = field(repr=False, default=None, hash=False)
+
+    # in-memory cache of decoded chunks
+    chunk_cache: ChunkCache | None = field(repr=False, default=None, hash=False)
+
+    # background prefetching of chunks for sequential reads
+    readahead: Readahead | None = field(repr=False, default=None, hash=False)
+
+    # quantity derived from complex values while decoding, see `derived_quantities`
+    quantity: str | None = field(repr=True, default=None)
+    # factor applied to the derived quantity, and whether to convert it to decibel
+    scale: float | None = field(repr=False, default=None)
+    decibel: bool = field(repr=False, default=False)
+
+    # largest gap in bytes between selected ranges that is read instead of
+    # issuing a separate request
+    max_gap: int | str | None = field(repr=False, default=None)
+
+    # decode buffers of at least this many bytes in multiple threads. `False` to
+    # always decode in a single thread
+    decode_threshold: int | str | bool | None = field(repr=False, default=None)
+
+    # first and last + 1 valid column of each row, the fill pixels outside of these
+    # spans are not requested
+    valid_spans: Any = field(repr=False, default=None, hash=False)
+
+    # map local files into memory instead of reading them. Default: only for local files
+    memmap: bool | None = field(repr=False, default=None)
+    stride: int | None = field(repr=False, init=False)
+    _view: np.ndarray | None = field(repr=False, init=False, default=None, hash=False)
+
     def __post_init__(self):
+        if self.quantity is not None and self.quantity not in derived_quantities:
+            raise ValueError(f"unknown derived quantity: {self.quantity!r}")
+        self.max_gap = parse_bytes(self.max_gap if self.max_gap is not None else default_max_gap)
+        if self.decode_threshold is None:
+            self.decode_threshold = default_decode_threshold
+        elif self.decode_threshold is not False:
+            self.decode_threshold = parse_bytes(self.decode_threshold)
+        is_local = local_path(self.fs, self.url) is not None
+        if self.memmap is None:
+            # the chunk cache and readahead only apply to requested chunks
+            self.memmap = is_local and self.chunk_cache is None and self.readahead is None
+        elif self.memmap and not is_local:
+            raise ValueError(f"can only map local files into memory, got {self.url!r}")
+        self.stride = compute_stride(self.byte_ranges)
         sizes = np.array([stop - start for start, stop in self.byte_ranges])
-        if self.records_per_chunk is None:
-            self.records_per_chunk = 1024
-        elif isinstance(self.records_per_chunk, str):
-            if self.records_per_chunk == "auto":
-                size = 100 * 2**20
-            else:
-                size = parse_bytes(self.records_per_chunk)
-
-            self.records_per_chunk = determine_nearest_chunksize(sizes, size)
-        else:
-            self.records_per_chunk = normalize_chunksize(self.records_per_chunk, self.shape[0])
+        self.records_per_chunk = determine_records_per_chunk(
+            self.records_per_chunk, sizes, self.shape[0]
+        )
         self.chunk_offsets = compute_chunk_offsets(self.byte_ranges, self.records_per_chunk)
+        if len(self.shape) > 1:
+            self.columns_per_chunk = determine_columns_per_chunk(
+                self.columns_per_chunk, self.dtype, self.records_per_chunk, self.shape[1]
+            )
 
     def __eq__(self, other):
         if type(self) is not type(other):
@@ -144,27 +641,359 @@ class Array:
             and self.shape == other.shape
             and self.dtype == other.dtype
             and self.records_per_chunk == other.records_per_chunk
+            and self.columns_per_chunk == other.columns_per_chunk
             and self.type_code == other.type_code
+            and self.quantity == other.quantity
+            and self.scale == other.scale
+            and self.decibel == other.decibel
         )
 
     def __getitem__(self, indexers):
-        selected_ranges = compute_selected_ranges(self.byte_ranges, indexers[0])
+        return self.read(indexers)
+
+    def __getstate__(self):
+        # memory maps are reopened after unpickling
+        return self.__dict__ | {"_view": None}
+
+    def read(self, indexers, out=None):
+        if self.memmap and self.stride is not None:
+            return self.read_mapped(indexers, out=out)
+        elif self.chunk_cache is not None:
+            return self.read_cached(indexers, out=out)
+
+        tasks, *layout = self.plan(indexers)
+
+        return self.assemble(indexers, self.read_parts(tasks), *layout, out=out)
+
+    async def async_read(self, indexers, out=None):
+        if self.memmap and self.stride is not None:
+            return self.read_mapped(indexers, out=out)
+        elif self.chunk_cache is not None or self.readahead is not None or not is_async(self.fs):
+            return await asyncio.to_thread(self.read, indexers, out=out)
+
+        tasks, *layout = self.plan(indexers)
+
+        return self.assemble(indexers, await self.async_read_parts(tasks), *layout, out=out)
+
+    def plan(self, indexers):
+        row_indexer, column_indexer = indexers
+
+        itemsize = raw_dtypes[self.type_code].itemsize
+        window, relative_indexer = compute_column_window(self.shape[1], column_indexer)
+        # only request parts of the records if that saves enough bytes, or if the
+        # selection fits into a column chunk
+        max_width = self.shape[1] * column_subset_threshold
+        if self.columns_per_chunk < self.shape[1]:
+            max_width = max(max_width, self.columns_per_chunk)
+        subset = window.stop - window.start <= max_width
+        if not subset:
+            window, relative_indexer = slice(0, self.shape[1]), column_indexer
+
+        selected_ranges = compute_selected_ranges(self.byte_ranges, row_indexer)
+        offsets = None
+        if self.valid_spans is not None:
+            selected_ranges, offsets = crop_to_spans(
+                selected_ranges, self.valid_spans, window, itemsize
+            )
+        elif subset:
+            selected_ranges = [
+                (row, crop_range(range_, window, itemsize)) for row, range_ in selected_ranges
+            ]
         grouped = groupby_chunks(selected_ranges, chunksize=self.records_per_chunk)
         merged = merge_chunk_info(grouped, chunk_offsets=self.chunk_offsets)
-        tasks = [relocate_ranges(info, ranges) for info, ranges in merged]
+        tasks = [(index, *relocate_ranges(info, ranges)) for index, info, ranges in merged]
+
+        return tasks, len(selected_ranges), window, relative_indexer, offsets
+
+    def assemble(self, indexers, parts, n_rows, window, relative_indexer, offsets=None, out=None):
+        row_indexer, _ = indexers
+
+        buffer_shape = (n_rows, window.stop - window.start)
+        selected_columns = compute_selected_rows(buffer_shape[1], relative_indexer)
+        shape = tuple(
+            size
+            for size, indexer in zip((buffer_shape[0], len(selected_columns)), indexers)
+            if not is_scalar(indexer)
+        )
+        if out is not None and out.shape != shape:
+            raise ValueError(f"shape mismatch: expected {shape} but got {out.shape}")
+
+        # decode directly into `out` if the column indexer selects the full buffer
+        dense = not is_scalar(relative_indexer) and selected_columns == list(range(buffer_shape[1]))
+        if dense and out is not None:
+            buffer = out[np.newaxis] if is_scalar(row_indexer) else out
+        else:
+            buffer = np.empty(buffer_shape, dtype=self.dtype)
+        if offsets is not None:
+            # the fill pixels are not decoded
+            buffer[...] = 0
 
-        with self.fs.open(self.url, mode="rb") as f:
-            data_ = []
-            for chunk_info, ranges in tasks:
-                chunk = read_chunk(f, **chunk_info)
-                raw_bytes = extract_ranges(chunk, ranges)
-                chunk_data = [parse_data(part, type_code=self.type_code) for part in raw_bytes]
-                data_.extend(chunk_data)
+        self.decode(list(concat(parts)), buffer, offsets=offsets)
 
-            data = np.stack(data_, axis=0)
+        data = buffer[0] if is_scalar(row_indexer) else buffer
+        if dense:
+            return data if out is None else out
 
-        new_indexers = tuple(cons(slice(None), indexers[1:]))
-        return data[new_indexers]
+        selected = data[..., relative_indexer]
+        if out is None:
+            return selected
+
+        out[...] = selected
+        return out
+
+    def mapped_view(self):
+        if self._view is None:
+            dtype = raw_dtypes[self.type_code]
+            start, _ = self.byte_ranges[0]
+
+            mapped = np.memmap(local_path(self.fs, self.url), dtype="uint8", mode="r")
+            self._view = np.ndarray(
+                shape=self.shape,
+                dtype=dtype,
+                buffer=mapped,
+                offset=start,
+                strides=(self.stride, dtype.itemsize),
+            )
+
+        return self._view
+
+    def read_mapped(self, indexers, out=None):
+        row_indexer, column_indexer = indexers
+
+        # outer indexing on a big-endian view of the file
+        selected = self.mapped_view()[row_indexer][..., column_indexer]
+        if out is None:
+            out = np.empty(selected.shape, dtype=self.dtype)
+        elif out.shape != selected.shape:
+            raise ValueError(f"shape mismatch: expected {selected.shape} but got {out.shape}")
+
+        def convert(batch):
+            out[batch] = self.derive(selected[batch])
+
+        if selected.ndim == 2 and self.parallel_decode(out):
+            map_row_batches(convert, len(out), max_workers=decode_workers)
+        else:
+            out[...] = self.derive(selected)
+
+        if self.valid_spans is not None:
+            # the view contains the fill pixels of the file
+            out[~ValidityMask(self)[indexers]] = 0
+
+        return out
+
+    def derive(self, values):
+        return derive(values, self.quantity, scale=self.scale, decibel=self.decibel)
+
+    def parallel_decode(self, buffer):
+        return (
+            self.decode_threshold is not False
+            and buffer.nbytes >= self.decode_threshold
+            and len(buffer) > 1
+        )
+
+    def decode(self, parts, buffer, offsets=None):
+        itemsize = raw_dtypes[self.type_code].itemsize
+
+        def target(row, part):
+            if offsets is None:
+                return buffer[row]
+
+            return buffer[row, offsets[row] : offsets[row] + len(part) // itemsize]
+
+        def decode_batch(batch):
+            for row, part in zip(range(len(parts))[batch], parts[batch]):
+                parse_data(
+                    part,
+                    type_code=self.type_code,
+                    out=target(row, part),
+                    quantity=self.quantity,
+                    scale=self.scale,
+                    decibel=self.decibel,
+                )
+
+        if self.parallel_decode(buffer):
+            # numpy releases the GIL while converting the byte order
+            map_row_batches(decode_batch, len(parts), max_workers=decode_workers)
+        else:
+            decode_batch(slice(None))
+
+        return buffer
+
+    def read_cached(self, indexers, out=None):
+        row_indexer, column_indexer = indexers
+
+        rows = compute_selected_rows(self.shape[0], row_indexer)
+        columns = compute_selected_rows(self.shape[1], column_indexer)
+        shape = tuple(
+            size
+            for size, indexer in zip((len(rows), len(columns)), indexers)
+            if not is_scalar(indexer)
+        )
+        if out is not None and out.shape != shape:
+            raise ValueError(f"shape mismatch: expected {shape} but got {out.shape}")
+
+        buffer = np.empty((len(rows), len(columns)), dtype=self.dtype)
+        position = 0
+        # only merge consecutive rows to preserve the order
+        for chunk_rows in partitionby(lambda row: row // self.records_per_chunk, rows):
+            index = chunk_rows[0] // self.records_per_chunk
+            chunk = self.decoded_chunk(index)
+
+            local_rows = np.array(chunk_rows) - index * self.records_per_chunk
+            buffer[position : position + len(chunk_rows)] = chunk[np.ix_(local_rows, columns)]
+            position += len(chunk_rows)
+
+        data = buffer.reshape(shape)
+        if out is None:
+            return data
+
+        out[...] = data
+        return out
+
+    def decoded_chunk(self, index):
+        key = (
+            *self.source,
+            index,
+            self.quantity,
+            self.scale,
+            self.decibel,
+        )
+
+        chunk = self.chunk_cache.get(key)
+        if chunk is not None:
+            return chunk
+
+        start = index * self.records_per_chunk
+        stop = min(start + self.records_per_chunk, self.shape[0])
+        selected_ranges = list(enumerate(self.byte_ranges[start:stop], start=start))
+        offsets = None
+        if self.valid_spans is not None:
+            itemsize = raw_dtypes[self.type_code].itemsize
+            selected_ranges, offsets = crop_to_spans(
+                selected_ranges, self.valid_spans, slice(0, self.shape[1]), itemsize
+            )
+        ranges = [range_ for _, range_ in selected_ranges]
+        task = (index, *relocate_ranges(self.chunk_offsets[index], ranges))
+        (parts,) = self.read_parts([task])
+
+        # the fill pixels are not decoded
+        allocate = np.empty if offsets is None else np.zeros
+        buffer = allocate((stop - start, self.shape[1]), dtype=self.dtype)
+        chunk = self.decode(parts, buffer, offsets=offsets)
+        # the chunk is shared between reads
+        chunk.flags.writeable = False
+
+        self.chunk_cache.put(key, chunk)
+
+        return chunk
+
+    def fetch_chunk(self, index):
+        with handle_pool.open(self.fs, self.url) as f:
+            return read_chunk(f, **self.chunk_offsets[index])
+
+    def read_blocks(self, tasks):
+        blocks = {}
+        if self.block_store is not None:
+            url = block_url(self.fs, self.url)
+            blocks |= {
+                index: self.block_store.get(url, index, size=info["size"])
+                for index, info, _ in tasks
+            }
+        if self.readahead is not None:
+            blocks |= {
+                index: self.readahead.take(index, source=self.source)
+                for index, _, _ in tasks
+                if blocks.get(index) is None
+            }
+
+        return valfilter(lambda block: block is not None, blocks)
+
+    def read_parts(self, tasks):
+        blocks = self.read_blocks(tasks)
+        if self.readahead is not None:
+            indices = [index for index, _, _ in tasks]
+            self.readahead.observe(
+                indices, self.fetch_chunk, len(self.chunk_offsets), source=self.source
+            )
+
+        return [
+            (
+                extract_ranges(blocks[index], ranges)
+                if index in blocks
+                else self.read_ranges(info, ranges)
+            )
+            for index, info, ranges in tasks
+        ]
+
+    def plan_requests(self, chunk_info, ranges):
+        offset = chunk_info["offset"]
+        absolute = [(offset + start, offset + stop) for start, stop in ranges]
+        requests, membership = coalesce_ranges(absolute, max_gap=self.max_gap)
+
+        return absolute, requests, membership
+
+    def read_ranges(self, chunk_info, ranges):
+        if only_fill(ranges):
+            return [memoryview(b"")] * len(ranges)
+
+        absolute, requests, membership = self.plan_requests(chunk_info, ranges)
+
+        if len(requests) == 1:
+            ((start, stop),) = requests
+            with handle_pool.open(self.fs, self.url) as f:
+                contents = [read_chunk(f, start, stop - start)]
+        else:
+            starts, ends = map(list, zip(*requests))
+            contents = self.fs.cat_ranges(
+                [self.url] * len(requests), starts, ends, on_error="raise"
+            )
+
+        return split_requests(contents, absolute, requests, membership)
+
+    async def async_read_parts(self, tasks):
+        blocks = self.read_blocks(tasks)
+        plans = [
+            (
+                self.plan_requests(info, ranges)
+                if index not in blocks and not only_fill(ranges)
+                else None
+            )
+            for index, info, ranges in tasks
+        ]
+
+        # send the requests of all chunks at once
+        requests = list(concat(plan[1] for plan in plans if plan is not None))
+        if requests:
+            starts, ends = map(list, zip(*requests))
+            contents = await run_async(
+                self.fs,
+                self.fs._cat_ranges([self.url] * len(requests), starts, ends, on_error="raise"),
+            )
+        else:
+            contents = []
+
+        parts = []
+        position = 0
+        for (index, _, ranges), plan in zip(tasks, plans):
+            if index in blocks:
+                parts.append(extract_ranges(blocks[index], ranges))
+                continue
+            elif plan is None:
+                parts.append([memoryview(b"")] * len(ranges))
+                continue
+
+            absolute, requests_, membership = plan
+            chunk_contents = contents[position : position + len(requests_)]
+            parts.append(split_requests(chunk_contents, absolute, requests_, membership))
+            position += len(requests_)
+
+        return parts
+
+    @property
+    def source(self):
+        """the image file and the position of the first record, shared by equal chunks"""
+        # the first byte range distinguishes images cropped to different columns
+        return block_url(self.fs, self.url), tuple(map(tuple, self.byte_ranges[:1]))
 
     @property
     def ndim(self):
@@ -172,4 +1001,228 @@ class Array:
 
     @property
     def chunks(self):
-        return (self.records_per_chunk, *self.shape[1:])
+        return (self.records_per_chunk, self.columns_per_chunk, *self.shape[2:])[: self.ndim]
+
+
+@dataclass(order=False, unsafe_hash=True)
+class FieldArray:
+    """1d array of a field in the prefix of each record"""
+
+    # file location / access
+    fs: Any = field(repr=False)
+    url: str = field(repr=True)
+
+    # field positions: the selected bytes of record ``n`` start at ``offset + n * record_size``
+    offset: int = field(repr=False)
+    record_size: int = field(repr=False)
+
+    # array information
+    shape: tuple[int] = field(repr=True)
+    dtype: str | np.dtype = field(repr=True)
+
+    # convert raw bytes to data
+    record_dtype: np.dtype = field(repr=False)
+    decoders: dict = field(repr=False, hash=False, compare=False)
+    path: tuple[str, ...] = field(repr=True)
+
+    # chunk sizes: the number of records fetched per request
+    records_per_chunk: int | None = field(repr=True, default=None)
+
+    # largest gap between the fields of two records read in a single request
+    max_gap: int | str | None = field(repr=False, default=None)
+
+    def __post_init__(self):
+        sizes = np.full(self.shape[0], fill_value=self.record_size)
+        self.records_per_chunk = determine_records_per_chunk(
+            self.records_per_chunk, sizes, self.shape[0]
+        )
+        self.max_gap = parse_bytes(
+            self.max_gap if self.max_gap is not None else default_field_max_gap
+        )
+
+    def decode(self, records):
+        data, _ = get_in(list(self.path), decode_columns(records, self.decoders))
+
+        return data
+
+    def read_records(self, rows):
+        """read the fields of the given rows of a chunk
+
+        Only the bytes of the field are requested from each record, merging requests
+        separated by at most ``max_gap`` bytes.
+        """
+        starts = [self.offset + row * self.record_size for row in rows]
+        ranges = [(start, start + self.record_dtype.itemsize) for start in starts]
+        requests, membership = coalesce_ranges(ranges, max_gap=self.max_gap)
+
+        if len(requests) == 1:
+            ((start, stop),) = requests
+            with handle_pool.open(self.fs, self.url) as f:
+                contents = [read_chunk(f, start, stop - start)]
+        else:
+            starts, ends = map(list, zip(*requests))
+            contents = self.fs.cat_ranges(
+                [self.url] * len(requests), starts, ends, on_error="raise"
+            )
+
+        parts = split_requests(contents, ranges, requests, membership)
+
+        return np.frombuffer(b"".join(parts), dtype=self.record_dtype)
+
+    def __getitem__(self, indexers):
+        (indexer,) = indexers
+        rows = compute_selected_rows(self.shape[0], indexer)
+        # only merge consecutive rows to preserve the order
+        tasks = partitionby(lambda row: row // self.records_per_chunk, rows)
+
+        data_ = []
+        for chunk_rows in tasks:
+            data_.append(self.decode(self.read_records(chunk_rows)))
+
+        if data_:
+            data = np.concatenate(data_)
+        else:
+            data = np.empty((0,), dtype=self.dtype)
+
+        return data[0] if is_scalar(indexer) else data
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def chunks(self):
+        return (self.records_per_chunk,)
+
+
+@dataclass(order=False, unsafe_hash=True)
+class MultilookedArray:
+    """2d array of the block averages of an `Array`, computed while reading
+
+    Each element is the mean of ``looks[0]`` rows and ``looks[1]`` columns of the
+    wrapped array. Incomplete blocks at the end of the dimensions are dropped.
+    """
+
+    array: Array = field(repr=True)
+    looks: tuple[int, int] = field(repr=True)
+    # averages of decibel values are computed from the linear values
+    _linear: Array = field(repr=False, init=False, compare=False, hash=False)
+
+    def __post_init__(self):
+        self.looks = normalize_looks(self.looks)
+        self._linear = replace(self.array, decibel=False) if self.array.decibel else self.array
+
+    @property
+    def shape(self):
+        return tuple(size // looks for size, looks in zip(self.array.shape, self.looks))
+
+    @property
+    def dtype(self):
+        dtype = np.dtype(self.array.dtype)
+        if dtype.kind in "fc":
+            return dtype
+
+        return derived_dtype
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def chunks(self):
+        # each chunk covers whole chunks of the wrapped array, such that reading a chunk
+        # never reads the same chunk of the wrapped array as its neighbors
+        return tuple(
+            max(min(math.lcm(chunksize, looks) // looks, size), 1)
+            for chunksize, looks, size in zip(self.array.chunks, self.looks, self.shape)
+        )
+
+    def __getitem__(self, indexers):
+        row_indexer, column_indexer = indexers
+        row_looks, column_looks = self.looks
+
+        rows = compute_selected_rows(self.shape[0], row_indexer)
+        window, relative_indexer = compute_column_window(self.shape[1], column_indexer)
+        full_columns = slice(window.start * column_looks, window.stop * column_looks)
+
+        buffer = np.empty((len(rows), window.stop - window.start), dtype=self.dtype)
+        position = 0
+        # only keep the full resolution data of a single chunk at a time
+        for run in consecutive_runs(rows, self.chunks[0]):
+            full_rows = slice(run[0] * row_looks, (run[-1] + 1) * row_looks)
+            data = self._linear[full_rows, full_columns]
+
+            blocks = data.reshape(len(run), row_looks, window.stop - window.start, column_looks)
+            buffer[position : position + len(run)] = blocks.mean(axis=(1, 3))
+            position += len(run)
+
+        if self.array.decibel:
+            with np.errstate(divide="ignore"):
+                buffer = 10 * np.log10(buffer)
+
+        data = buffer[0] if is_scalar(row_indexer) else buffer
+
+        return data[..., relative_indexer]
+
+
+@dataclass(order=False, unsafe_hash=True)
+class ValidityMask:
+    """2d mask of the pixels of an `Array` that are not fill pixels
+
+    The mask is computed from the valid spans of the rows while indexing.
+    """
+
+    array: Array = field(repr=True)
+
+    @property
+    def shape(self):
+        return self.array.shape
+
+    @property
+    def dtype(self):
+        return np.dtype("bool")
+
+    @property
+    def ndim(self):
+        return len(self.shape)
+
+    @property
+    def chunks(self):
+        return self.array.chunks
+
+    def __getitem__(self, indexers):
+        row_indexer, column_indexer = indexers
+
+        rows = compute_selected_rows(self.shape[0], row_indexer)
+        columns = np.atleast_1d(np.arange(self.shape[1])[column_indexer])
+        spans = np.asarray(self.array.valid_spans)[rows]
+
+        mask = (columns >= spans[:, :1]) & (columns < spans[:, 1:])
+        if is_scalar(column_indexer):
+            mask = mask[:, 0]
+
+        return mask[0] if is_scalar(row_indexer) else mask
+
+
+# arrays that are read on demand
+lazy_array_types = (Array, FieldArray, MultilookedArray, ValidityMask)
+
+
+def normalize_looks(looks):
+    looks = tuple(looks)
+    if len(looks) != 2 or any(not isinstance(n, int) or n < 1 for n in looks):
+        raise ValueError(f"invalid number of looks: {looks!r}")
+
+    return looks
+
+
+def consecutive_runs(rows, chunksize):
+    """split rows into runs of increasing, consecutive rows within the same chunk"""
+    runs = []
+    for row in rows:
+        if runs and row == runs[-1][-1] + 1 and row // chunksize == runs[-1][0] // chunksize:
+            runs[-1].append(row)
+        else:
+            runs.append([row])
+
+    return runs
@@ -0,0 +1,60 @@
+import os
+import pathlib
+from dataclasses import dataclass
+
+
+def default_blocks_root():
+    # `ceos_alos2.sar_image` imports this module, so its cache paths are imported lazily
+    from ceos_alos2.sar_image.caching.path import cache_root
+
+    return cache_root / "blocks"
+
+
+def block_url(fs, url):
+    # `fs` is a `DirFileSystem`, so we have to use the wrapped fs to get the full url
+    return fs.fs.unstrip_protocol(fs.sep.join([fs.path, url]))
+
+
+@dataclass(frozen=True)
+class BlockStore:
+    """local on-disk store for chunks of image data
+
+    The blocks are keyed by the url of the image file and the chunk index.
+    """
+
+    root: pathlib.Path
+
+    @classmethod
+    def from_option(cls, option):
+        if option in (None, False):
+            return None
+        elif option is True:
+            return cls(root=default_blocks_root())
+
+        return cls(root=pathlib.Path(option))
+
+    def location(self, url, index):
+        from ceos_alos2.sar_image.caching.path import hashsum
+
+        return self.root / hashsum(url) / f"{index}.block"
+
+    def get(self, url, index, size):
+        try:
+            content = self.location(url, index).read_bytes()
+        except FileNotFoundError:
+            return None
+
+        if len(content) != size:
+            # written with a different chunk size
+            return None
+
+        return content
+
+    def put(self, url, index, content):
+        path = self.location(url, index)
+        path.parent.mkdir(parents=True, exist_ok=True)
+
+        # write to a temporary file first so readers never see partial blocks
+        tmp_path = path.with_name(f"{path.name}.{os.getpid()}.tmp")
+        tmp_path.write_bytes(content)
+        tmp_path.replace(path)
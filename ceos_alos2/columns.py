@@ -0,0 +1,144 @@
+import numpy as np
+from tlz.dicttoolz import merge_with
+
+
+def native(column, context):
+    return column.astype(column.dtype.newbyteorder("="))
+
+
+class Factor:
+    def __init__(self, decoder, factor):
+        self.decoder = decoder
+        self.factor = factor
+
+    def __call__(self, column, context):
+        return self.decoder(column, context) * self.factor
+
+
+class Metadata:
+    def __init__(self, decoder, **kwargs):
+        self.decoder = decoder
+        self.attrs = kwargs
+
+    def __call__(self, column, context):
+        return (self.decoder(column, context), self.attrs)
+
+
+class Enum:
+    def __init__(self, enum):
+        self.mapping = {int(k): str(v) for k, v in enum.decmapping.items()}
+
+    def __call__(self, column, context):
+        values, inverse = np.unique(column, return_inverse=True)
+        decoded = np.array([self.mapping.get(int(v), int(v)) for v in values], dtype=object)
+
+        return decoded[inverse]
+
+
+def flag(column, context):
+    return column != 0
+
+
+def datetime_ydms(column, context):
+    years = column["year"].astype("int64") - 1970
+    days = column["day_of_year"].astype("int64") - 1
+    milliseconds = column["milliseconds"].astype("int64")
+
+    base = years.astype("datetime64[Y]").astype("datetime64[D]")
+    timedelta = days.astype("timedelta64[D]") + milliseconds.astype("timedelta64[ms]")
+
+    return (base + timedelta).astype("datetime64[ns]")
+
+
+class DatetimeYdus:
+    def __init__(self, reference_date):
+        self.reference_date = reference_date
+
+    @property
+    def dependencies(self):
+        return [self.reference_date]
+
+    def __call__(self, column, context):
+        reference_date = context[self.reference_date]
+        truncated = reference_date.astype("datetime64[D]").astype("datetime64[ns]")
+        microseconds = column.astype("int64").astype("timedelta64[us]")
+
+        return truncated + microseconds
+
+
+def decode_columns(records, decoders):
+    """decode the columns of a structured array
+
+    Void fields are padding and will be skipped.
+    """
+    context = {}
+    for name in records.dtype.names:
+        column = records[name]
+        decoder = decoders.get(name)
+
+        if column.dtype.kind == "V" and column.dtype.names is None:
+            continue
+        elif column.dtype.names is not None and not callable(decoder):
+            context[name] = decode_columns(column, decoder or {})
+        else:
+            context[name] = (decoder or native)(column, context)
+
+    return {
+        name: value if isinstance(value, (dict, tuple)) else (value, {})
+        for name, value in context.items()
+    }
+
+
+def records_to_columns(records):
+    def _convert(values):
+        if values and isinstance(values[0], dict):
+            return records_to_columns(values)
+
+        if values and isinstance(values[0], tuple):
+            values_, attrs = zip(*values)
+            return np.asarray(values_), attrs[0]
+
+        return np.asarray(values), {}
+
+    merged = merge_with(list, *records)
+
+    return {name: _convert(values) for name, values in merged.items()}
+
+
+def concat_columns(columns):
+    def _concat(values):
+        if isinstance(values[0], dict):
+            return concat_columns(values)
+
+        data, attrs = zip(*values)
+        return np.concatenate(data), attrs[0]
+
+    return merge_with(_concat, *columns)
+
+
+def subset_dtype(dtype, names):
+    """select fields of a structured dtype, including their dependencies
+
+    Returns the offset of the first selected byte and a structured dtype
+    spanning the selected fields.
+    """
+    fields = sorted(((name, *dtype.fields[name][:2]) for name in names), key=lambda field: field[2])
+    start = min(offset for _, _, offset in fields)
+    stop = max(offset + dtype_.itemsize for _, dtype_, offset in fields)
+
+    subset = np.dtype(
+        {
+            "names": [name for name, _, _ in fields],
+            "formats": [dtype_ for _, dtype_, _ in fields],
+            "offsets": [offset - start for _, _, offset in fields],
+            "itemsize": stop - start,
+        }
+    )
+
+    return start, subset
+
+
+def field_dependencies(name, decoders):
+    decoder = decoders.get(name)
+
+    return [name, *getattr(decoder, "dependencies", [])]
@@ -1,3 +1,4 @@
+import numpy as np
 from construct import Int8ub, Int32ub, Struct
 
 record_preamble = Struct(
@@ -8,3 +9,14 @@ record_preamble = Struct(
     "third_record_subtype" / Int8ub,
     "record_length" / Int32ub,
 )
+
+record_preamble_dtype = np.dtype(
+    [
+        ("record_sequence_number", ">u4"),
+        ("first_record_subtype", "u1"),
+        ("record_type", "u1"),
+        ("second_record_subtype", "u1"),
+        ("third_record_subtype", "u1"),
+        ("record_length", ">u4"),
+    ]
+)
@@ -0,0 +1,98 @@
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+
+class HandlePool:
+    """pool of reusable file handles, keyed by filesystem and url
+
+    Handles are checked out exclusively, such that concurrent readers never share
+    a handle. Idle handles are closed once the pool is full or after
+    ``idle_timeout`` seconds.
+    """
+
+    def __init__(self, maxsize=32, idle_timeout=60):
+        self.maxsize = maxsize
+        self.idle_timeout = idle_timeout
+
+        self._lock = threading.Lock()
+        self._pid = os.getpid()
+        # idle handles as (key, handle, last_used), least recently used first
+        self._idle = []
+
+    def __len__(self):
+        return len(self._idle)
+
+    def _expire(self, now):
+        if self._pid != os.getpid():
+            # forked: the handles belong to the parent process
+            self._pid = os.getpid()
+            self._idle = []
+            return []
+
+        expired = [entry for entry in self._idle if now - entry[2] > self.idle_timeout]
+        self._idle = [entry for entry in self._idle if now - entry[2] <= self.idle_timeout]
+
+        return expired
+
+    def _checkout(self, key):
+        with self._lock:
+            expired = self._expire(time.monotonic())
+
+            index = next(
+                (
+                    index
+                    for index, (key_, *_) in reversed(list(enumerate(self._idle)))
+                    if key_ == key
+                ),
+                None,
+            )
+            handle = self._idle.pop(index)[1] if index is not None else None
+
+        close_all(handle for _, handle, _ in expired)
+
+        return handle
+
+    def _checkin(self, key, handle):
+        with self._lock:
+            expired = self._expire(time.monotonic())
+
+            self._idle.append((key, handle, time.monotonic()))
+            n_evicted = max(len(self._idle) - self.maxsize, 0)
+            evicted, self._idle = self._idle[:n_evicted], self._idle[n_evicted:]
+
+        close_all(handle for _, handle, _ in expired + evicted)
+
+    @contextmanager
+    def open(self, fs, url):
+        key = (fs, url)
+
+        handle = self._checkout(key)
+        if handle is None:
+            handle = fs.open(url, mode="rb")
+
+        try:
+            yield handle
+        except BaseException:
+            # the state of the handle is unknown, so don't reuse it
+            handle.close()
+            raise
+
+        self._checkin(key, handle)
+
+    def clear(self):
+        with self._lock:
+            idle, self._idle = self._idle, []
+
+        close_all(handle for _, handle, _ in idle)
+
+
+def close_all(handles):
+    for handle in handles:
+        handle.close()
+
+
+# shared by all arrays of the current process. Arrays only hold the filesystem and
+# url, so after pickling the handles are reopened lazily
+handle_pool = HandlePool()
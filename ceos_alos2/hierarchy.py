@@ -8,7 +8,7 @@ import numpy as np
 from numpy.typing import ArrayLike
 from tlz.dicttoolz import valfilter
 
-from ceos_alos2.array import Array
+from ceos_alos2.array import Array, lazy_array_types
 
 
 @dataclass(frozen=True)
@@ -33,7 +33,7 @@ class Variable:
         if self.attrs != other.attrs:
             return False
 
-        if isinstance(self.data, Array):
+        if isinstance(self.data, lazy_array_types):
             return self.data == other.data
         else:
             return np.all(self.data == other.data)
@@ -52,7 +52,7 @@ class Variable:
 
     @property
     def chunks(self):
-        if not isinstance(self.data, Array):
+        if not isinstance(self.data, lazy_array_types):
             return {}
 
         return dict(zip(self.dims, self.data.chunks))
@@ -1,15 +1,42 @@
 import fsspec
+from fsspec.implementations.dirfs import DirFileSystem
 from tlz.functoolz import curry
 
 from ceos_alos2 import sar_image
+from ceos_alos2.array import ChunkCache
 from ceos_alos2.hierarchy import Group
+from ceos_alos2.sar_image.calibration import Calibration
 from ceos_alos2.sar_leader import open_sar_leader
 from ceos_alos2.summary import open_summary
 from ceos_alos2.volume_directory import open_volume_directory
 
 
-def open(path, *, storage_options={}, create_cache=False, use_cache=True, records_per_chunk=1024):
+def open(
+    path,
+    *,
+    storage_options={},
+    create_cache=False,
+    use_cache=True,
+    records_per_chunk=1024,
+    columns_per_chunk=None,
+    metadata="eager",
+    prefix_only=None,
+    max_workers=None,
+    block_cache=None,
+    chunk_cache=None,
+    max_gap=None,
+    decode_threshold=None,
+    memmap=None,
+    readahead=None,
+    derived=None,
+    calibrated=None,
+    calibration_unit="linear",
+    multilook=None,
+    crop_fill=False,
+):
     mapper = fsspec.get_mapper(path, **storage_options)
+    # share the memory budget between all images
+    chunk_cache = ChunkCache.from_option(chunk_cache)
 
     # read summary
     summary = open_summary(mapper, "summary.txt")
@@ -20,6 +47,13 @@ def open(path, *, storage_options={}, create_cache=False, use_cache=True, record
     volume_directory = open_volume_directory(mapper, filenames["volume_directory"])
     # read sar leader
     sar_leader = open_sar_leader(mapper, filenames["sar_leader"])
+    calibration = Calibration.from_leader(sar_leader, unit=calibration_unit) if calibrated else None
+    # the images share the filesystem, so probing the first image is enough
+    auto_tuned = records_per_chunk == "auto"
+    if auto_tuned:
+        records_per_chunk = sar_image.tune_records_per_chunk(
+            DirFileSystem(path=mapper.root, fs=mapper.fs), filenames["sar_imagery"][0]
+        )
     # read actual imagery
     imagery_groups = list(
         map(
@@ -27,14 +61,33 @@ def open(path, *, storage_options={}, create_cache=False, use_cache=True, record
                 sar_image.open_image,
                 mapper,
                 records_per_chunk=records_per_chunk,
+                columns_per_chunk=columns_per_chunk,
                 create_cache=create_cache,
                 use_cache=use_cache,
+                metadata=metadata,
+                prefix_only=prefix_only,
+                max_workers=max_workers,
+                block_cache=block_cache,
+                chunk_cache=chunk_cache,
+                max_gap=max_gap,
+                decode_threshold=decode_threshold,
+                memmap=memmap,
+                readahead=readahead,
+                derived=derived,
+                calibrated=calibrated,
+                calibration=calibration,
+                multilook=multilook,
+                crop_fill=crop_fill,
             ),
             filenames["sar_imagery"],
         )
     )
     imagery = Group(
-        "/imagery", url=mapper.root, data={group.name: group for group in imagery_groups}, attrs={}
+        "/imagery",
+        url=mapper.root,
+        data={group.name: group for group in imagery_groups},
+        # record the tuned request size to allow reproducing it
+        attrs={"records_per_chunk": records_per_chunk} if auto_tuned else {},
     )
     # read sar trailer
     subgroups = {"summary": summary, "metadata": sar_leader, "imagery": imagery}
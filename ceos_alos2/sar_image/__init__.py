@@ -1,10 +1,45 @@
-from ceos_alos2.array import Array
+import dataclasses
+
+import numpy as np
+from tlz.dicttoolz import keyfilter
+from tlz.functoolz import curry
+
+from ceos_alos2.array import (
+    Array,
+    ChunkCache,
+    FieldArray,
+    MultilookedArray,
+    Readahead,
+    ValidityMask,
+    crop_range,
+    derived_dtype,
+    derived_quantities,
+    normalize_looks,
+    raw_dtypes,
+)
+from ceos_alos2.blocks import BlockStore, block_url
+from ceos_alos2.columns import field_dependencies, subset_dtype
 from ceos_alos2.decoders import decode_filename
 from ceos_alos2.hierarchy import Variable
 from ceos_alos2.sar_image import caching
 from ceos_alos2.sar_image.caching import CachingError
-from ceos_alos2.sar_image.io import read_metadata
-from ceos_alos2.sar_image.metadata import transform_metadata
+from ceos_alos2.sar_image.calibration import calibrated_quantities
+from ceos_alos2.sar_image.io import (
+    column_types,
+    parse_chunk_columns,
+    read_columns,
+    read_file_descriptor,
+    read_prefix_columns,
+    spill_payload,
+)
+from ceos_alos2.sar_image.metadata import (
+    line_field_paths,
+    transform_columns,
+    transform_first_record,
+    transform_header,
+)
+from ceos_alos2.tuning import probe_records_per_chunk
+from ceos_alos2.utils import to_dict
 
 
 def filename_to_groupname(path):
@@ -15,30 +50,316 @@ def filename_to_groupname(path):
     return "_".join([_ for _ in parts if _])
 
 
-def open_image(mapper, path, *, use_cache=True, create_cache=False, records_per_chunk=None):
+def lazy_line_metadata(fs, path, header, columns, group, records_per_chunk):
+    (record_type,), _ = columns["preamble"]["record_type"]
+    record_dtype, decoders = column_types[record_type]
+    record_size = header["sar_data_record_length"]
+    n_records = header["number_of_sar_data_records"]
+
+    paths = line_field_paths(columns)
+
+    def to_lazy(name, var):
+        path_ = paths[name]
+        offset, dtype = subset_dtype(record_dtype, field_dependencies(path_[0], decoders))
+
+        data = FieldArray(
+            fs=fs,
+            url=path,
+            offset=720 + offset,
+            record_size=record_size,
+            shape=(n_records,),
+            dtype=var.dtype,
+            record_dtype=dtype,
+            decoders=keyfilter(lambda k: k in dtype.names, decoders),
+            path=path_,
+            records_per_chunk=records_per_chunk,
+        )
+        return Variable(var.dims, data, var.attrs)
+
+    def to_index(var):
+        # line numbers are consecutive, so the first record determines the index
+        values = var.data[0] + np.arange(n_records, dtype=var.dtype)
+        return Variable(var.dims, values, var.attrs)
+
+    for name, var in group.variables.items():
+        # index coordinates are loaded while opening, so they stay eager
+        group[name] = to_index(var) if name in var.dims else to_lazy(name, var)
+
+    return group
+
+
+def read_image_metadata(fs, path, metadata, records_per_chunk, block_store=None, max_workers=None):
+    if metadata == "eager":
+        if block_store is not None:
+            spill = curry(spill_payload, block_store, block_url(fs, path))
+        else:
+            spill = None
+        header, columns = read_columns(
+            fs, path, records_per_chunk, spill=spill, max_workers=max_workers
+        )
+
+        return transform_columns(header, columns)
+
+    with fs.open(path, mode="rb") as f:
+        if metadata == "none":
+            header = to_dict(read_file_descriptor(f))
+
+            group, array_metadata = transform_header(header)
+        else:
+            header = to_dict(read_file_descriptor(f))
+            record_size = header["sar_data_record_length"]
+            columns = parse_chunk_columns(f.read(record_size), record_size, offset=720)
+
+            group, array_metadata = transform_first_record(header, columns)
+            group = lazy_line_metadata(fs, path, header, columns, group, records_per_chunk)
+
+    return group, array_metadata
+
+
+fill_count_names = [
+    "actual_count_of_left_fill_pixels",
+    "actual_count_of_data_pixels",
+]
+
+
+def has_fill_counts(group):
+    return all(name in group.variables for name in fill_count_names)
+
+
+def crop_fill_pixels(group):
+    """restrict the image data to the columns containing data pixels
+
+    Reads skip the fill pixels of each line, and the ``valid`` variable masks them.
+    """
+    if not has_fill_counts(group):
+        raise ValueError("cropping fill pixels requires the line metadata")
+
+    def materialize(var):
+        if isinstance(var.data, FieldArray):
+            return np.asarray(var.data[(slice(None),)])
+
+        return np.asarray(var.data)
+
+    left_fill, data_pixels = (materialize(group[name]).astype("int64") for name in fill_count_names)
+
+    data = group["data"]
+    n_rows, n_columns = data.shape
+    spans = np.clip(np.stack([left_fill, left_fill + data_pixels], axis=1), 0, n_columns)
+
+    valid_rows = spans[:, 1] > spans[:, 0]
+    if valid_rows.any():
+        first_column = int(spans[valid_rows, 0].min())
+        last_column = int(spans[valid_rows, 1].max())
+    else:
+        first_column = last_column = 0
+
+    columns = slice(first_column, last_column)
+    itemsize = raw_dtypes[data.data.type_code].itemsize
+    cropped = dataclasses.replace(
+        data.data,
+        byte_ranges=[crop_range(range_, columns, itemsize) for range_ in data.data.byte_ranges],
+        shape=(n_rows, last_column - first_column),
+        valid_spans=np.clip(spans - first_column, 0, last_column - first_column),
+    )
+
+    group["data"] = Variable(data.dims, cropped, data.attrs | {"column_offset": first_column})
+    group["valid"] = Variable(data.dims, ValidityMask(cropped), attrs={})
+
+    return group
+
+
+def add_derived_variables(group, quantities):
+    if not quantities:
+        return group
+
+    data = group["data"]
+    if data.data.type_code != "C*8":
+        raise ValueError(
+            f"can only derive quantities from complex image data, got {data.data.type_code!r}"
+        )
+
+    for quantity in quantities:
+        derived = dataclasses.replace(data.data, quantity=quantity, dtype=derived_dtype)
+        group[quantity] = Variable(data.dims, derived, attrs={})
+
+    return group
+
+
+def add_calibrated_variables(group, quantities, calibration):
+    if not quantities:
+        return group
+
+    data = group["data"]
+    decibel = calibration.unit == "dB"
+    for quantity in quantities:
+        calibrated = dataclasses.replace(
+            data.data,
+            quantity="intensity",
+            scale=calibration.scale(quantity, data.data.type_code),
+            decibel=decibel,
+            dtype=derived_dtype,
+        )
+        group[quantity] = Variable(data.dims, calibrated, attrs={"units": calibration.unit})
+
+    return group
+
+
+def multilook_variables(group, looks):
+    if looks is None:
+        return group
+
+    names = [name for name, var in group.variables.items() if isinstance(var.data, Array)]
+    for name in names:
+        var = group[name]
+        # the line metadata stays at full resolution, so the dimensions have to differ
+        group[name] = Variable(
+            ["multilooked_rows", "multilooked_columns"],
+            MultilookedArray(var.data, looks=looks),
+            var.attrs,
+        )
+
+    return group
+
+
+def tune_records_per_chunk(fs, path):
+    with fs.open(path, mode="rb") as f:
+        header = to_dict(read_file_descriptor(f))
+
+    return probe_records_per_chunk(
+        fs,
+        path,
+        offset=720,
+        record_size=header["sar_data_record_length"],
+        n_records=header["number_of_sar_data_records"],
+    )
+
+
+def open_image(
+    mapper,
+    path,
+    *,
+    use_cache=True,
+    create_cache=False,
+    records_per_chunk=None,
+    columns_per_chunk=None,
+    metadata="eager",
+    prefix_only=None,
+    max_workers=None,
+    block_cache=None,
+    chunk_cache=None,
+    max_gap=None,
+    decode_threshold=None,
+    memmap=None,
+    readahead=None,
+    derived=None,
+    calibrated=None,
+    calibration=None,
+    multilook=None,
+    crop_fill=False,
+):
+    if metadata not in ("eager", "lazy", "none"):
+        raise ValueError(f"unknown metadata mode: {metadata!r}")
+    if create_cache and metadata != "eager":
+        raise ValueError("can only create cache files with eagerly read metadata")
+    if crop_fill and metadata == "none":
+        raise ValueError("cropping fill pixels requires the line metadata")
+    derived = list(derived or [])
+    unknown = [quantity for quantity in derived if quantity not in derived_quantities]
+    if unknown:
+        raise ValueError(f"unknown derived quantities: {', '.join(map(repr, unknown))}")
+
+    calibrated = list(calibrated or [])
+    unknown = [quantity for quantity in calibrated if quantity not in calibrated_quantities]
+    if unknown:
+        raise ValueError(f"unknown calibrated quantities: {', '.join(map(repr, unknown))}")
+    if calibrated and calibration is None:
+        raise ValueError("calibrated quantities require the calibration of the dataset")
+
+    if multilook is not None:
+        multilook = normalize_looks(multilook)
+
+    block_store = BlockStore.from_option(block_cache)
+    if block_store is not None and (metadata != "eager" or prefix_only):
+        raise ValueError("can only fill the block cache when reading whole records eagerly")
+
+    chunk_cache = ChunkCache.from_option(chunk_cache)
+
+    from fsspec.implementations.dirfs import DirFileSystem
+    from fsspec.implementations.local import LocalFileSystem
+
+    fs = DirFileSystem(path=mapper.root, fs=mapper.fs)
+
+    auto_tuned = records_per_chunk == "auto"
+    if auto_tuned:
+        records_per_chunk = tune_records_per_chunk(fs, path)
+
     if use_cache:
         try:
-            return caching.read_cache(mapper, path, records_per_chunk=records_per_chunk)
+            group = caching.read_cache(mapper, path, records_per_chunk=records_per_chunk)
         except CachingError:
-            pass
+            group = None
 
-    from fsspec.implementations.dirfs import DirFileSystem
+        if crop_fill and group is not None and not has_fill_counts(group):
+            # cache files written before the fill pixel counts were recorded
+            group = None
 
-    fs = DirFileSystem(path=mapper.root, fs=mapper.fs)
+        if group is not None:
+            data = group["data"]
+            group["data"] = Variable(
+                data.dims,
+                dataclasses.replace(
+                    data.data,
+                    columns_per_chunk=columns_per_chunk,
+                    chunk_cache=chunk_cache,
+                    max_gap=max_gap,
+                    decode_threshold=decode_threshold,
+                    memmap=memmap,
+                    readahead=Readahead.from_option(readahead),
+                ),
+                data.attrs | ({"records_per_chunk": records_per_chunk} if auto_tuned else {}),
+            )
+            if crop_fill:
+                group = crop_fill_pixels(group)
+            group = add_calibrated_variables(group, calibrated, calibration)
+            return multilook_variables(add_derived_variables(group, derived), multilook)
 
-    with fs.open(path, mode="rb") as f:
-        header, metadata = read_metadata(f, records_per_chunk)
+    if prefix_only is None:
+        # for local files, reading whole chunks is faster than many small reads
+        prefix_only = block_store is None and not isinstance(mapper.fs, LocalFileSystem)
 
-        group, array_metadata = transform_metadata(header, metadata)
+    if metadata == "eager" and prefix_only:
+        header, columns = read_prefix_columns(fs, path, records_per_chunk, max_workers=max_workers)
+
+        group, array_metadata = transform_columns(header, columns)
+    else:
+        group, array_metadata = read_image_metadata(
+            fs, path, metadata, records_per_chunk, block_store=block_store, max_workers=max_workers
+        )
 
     group["data"] = Variable(
         dims=["rows", "columns"],
-        data=Array(fs=fs, url=path, records_per_chunk=records_per_chunk, **array_metadata),
-        attrs={},
+        data=Array(
+            fs=fs,
+            url=path,
+            records_per_chunk=records_per_chunk,
+            columns_per_chunk=columns_per_chunk,
+            block_store=block_store,
+            chunk_cache=chunk_cache,
+            max_gap=max_gap,
+            decode_threshold=decode_threshold,
+            memmap=memmap,
+            readahead=Readahead.from_option(readahead),
+            **array_metadata,
+        ),
+        # record the tuned request size to allow reproducing it
+        attrs={"records_per_chunk": records_per_chunk} if auto_tuned else {},
     )
     group.path = filename_to_groupname(path)
 
     if create_cache:
         caching.create_cache(mapper, path, group)
 
-    return group
+    if crop_fill:
+        group = crop_fill_pixels(group)
+    group = add_calibrated_variables(group, calibrated, calibration)
+    return multilook_variables(add_derived_variables(group, derived), multilook)
@@ -0,0 +1,47 @@
+import math
+from dataclasses import dataclass
+
+calibrated_quantities = ["sigma0", "beta0"]
+calibration_units = ["linear", "dB"]
+
+
+@dataclass(frozen=True)
+class Calibration:
+    """radiometric calibration of the image data
+
+    Following the formula of the SAR leader, ``σ⁰ = 10*log_10<I^2 + Q^2> + CF - 32.0``
+    for complex data and ``σ⁰ = 10*log_10<DN^2> + CF`` for detected data. ``β⁰`` is
+    derived from ``σ⁰`` using the incidence angle at the scene center. The polarimetric
+    distortion matrices are not applied.
+    """
+
+    # calibration factor in dB
+    factor: float
+    # incidence angle at the scene center in degrees
+    incidence_angle: float
+    unit: str = "linear"
+
+    @classmethod
+    def from_leader(cls, sar_leader, unit="linear"):
+        if unit not in calibration_units:
+            raise ValueError(f"unknown calibration unit: {unit!r}")
+
+        try:
+            factor = sar_leader["radiometric_data"]["calibration_factor"].data
+            incidence_angle = sar_leader["dataset_summary"]["incidence_angle_at_scene_center"].data
+        except KeyError as e:
+            raise ValueError(f"cannot calibrate: the SAR leader does not contain {e}") from e
+
+        return cls(factor=float(factor), incidence_angle=float(incidence_angle), unit=unit)
+
+    def scale(self, quantity, type_code):
+        """linear factor converting the intensity of the image data to ``quantity``"""
+        offset = -32.0 if type_code == "C*8" else 0.0
+        sigma0 = 10 ** ((self.factor + offset) / 10)
+
+        if quantity == "sigma0":
+            return sigma0
+        elif quantity == "beta0":
+            return sigma0 / math.sin(math.radians(self.incidence_angle))
+
+        raise ValueError(f"unknown calibrated quantity: {quantity!r}")
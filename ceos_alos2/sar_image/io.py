@@ -1,18 +1,36 @@
+import io
 import itertools
 import math
+import os
+from collections import deque
+from concurrent.futures import ThreadPoolExecutor
 
+import numpy as np
 from tlz.itertoolz import concat
 
+from ceos_alos2.columns import concat_columns, decode_columns, records_to_columns
 from ceos_alos2.common import record_preamble
 from ceos_alos2.sar_image.file_descriptor import file_descriptor_record
-from ceos_alos2.sar_image.processed_data import processed_data_record
-from ceos_alos2.sar_image.signal_data import signal_data_record
+from ceos_alos2.sar_image.processed_data import (
+    processed_data_decoders,
+    processed_data_dtype,
+    processed_data_record,
+)
+from ceos_alos2.sar_image.signal_data import (
+    signal_data_decoders,
+    signal_data_dtype,
+    signal_data_record,
+)
 from ceos_alos2.utils import to_dict
 
 record_types = {
     10: signal_data_record,
     11: processed_data_record,
 }
+column_types = {
+    10: (signal_data_dtype, signal_data_decoders),
+    11: (processed_data_dtype, processed_data_decoders),
+}
 
 
 def parse_chunk(content, element_size):
@@ -32,6 +50,38 @@ def parse_chunk(content, element_size):
     return list(parser.parse(content))
 
 
+def parse_chunk_columns(content, element_size, offset=0, record_size=None):
+    n_elements = len(content) // element_size
+    if n_elements * element_size != len(content):
+        raise ValueError(
+            f"sizes mismatch: chunksize is {n_elements * element_size}"
+            f" but got {len(content)} bytes"
+        )
+
+    record_type = record_preamble.parse(content[:12]).record_type
+    description = column_types.get(record_type)
+    if description is None:
+        # no columnar description, fall back to parsing record by record
+        records = adjust_offsets(parse_chunk(content, element_size), offset)
+        return records_to_columns(to_dict(records))
+
+    dtype, decoders = description
+    records = np.ndarray(shape=(n_elements,), dtype=dtype, buffer=content, strides=(element_size,))
+    columns = decode_columns(records, decoders)
+
+    if record_size is None:
+        record_size = element_size
+
+    record_start = offset + np.arange(n_elements, dtype="int64") * record_size
+    start = record_start + dtype.itemsize
+    stop = record_start + columns["preamble"]["record_length"][0]
+
+    return columns | {
+        "record_start": (record_start, {}),
+        "data": {"start": (start, {}), "size": (stop - start, {}), "stop": (stop, {})},
+    }
+
+
 def _adjust_offset(record, offset):
     record.record_start += offset
     record.data.start += offset
@@ -48,14 +98,10 @@ def read_file_descriptor(f):
     return file_descriptor_record.parse(f.read(720))
 
 
-def read_metadata(f, records_per_chunk=1024):
-    header = read_file_descriptor(f)
-
-    n_records = header["number_of_sar_data_records"]
-    record_size = header["sar_data_record_length"]
-
+def compute_chunksizes(n_records, records_per_chunk):
     n_chunks = math.ceil(n_records / records_per_chunk)
-    chunksizes = [
+
+    return [
         (
             records_per_chunk
             if records_per_chunk * (index + 1) <= n_records
@@ -63,9 +109,56 @@ def read_metadata(f, records_per_chunk=1024):
         )
         for index in range(n_chunks)
     ]
-    chunk_offsets = [
-        offset * record_size + 720 for offset in itertools.accumulate(chunksizes, initial=0)
-    ]
+
+
+def compute_chunk_offsets(chunksizes, record_size):
+    return [offset * record_size + 720 for offset in itertools.accumulate(chunksizes, initial=0)]
+
+
+def default_max_workers():
+    # same as `concurrent.futures.ThreadPoolExecutor`
+    return min(32, (os.cpu_count() or 1) + 4)
+
+
+def iter_chunks(func, *iterables, max_workers=None):
+    """apply func to each chunk, yielding the results in order
+
+    With ``max_workers=1`` the chunks are processed sequentially, otherwise
+    a thread pool is used to overlap the requests. At most ``2 * max_workers``
+    chunks are in flight or waiting to be consumed at any time.
+    """
+    if max_workers == 1:
+        yield from map(func, *iterables)
+        return
+
+    if max_workers is None:
+        max_workers = default_max_workers()
+    window = 2 * max_workers
+
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+        for args in zip(*iterables):
+            pending.append(executor.submit(func, *args))
+            if len(pending) >= window:
+                yield pending.popleft().result()
+
+        while pending:
+            yield pending.popleft().result()
+
+
+def map_chunks(func, *iterables, max_workers=None):
+    """apply func to each chunk, preserving the order of the results"""
+    return list(iter_chunks(func, *iterables, max_workers=max_workers))
+
+
+def read_metadata(f, records_per_chunk=1024):
+    header = read_file_descriptor(f)
+
+    n_records = header["number_of_sar_data_records"]
+    record_size = header["sar_data_record_length"]
+
+    chunksizes = compute_chunksizes(n_records, records_per_chunk)
+    chunk_offsets = compute_chunk_offsets(chunksizes, record_size)
 
     raw_metadata = (
         parse_chunk(f.read(chunksize * record_size), record_size) for chunksize in chunksizes
@@ -77,3 +170,65 @@ def read_metadata(f, records_per_chunk=1024):
     metadata = list(concat(adjusted))
 
     return to_dict(header), to_dict(metadata)
+
+
+def spill_payload(block_store, url, index, offset, content, columns):
+    start, _ = columns["data"]["start"]
+    stop, _ = columns["data"]["stop"]
+
+    block_store.put(url, index, content[start.min() - offset : stop.max() - offset])
+
+
+def read_columns(fs, path, records_per_chunk=1024, spill=None, max_workers=None):
+    header = read_file_descriptor(io.BytesIO(fs.cat_file(path, start=0, end=720)))
+
+    n_records = header["number_of_sar_data_records"]
+    record_size = header["sar_data_record_length"]
+
+    chunksizes = compute_chunksizes(n_records, records_per_chunk)
+    chunk_offsets = compute_chunk_offsets(chunksizes, record_size)
+
+    def read_chunk(chunksize, offset):
+        content = fs.cat_file(path, start=offset, end=offset + chunksize * record_size)
+
+        return content, parse_chunk_columns(content, record_size, offset=offset)
+
+    chunks = iter_chunks(read_chunk, chunksizes, chunk_offsets, max_workers=max_workers)
+
+    columns = []
+    for index, (offset, (content, chunk_columns)) in enumerate(zip(chunk_offsets, chunks)):
+        # spill from the calling thread, in chunk order
+        if spill is not None:
+            spill(index, offset, content, chunk_columns)
+
+        columns.append(chunk_columns)
+
+    return to_dict(header), concat_columns(columns)
+
+
+def read_prefix_columns(fs, path, records_per_chunk=1024, max_workers=None):
+    content = fs.cat_file(path, start=0, end=720 + 12)
+    header = read_file_descriptor(io.BytesIO(content[:720]))
+    record_type = record_preamble.parse(content[720:]).record_type
+
+    description = column_types.get(record_type)
+    if description is None:
+        raise ValueError(f"cannot read prefixes of records with type code {record_type}")
+    dtype, _ = description
+
+    n_records = header["number_of_sar_data_records"]
+    record_size = header["sar_data_record_length"]
+
+    chunksizes = compute_chunksizes(n_records, records_per_chunk)
+    chunk_offsets = compute_chunk_offsets(chunksizes, record_size)
+
+    def read_prefixes(chunksize, offset):
+        starts = [offset + index * record_size for index in range(chunksize)]
+        ends = [start + dtype.itemsize for start in starts]
+        content = b"".join(fs.cat_ranges([path] * chunksize, starts, ends, on_error="raise"))
+
+        return parse_chunk_columns(content, dtype.itemsize, offset=offset, record_size=record_size)
+
+    columns = map_chunks(read_prefixes, chunksizes, chunk_offsets, max_workers=max_workers)
+
+    return to_dict(header), concat_columns(columns)
@@ -6,6 +6,7 @@ from tlz.functoolz import compose_left, curry, pipe
 from tlz.itertoolz import cons, first, second
 
 from ceos_alos2.dicttoolz import apply_to_items, dissoc, keysplit
+from ceos_alos2.hierarchy import Group
 from ceos_alos2.transformers import as_group, remove_spares, separate_attrs
 from ceos_alos2.utils import remove_nesting_layer, rename, starcall
 
@@ -21,6 +22,17 @@ def extract_shape(header):
     )
 
 
+def compute_byte_ranges(header):
+    n_records = header["number_of_sar_data_records"]
+    record_size = header["sar_data_record_length"]
+    prefix_size = header["record_data_in_the_file"]["number_of_bytes_of_prefix_data_per_record"]
+
+    return [
+        (720 + index * record_size + prefix_size, 720 + (index + 1) * record_size)
+        for index in range(n_records)
+    ]
+
+
 def extract_attrs(header):
     # valid attrs:
     # - pixel range (level 1.5)
@@ -68,26 +80,43 @@ def apply_overrides(dtype_overrides, mapping):
     }
 
 
+def as_scalar(value):
+    if isinstance(value, np.generic):
+        return value.item()
+
+    return value
+
+
 def deduplicate_attrs(known, mapping):
     variables, attrs = keysplit(lambda k: k not in known, mapping)
 
-    return variables | valmap(compose_left(second, first), attrs)
+    return variables | valmap(compose_left(second, first, as_scalar), attrs)
 
 
-def transform_line_metadata(metadata):
+def flatten_columns(columns):
+    def _flatten(columns, prefix):
+        for name, value in columns.items():
+            if isinstance(value, dict):
+                yield from _flatten(value, prefix=f"{prefix}{name}_")
+            else:
+                yield f"{prefix}{name}", value
+
+    return dict(_flatten(columns, prefix=""))
+
+
+line_translations = {
+    "sar_image_data_line_number": "rows",
+}
+
+
+def transform_line_columns(columns):
     ignored = [
         "preamble",
         "record_start",
-        "actual_count_of_left_fill_pixels",
-        "actual_count_of_right_fill_pixels",
-        "actual_count_of_data_pixels",
         "alos2_frame_number",
         "palsar_auxiliary_data",
         "data",
     ]
-    translations = {
-        "sar_image_data_line_number": "rows",
-    }
     dtype_overrides = {
         "sensor_acquisition_date": "datetime64[ns]",
         "sensor_acquisition_date_microseconds": "datetime64[ns]",
@@ -107,27 +136,48 @@ def transform_line_metadata(metadata):
         "received_pulse_polarization",
     }
     merged = pipe(
-        metadata,
-        curry(starcall, curry(merge_with, list)),
+        columns,
         curry(remove_spares),
         curry(dissoc, ignored),
-        curry(valmap, compose_left(separate_attrs, curry(cons, "rows"), tuple)),
+        curry(flatten_columns),
+        curry(valmap, compose_left(curry(cons, "rows"), tuple)),
         curry(deduplicate_attrs, known_attrs),
         curry(apply_overrides, dtype_overrides),
-        curry(rename, translations=translations),
+        curry(rename, translations=line_translations),
         curry(as_group),
     )
     return merged
 
 
+def line_field_paths(columns):
+    def _paths(columns, prefix):
+        for name, value in columns.items():
+            path = (*prefix, name)
+            if isinstance(value, dict):
+                yield from _paths(value, prefix=path)
+            else:
+                yield "_".join(path), path
+
+    return rename(dict(_paths(columns, prefix=())), translations=line_translations)
+
+
+def transform_line_metadata(metadata):
+    columns = pipe(
+        metadata,
+        curry(starcall, curry(merge_with, list)),
+        curry(valmap, separate_attrs),
+    )
+
+    return transform_line_columns(columns)
+
+
 dtypes = {
     "C*8": np.dtype("complex64"),
     "IU2": np.dtype("uint16"),
 }
 
 
-def transform_metadata(header, metadata):
-    byte_ranges = [(m["data"]["start"], m["data"]["stop"]) for m in metadata]
+def assemble_metadata(header, group, byte_ranges):
     type_code = extract_format_type(header)
 
     shape = extract_shape(header)
@@ -136,7 +186,6 @@ def transform_metadata(header, metadata):
         raise ValueError(f"unknown type code: {type_code}")
 
     header_attrs = extract_attrs(header)
-    group = transform_line_metadata(metadata)
     group.attrs |= header_attrs | {"coordinates": list(group.variables)}
 
     array_metadata = {
@@ -147,3 +196,29 @@ def transform_metadata(header, metadata):
     }
 
     return group, array_metadata
+
+
+def transform_metadata(header, metadata):
+    byte_ranges = [(m["data"]["start"], m["data"]["stop"]) for m in metadata]
+
+    return assemble_metadata(header, transform_line_metadata(metadata), byte_ranges)
+
+
+def transform_columns(header, columns):
+    start, _ = columns["data"]["start"]
+    stop, _ = columns["data"]["stop"]
+    byte_ranges = list(zip(start.tolist(), stop.tolist()))
+
+    return assemble_metadata(header, transform_line_columns(columns), byte_ranges)
+
+
+def transform_header(header):
+    group = Group(path=None, url=None, data={}, attrs={})
+
+    return assemble_metadata(header, group, compute_byte_ranges(header))
+
+
+def transform_first_record(header, columns):
+    group = transform_line_columns(columns)
+
+    return assemble_metadata(header, group, compute_byte_ranges(header))
@@ -1,6 +1,8 @@
+import numpy as np
 from construct import Bytes, Computed, Int32ub, Seek, Struct, Tell, this
 
-from ceos_alos2.common import record_preamble
+from ceos_alos2 import columns
+from ceos_alos2.common import record_preamble, record_preamble_dtype
 from ceos_alos2.datatypes import DatetimeYdms, Factor, Metadata, StripNullBytes
 from ceos_alos2.sar_image.enums import (
     pulse_polarization,
@@ -65,3 +67,90 @@ processed_data_record = Struct(
         "stop" / Seek(this._.record_start + this._.preamble.record_length),
     ),
 )
+
+processed_data_dtype = np.dtype(
+    [
+        ("preamble", record_preamble_dtype),
+        ("sar_image_data_line_number", ">u4"),
+        ("sar_image_data_record_index", ">u4"),
+        ("actual_count_of_left_fill_pixels", ">u4"),
+        ("actual_count_of_data_pixels", ">u4"),
+        ("actual_count_of_right_fill_pixels", ">u4"),
+        ("sensor_parameters_update_flag", ">u4"),
+        (
+            "sensor_acquisition_date",
+            [("year", ">u4"), ("day_of_year", ">u4"), ("milliseconds", ">u4")],
+        ),
+        ("sar_channel_id", ">u2"),
+        ("sar_channel_code", ">u2"),
+        ("transmitted_pulse_polarization", ">u2"),
+        ("received_pulse_polarization", ">u2"),
+        ("prf", ">u4"),
+        ("scan_id", ">u4"),
+        ("slant_range_to_first_pixel", ">u4"),
+        ("slant_range_to_mid_pixel", ">u4"),
+        ("slant_range_to_last_pixel", ">u4"),
+        ("doppler_centroid_value_at_first_pixel", ">u4"),
+        ("doppler_centroid_value_at_mid_pixel", ">u4"),
+        ("doppler_centroid_value_at_last_pixel", ">u4"),
+        ("azimuth_fm_rate_of_first_pixel", ">u4"),
+        ("azimuth_fm_rate_of_mid_pixel", ">u4"),
+        ("azimuth_fm_rate_of_last_pixel", ">u4"),
+        ("look_angle_of_nadir", ">u4"),
+        ("azimuth_squint_angle", ">u4"),
+        ("blanks1", "V20"),
+        ("geographic_reference_parameter_update_flag", ">u4"),
+        ("latitude_of_first_pixel", ">u4"),
+        ("latitude_of_center_pixel", ">u4"),
+        ("latitude_of_last_pixel", ">u4"),
+        ("longitude_of_first_pixel", ">u4"),
+        ("longitude_of_center_pixel", ">u4"),
+        ("longitude_of_last_pixel", ">u4"),
+        ("northing_of_first_pixel", ">u4"),
+        ("blanks2", "V4"),
+        ("northing_of_last_pixel", ">u4"),
+        ("easting_of_first_pixel", ">u4"),
+        ("blanks3", "V4"),
+        ("easting_of_last_pixel", ">u4"),
+        ("line_heading", ">u4"),
+        ("blanks4", "V8"),
+    ]
+)
+processed_data_decoders = {
+    "sensor_acquisition_date": columns.datetime_ydms,
+    "sar_channel_id": columns.Enum(sar_channel_id),
+    "sar_channel_code": columns.Enum(sar_channel_code),
+    "transmitted_pulse_polarization": columns.Enum(pulse_polarization),
+    "received_pulse_polarization": columns.Enum(pulse_polarization),
+    "prf": columns.Metadata(columns.native, units="mHz"),
+    "slant_range_to_first_pixel": columns.Metadata(columns.native, units="m"),
+    "slant_range_to_mid_pixel": columns.Metadata(columns.native, units="m"),
+    "slant_range_to_last_pixel": columns.Metadata(columns.native, units="m"),
+    "doppler_centroid_value_at_first_pixel": columns.Metadata(
+        columns.Factor(columns.native, 1e-3), units="Hz"
+    ),
+    "doppler_centroid_value_at_mid_pixel": columns.Metadata(
+        columns.Factor(columns.native, 1e-3), units="Hz"
+    ),
+    "doppler_centroid_value_at_last_pixel": columns.Metadata(
+        columns.Factor(columns.native, 1e-3), units="Hz"
+    ),
+    "azimuth_fm_rate_of_first_pixel": columns.Metadata(columns.native, units="Hz/ms"),
+    "azimuth_fm_rate_of_mid_pixel": columns.Metadata(columns.native, units="Hz/ms"),
+    "azimuth_fm_rate_of_last_pixel": columns.Metadata(columns.native, units="Hz/ms"),
+    "look_angle_of_nadir": columns.Metadata(columns.Factor(columns.native, 1e-6), units="deg"),
+    "azimuth_squint_angle": columns.Metadata(columns.Factor(columns.native, 1e-6), units="deg"),
+    "latitude_of_first_pixel": columns.Metadata(columns.Factor(columns.native, 1e-6), units="deg"),
+    "latitude_of_center_pixel": columns.Metadata(columns.Factor(columns.native, 1e-6), units="deg"),
+    "latitude_of_last_pixel": columns.Metadata(columns.Factor(columns.native, 1e-6), units="deg"),
+    "longitude_of_first_pixel": columns.Metadata(columns.Factor(columns.native, 1e-6), units="deg"),
+    "longitude_of_center_pixel": columns.Metadata(
+        columns.Factor(columns.native, 1e-6), units="deg"
+    ),
+    "longitude_of_last_pixel": columns.Metadata(columns.Factor(columns.native, 1e-6), units="deg"),
+    "northing_of_first_pixel": columns.Metadata(columns.native, units="m"),
+    "northing_of_last_pixel": columns.Metadata(columns.native, units="m"),
+    "easting_of_first_pixel": columns.Metadata(columns.native, units="m"),
+    "easting_of_last_pixel": columns.Metadata(columns.native, units="m"),
+    "line_heading": columns.Metadata(columns.Factor(columns.native, 1e-6), units="deg"),
+}
@@ -1,6 +1,8 @@
+import numpy as np
 from construct import Bytes, Computed, Int32ub, Int64ub, Seek, Struct, Tell, this
 
-from ceos_alos2.common import record_preamble
+from ceos_alos2 import columns
+from ceos_alos2.common import record_preamble, record_preamble_dtype
 from ceos_alos2.datatypes import (
     DatetimeYdms,
     DatetimeYdus,
@@ -105,3 +107,119 @@ signal_data_record = Struct(
         "stop" / Seek(this._.record_start + this._.preamble.record_length),
     ),
 )
+
+signal_data_dtype = np.dtype(
+    [
+        ("preamble", record_preamble_dtype),
+        ("sar_image_data_line_number", ">u4"),
+        ("sar_image_data_record_index", ">u4"),
+        ("actual_count_of_left_fill_pixels", ">u4"),
+        ("actual_count_of_data_pixels", ">u4"),
+        ("actual_count_of_right_fill_pixels", ">u4"),
+        ("sensor_parameters_update_flag", ">u4"),
+        (
+            "sensor_acquisition_date",
+            [("year", ">u4"), ("day_of_year", ">u4"), ("milliseconds", ">u4")],
+        ),
+        ("sar_channel_id", ">u2"),
+        ("sar_channel_code", ">u2"),
+        ("transmitted_pulse_polarization", ">u2"),
+        ("received_pulse_polarization", ">u2"),
+        ("prf", ">u4"),
+        ("scan_id", ">u4"),
+        ("onboard_range_compressed_flag", ">u2"),
+        ("chirp_type_designator", ">u2"),
+        ("chirp_length", ">u4"),
+        ("chirp_constant_coefficient", ">u4"),
+        ("chirp_linear_coefficient", ">u4"),
+        ("chirp_quadratic_coefficient", ">u4"),
+        ("sensor_acquisition_date_microseconds", ">u8"),
+        ("receiver_gain", ">u4"),
+        ("invalid_line_flag", ">u4"),
+        ("elevation_angle_at_nadir_of_antenna", [("electronic", ">u4"), ("mechanic", ">u4")]),
+        ("antenna_squint_angle", [("electronic", ">u4"), ("mechanic", ">u4")]),
+        ("slant_range_to_first_data_sample", ">u4"),
+        ("data_record_window_position", ">u4"),
+        ("blanks1", "V4"),
+        ("platform_position_parameters_update_flag", ">u4"),
+        ("platform_latitude", ">u4"),
+        ("platform_longitude", ">u4"),
+        ("platform_altitude", ">u4"),
+        ("platform_ground_speed", ">u4"),
+        ("platform_velocity", [("x", ">u4"), ("y", ">u4"), ("z", ">u4")]),
+        ("platform_acceleration", [("x", ">u4"), ("y", ">u4"), ("z", ">u4")]),
+        ("platform_track_angle", ">u4"),
+        ("platform_true_track_angle", ">u4"),
+        ("platform_attitude", [("pitch", ">u4"), ("roll", ">u4"), ("yaw", ">u4")]),
+        ("latitude_of_first_pixel", ">u4"),
+        ("latitude_of_center_pixel", ">u4"),
+        ("latitude_of_last_pixel", ">u4"),
+        ("longitude_of_first_pixel", ">u4"),
+        ("longitude_of_center_pixel", ">u4"),
+        ("longitude_of_last_pixel", ">u4"),
+        ("burst_number", ">u4"),
+        ("line_number_in_this_burst", ">u4"),
+        ("blanks2", "V60"),
+        ("alos2_frame_number", ">u4"),
+        ("palsar_auxiliary_data", "V256"),
+    ]
+)
+signal_data_decoders = {
+    "sensor_acquisition_date": columns.datetime_ydms,
+    "sar_channel_id": columns.Enum(sar_channel_id),
+    "sar_channel_code": columns.Enum(sar_channel_code),
+    "transmitted_pulse_polarization": columns.Enum(pulse_polarization),
+    "received_pulse_polarization": columns.Enum(pulse_polarization),
+    "prf": columns.Metadata(columns.native, units="mHz"),
+    "onboard_range_compressed_flag": columns.flag,
+    "chirp_type_designator": columns.Enum(chirp_type_designator),
+    "chirp_length": columns.Metadata(columns.native, units="ns"),
+    "chirp_constant_coefficient": columns.Metadata(columns.native, units="Hz"),
+    "chirp_linear_coefficient": columns.Metadata(columns.native, units="Hz/µs"),
+    "chirp_quadratic_coefficient": columns.Metadata(columns.native, units="Hz/µs^2"),
+    "sensor_acquisition_date_microseconds": columns.DatetimeYdus("sensor_acquisition_date"),
+    "receiver_gain": columns.Metadata(columns.native, units="dB"),
+    "invalid_line_flag": columns.flag,
+    "elevation_angle_at_nadir_of_antenna": {
+        "electronic": columns.Metadata(columns.native, units="deg"),
+        "mechanic": columns.Metadata(columns.native, units="deg"),
+    },
+    "antenna_squint_angle": {
+        "electronic": columns.Metadata(columns.native, units="deg"),
+        "mechanic": columns.Metadata(columns.native, units="deg"),
+    },
+    "slant_range_to_first_data_sample": columns.Metadata(columns.native, units="m"),
+    "data_record_window_position": columns.Metadata(columns.native, units="ns"),
+    "platform_position_parameters_update_flag": columns.Enum(platform_position_parameters_update),
+    "platform_latitude": columns.Metadata(columns.Factor(columns.native, 1e-6), units="deg"),
+    "platform_longitude": columns.Metadata(columns.Factor(columns.native, 1e-6), units="deg"),
+    "platform_altitude": columns.Metadata(columns.native, units="deg"),
+    "platform_ground_speed": columns.Metadata(columns.native, units="cm/s"),
+    "platform_velocity": {
+        "x": columns.Metadata(columns.native, units="cm/s"),
+        "y": columns.Metadata(columns.native, units="cm/s"),
+        "z": columns.Metadata(columns.native, units="cm/s"),
+    },
+    "platform_acceleration": {
+        "x": columns.Metadata(columns.native, units="cm/s^2"),
+        "y": columns.Metadata(columns.native, units="cm/s^2"),
+        "z": columns.Metadata(columns.native, units="cm/s^2"),
+    },
+    "platform_track_angle": columns.Metadata(columns.Factor(columns.native, 1e-6), units="deg"),
+    "platform_true_track_angle": columns.Metadata(
+        columns.Factor(columns.native, 1e-6), units="deg"
+    ),
+    "platform_attitude": {
+        "pitch": columns.Metadata(columns.Factor(columns.native, 1e-6), units="deg"),
+        "roll": columns.Metadata(columns.Factor(columns.native, 1e-6), units="deg"),
+        "yaw": columns.Metadata(columns.Factor(columns.native, 1e-6), units="deg"),
+    },
+    "latitude_of_first_pixel": columns.Metadata(columns.Factor(columns.native, 1e-6), units="deg"),
+    "latitude_of_center_pixel": columns.Metadata(columns.Factor(columns.native, 1e-6), units="deg"),
+    "latitude_of_last_pixel": columns.Metadata(columns.Factor(columns.native, 1e-6), units="deg"),
+    "longitude_of_first_pixel": columns.Metadata(columns.Factor(columns.native, 1e-6), units="deg"),
+    "longitude_of_center_pixel": columns.Metadata(
+        columns.Factor(columns.native, 1e-6), units="deg"
+    ),
+    "longitude_of_last_pixel": columns.Metadata(columns.Factor(columns.native, 1e-6), units="deg"),
+}
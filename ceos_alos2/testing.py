@@ -6,7 +6,13 @@ from tlz.dicttoolz import merge_with, valfilter, valmap
 from tlz.functoolz import curry, pipe
 from tlz.itertoolz import cons, groupby
 
-from ceos_alos2.array import Array
+from ceos_alos2.array import (
+    Array,
+    FieldArray,
+    MultilookedArray,
+    ValidityMask,
+    lazy_array_types,
+)
 from ceos_alos2.dicttoolz import valsplit, zip_default
 from ceos_alos2.hierarchy import Group, Variable
 
@@ -40,14 +46,43 @@ def format_item(x):
     return repr(x.item())
 
 
+def format_url(arr):
+    return f"{arr.fs.fs.protocol}://" + arr.fs.sep.join([arr.fs.path, arr.url])
+
+
 def format_array(arr):
     if isinstance(arr, Array):
-        url = f"{arr.fs.fs.protocol}://" + arr.fs.sep.join([arr.fs.path, arr.url])
+        url = format_url(arr)
         lines = [
             f"Array(shape={arr.shape}, dtype={arr.dtype}, rpc={arr.records_per_chunk})",
             f"    url: {url}",
         ]
 
+        return newline.join(lines)
+    elif isinstance(arr, FieldArray):
+        url = format_url(arr)
+        lines = [
+            f"FieldArray(shape={arr.shape}, dtype={arr.dtype}, rpc={arr.records_per_chunk})",
+            f"    url: {url}",
+            f"    path: {'/'.join(arr.path)}",
+        ]
+
+        return newline.join(lines)
+    elif isinstance(arr, MultilookedArray):
+        url = format_url(arr.array)
+        lines = [
+            f"MultilookedArray(shape={arr.shape}, dtype={arr.dtype}, looks={arr.looks})",
+            f"    url: {url}",
+        ]
+
+        return newline.join(lines)
+    elif isinstance(arr, ValidityMask):
+        url = format_url(arr.array)
+        lines = [
+            f"ValidityMask(shape={arr.shape})",
+            f"    url: {url}",
+        ]
+
         return newline.join(lines)
 
     flattened = np.reshape(arr, (-1,))
@@ -130,7 +165,7 @@ def compare_data(a, b):
     if type(a) is not type(b):
         return False
 
-    if isinstance(a, Array):
+    if isinstance(a, lazy_array_types):
         return a == b
     else:
         return a.shape == b.shape and np.all(a == b)
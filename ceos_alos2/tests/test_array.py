@@ -1,11 +1,16 @@
+import asyncio
+import dataclasses
 import io
+import pickle
+import threading
 
 import fsspec
 import numpy as np
 import pytest
+from fsspec.implementations.asyn_wrapper import AsyncFileSystemWrapper
 from fsspec.implementations.dirfs import DirFileSystem
 
-from ceos_alos2 import array
+from ceos_alos2 import array, blocks, columns
 
 
 @pytest.mark.parametrize(
@@ -67,6 +72,22 @@ def test_to_offset_size(ranges, expected):
     assert actual == expected
 
 
+@pytest.mark.parametrize(
+    ["indexer", "expected"],
+    (
+        pytest.param(2, [2], id="scalar-positive"),
+        pytest.param(-1, [3], id="scalar-negative"),
+        pytest.param([0, -1, 1], [0, 3, 1], id="list"),
+        pytest.param(slice(1, None), [1, 2, 3], id="slice"),
+        pytest.param(slice(None, None, -2), [3, 1], id="slice-negative_step"),
+    ),
+)
+def test_compute_selected_rows(indexer, expected):
+    actual = array.compute_selected_rows(4, indexer)
+
+    assert actual == expected
+
+
 @pytest.mark.parametrize(
     ["indexer", "expected"],
     (
@@ -103,16 +124,263 @@ def test_compute_selected_ranges(indexer, expected):
 
 
 @pytest.mark.parametrize(
-    ["chunksize", "expected"],
+    ["ranges", "max_gap", "expected_requests", "expected_membership"],
+    (
+        pytest.param([(0, 4)], 0, [(0, 4)], [0], id="single"),
+        pytest.param([(0, 4), (4, 8)], 0, [(0, 8)], [0, 0], id="adjacent"),
+        pytest.param([(0, 4), (6, 8)], 1, [(0, 4), (6, 8)], [0, 1], id="gap-too_large"),
+        pytest.param([(0, 4), (6, 8)], 2, [(0, 8)], [0, 0], id="gap"),
+        pytest.param([(20, 24), (0, 4), (6, 8)], 2, [(0, 8), (20, 24)], [1, 0, 0], id="unordered"),
+        pytest.param([(0, 8), (2, 4)], 0, [(0, 8)], [0, 0], id="overlapping"),
+    ),
+)
+def test_coalesce_ranges(ranges, max_gap, expected_requests, expected_membership):
+    actual_requests, actual_membership = array.coalesce_ranges(ranges, max_gap=max_gap)
+
+    assert actual_requests == expected_requests
+    assert actual_membership == expected_membership
+
+
+@pytest.mark.parametrize(
+    ["columns_per_chunk", "expected"],
+    (
+        pytest.param(None, 20, id="none"),
+        pytest.param(-1, 20, id="all"),
+        pytest.param(8, 8, id="columns"),
+        pytest.param(30, 20, id="too_large"),
+        pytest.param("64B", 4, id="bytes"),
+        pytest.param("4B", 1, id="bytes-too_small"),
+    ),
+)
+def test_determine_columns_per_chunk(columns_per_chunk, expected):
+    actual = array.determine_columns_per_chunk(
+        columns_per_chunk, "complex64", records_per_chunk=2, n_columns=20
+    )
+
+    assert actual == expected
+
+
+@pytest.mark.parametrize(
+    ["values", "kwargs", "expected"],
+    (
+        pytest.param(
+            np.array([3 + 4j], dtype=">c8"), {"quantity": None}, np.array([3 + 4j]), id="none"
+        ),
+        pytest.param(
+            np.array([3 + 4j], dtype=">c8"),
+            {"quantity": "intensity", "scale": 0.1},
+            np.array([2.5]),
+            id="scale",
+        ),
+        pytest.param(
+            np.array([3 + 4j, 0], dtype=">c8"),
+            {"quantity": "intensity", "scale": 4.0, "decibel": True},
+            np.array([20, -np.inf]),
+            id="decibel",
+        ),
+        pytest.param(
+            np.array([1000], dtype=">u2"),
+            {"quantity": "intensity"},
+            np.array([1e6]),
+            id="unsigned_int",
+        ),
+    ),
+)
+def test_derive(values, kwargs, expected):
+    actual = array.derive(values, **kwargs)
+
+    np.testing.assert_allclose(actual, expected)
+
+
+@pytest.mark.parametrize(
+    ["rows", "expected"],
+    (
+        pytest.param([], [], id="empty"),
+        pytest.param([0, 1, 2, 3, 4], [[0, 1, 2], [3, 4]], id="chunks"),
+        pytest.param([1, 2, 4], [[1, 2], [4]], id="gap"),
+        pytest.param([2, 1, 0], [[2], [1], [0]], id="decreasing"),
+    ),
+)
+def test_consecutive_runs(rows, expected):
+    actual = array.consecutive_runs(rows, chunksize=3)
+
+    assert actual == expected
+
+
+@pytest.mark.parametrize(
+    ["looks", "expected"],
+    (
+        pytest.param([2, 8], (2, 8), id="list"),
+        pytest.param((1, 1), (1, 1), id="tuple"),
+        pytest.param((2,), ValueError("invalid number of looks"), id="too_few"),
+        pytest.param((0, 2), ValueError("invalid number of looks"), id="zero"),
+        pytest.param((1.5, 2), ValueError("invalid number of looks"), id="float"),
+    ),
+)
+def test_normalize_looks(looks, expected):
+    if isinstance(expected, Exception):
+        with pytest.raises(type(expected), match=expected.args[0]):
+            array.normalize_looks(looks)
+
+        return
+
+    assert array.normalize_looks(looks) == expected
+
+
+@pytest.mark.parametrize(
+    ["n_rows", "max_workers", "expected"],
+    (
+        pytest.param(4, 2, [slice(0, 2), slice(2, 4)], id="even"),
+        pytest.param(5, 2, [slice(0, 3), slice(3, 6)], id="uneven"),
+        pytest.param(2, 4, [slice(0, 1), slice(1, 2)], id="more_workers"),
+    ),
+)
+def test_map_row_batches(n_rows, max_workers, expected):
+    batches = []
+
+    array.map_row_batches(batches.append, n_rows, max_workers=max_workers)
+
+    assert sorted(batches, key=lambda batch: batch.start) == expected
+
+
+def test_map_row_batches_shared_pool(monkeypatch):
+    executor = array.SharedExecutor(max_workers=2)
+    monkeypatch.setattr(array, "decode_executor", executor)
+
+    threads = set()
+
+    def func(batch):
+        threads.add(threading.get_ident())
+
+    array.map_row_batches(func, 8, max_workers=4)
+    pool = executor.get()
+    array.map_row_batches(func, 8, max_workers=4)
+
+    assert executor.get() is pool
+    assert len(threads) <= 2
+
+
+def test_shared_executor_fork(monkeypatch):
+    executor = array.SharedExecutor(max_workers=1)
+    pool = executor.get()
+
+    monkeypatch.setattr(array.os, "getpid", lambda: -1)
+
+    assert executor.get() is not pool
+
+
+@pytest.mark.parametrize(
+    ["byte_ranges", "expected"],
+    (
+        pytest.param([], None, id="empty"),
+        pytest.param([(10, 20)], 10, id="single"),
+        pytest.param([(10, 20), (30, 40), (50, 60)], 20, id="regular"),
+        pytest.param([(10, 20), (20, 30)], 10, id="contiguous"),
+        pytest.param([(10, 20), (30, 40), (55, 65)], None, id="irregular_steps"),
+        pytest.param([(10, 20), (30, 45)], None, id="irregular_sizes"),
+        pytest.param([(10, 20), (15, 25)], None, id="overlapping"),
+    ),
+)
+def test_compute_stride(byte_ranges, expected):
+    actual = array.compute_stride(byte_ranges)
+
+    assert actual == expected
+
+
+@pytest.mark.parametrize(
+    ["fs", "expected"],
+    (
+        pytest.param(DirFileSystem(fs=fsspec.filesystem("file"), path="/a"), "/a/b", id="local"),
+        pytest.param(DirFileSystem(fs=fsspec.filesystem("memory"), path="/a"), None, id="memory"),
+        pytest.param(fsspec.filesystem("file"), None, id="no_dirfs"),
+    ),
+)
+def test_local_path(fs, expected):
+    actual = array.local_path(fs, "b")
+
+    assert actual == expected
+
+
+@pytest.mark.parametrize(
+    ["indexer", "expected_window", "expected_indexer"],
+    (
+        pytest.param(slice(None), slice(0, 10), slice(0, 10, 1), id="slice-full"),
+        pytest.param(slice(2, 5), slice(2, 5), slice(0, 3, 1), id="slice-window"),
+        pytest.param(slice(1, 8, 3), slice(1, 8), slice(0, 7, 3), id="slice-step"),
+        pytest.param(slice(7, 2, -2), slice(3, 8), slice(4, None, -2), id="slice-negative_step"),
+        pytest.param(slice(4, 2), slice(0, 10), slice(4, 2), id="slice-empty"),
+        pytest.param(6, slice(6, 7), 0, id="int"),
+        pytest.param(-1, slice(9, 10), 0, id="int-negative"),
+        pytest.param([5, 3, 7], slice(3, 8), [2, 0, 4], id="list"),
+    ),
+)
+def test_compute_column_window(indexer, expected_window, expected_indexer):
+    actual_window, actual_indexer = array.compute_column_window(10, indexer)
+
+    assert actual_window == expected_window
+    assert actual_indexer == expected_indexer
+
+    data = np.arange(10)
+    np.testing.assert_equal(data[actual_window][actual_indexer], data[indexer])
+
+
+@pytest.mark.parametrize(
+    ["window", "expected_ranges", "expected_offsets"],
+    (
+        pytest.param(slice(0, 10), [(0, (108, 116)), (1, (200, 220))], [4, 0], id="full"),
+        pytest.param(slice(5, 8), [(0, (110, 116)), (1, (210, 216))], [0, 0], id="window"),
+        pytest.param(slice(0, 3), [(0, (106, 106)), (1, (200, 206))], [3, 0], id="fill-only"),
+    ),
+)
+def test_crop_to_spans(window, expected_ranges, expected_offsets):
+    selected = [(0, (100, 120)), (1, (200, 220))]
+    spans = np.array([[4, 8], [0, 10]])
+
+    actual_ranges, actual_offsets = array.crop_to_spans(selected, spans, window, itemsize=2)
+
+    assert actual_ranges == expected_ranges
+    assert actual_offsets == expected_offsets
+
+
+@pytest.mark.parametrize(
+    ["ranges", "expected"],
+    (
+        pytest.param([(4, 4), (10, 10)], True, id="fill"),
+        pytest.param([(4, 4), (10, 12)], False, id="data"),
+    ),
+)
+def test_only_fill(ranges, expected):
+    assert array.only_fill(ranges) == expected
+
+
+def test_crop_range():
+    actual = array.crop_range((100, 140), slice(2, 5), itemsize=4)
+
+    assert actual == (108, 120)
+
+
+@pytest.mark.parametrize(
+    ["chunksize", "rows", "expected"],
     (
-        pytest.param(2, {0: [(0, 3), (3, 6)], 1: [(6, 9), (9, 12)], 2: [(12, 15), (15, 18)]}),
-        pytest.param(3, {0: [(0, 3), (3, 6), (6, 9)], 1: [(9, 12), (12, 15), (15, 18)]}),
+        pytest.param(
+            2,
+            [0, 1, 2, 3, 4, 5],
+            [(0, [(0, 3), (3, 6)]), (1, [(6, 9), (9, 12)]), (2, [(12, 15), (15, 18)])],
+        ),
+        pytest.param(
+            3,
+            [0, 1, 2, 3, 4, 5],
+            [(0, [(0, 3), (3, 6), (6, 9)]), (1, [(9, 12), (12, 15), (15, 18)])],
+        ),
+        pytest.param(
+            2, [5, 0, 4], [(2, [(15, 18)]), (0, [(0, 3)]), (2, [(12, 15)])], id="unordered"
+        ),
     ),
 )
-def test_groupby_chunks(chunksize, expected):
+def test_groupby_chunks(chunksize, rows, expected):
     byte_ranges = [(0, 3), (3, 6), (6, 9), (9, 12), (12, 15), (15, 18)]
 
-    actual = array.groupby_chunks(list(enumerate(byte_ranges)), chunksize)
+    actual = array.groupby_chunks([(row, byte_ranges[row]) for row in rows], chunksize)
 
     assert actual == expected
 
@@ -121,12 +389,12 @@ def test_groupby_chunks(chunksize, expected):
     ["selected", "expected"],
     (
         pytest.param(
-            {0: [(0, 5), (6, 9)], 2: [(26, 28), (28, 30)]},
-            [((0, 12), [(0, 5), (6, 9)]), ((26, 5), [(26, 28), (28, 30)])],
+            [(0, [(0, 5), (6, 9)]), (2, [(26, 28), (28, 30)])],
+            [(0, (0, 12), [(0, 5), (6, 9)]), (2, (26, 5), [(26, 28), (28, 30)])],
         ),
         pytest.param(
-            {1: [(17, 18), (19, 23)], 3: [(38, 41), (41, 45), (46, 48)]},
-            [((17, 8), [(17, 18), (19, 23)]), ((37, 10), [(38, 41), (41, 45), (46, 48)])],
+            [(1, [(17, 18), (19, 23)]), (3, [(38, 41), (41, 45), (46, 48)])],
+            [(1, (17, 8), [(17, 18), (19, 23)]), (3, (37, 10), [(38, 41), (41, 45), (46, 48)])],
         ),
     ),
 )
@@ -190,7 +458,7 @@ def test_read_chunk(offset, size):
         pytest.param(
             b"\x00\x01",
             "IU2",
-            np.array([1], dtype="int16"),
+            np.array([1], dtype="uint16"),
             id="unsigned_int",
         ),
         pytest.param(
@@ -199,6 +467,12 @@ def test_read_chunk(offset, size):
             np.array([0 + 0j], dtype="complex64"),
             id="complex",
         ),
+        pytest.param(
+            b"\x3f\x80\x00\x00\xc0\x00\x00\x00\x40\x40\x00\x00\x00\x00\x00\x00",
+            "C*8",
+            np.array([1 - 2j, 3 + 0j], dtype="complex64"),
+            id="complex-values",
+        ),
     ),
 )
 def test_parse_data(content, type_code, expected):
@@ -209,10 +483,35 @@ def test_parse_data(content, type_code, expected):
         return
 
     actual = array.parse_data(content, type_code)
+    out = np.zeros_like(expected)
+    array.parse_data(content, type_code, out=out)
 
+    np.testing.assert_equal(out, expected)
+    assert actual.dtype.kind == expected.dtype.kind
+    assert actual.dtype.itemsize == expected.dtype.itemsize
     np.testing.assert_allclose(actual, expected)
 
 
+@pytest.mark.parametrize(
+    ["quantity", "expected"],
+    (
+        pytest.param("intensity", np.array([5, 9], dtype="float32"), id="intensity"),
+        pytest.param("amplitude", np.array([5**0.5, 3], dtype="float32"), id="amplitude"),
+        pytest.param("phase", np.array([np.arctan2(-2, 1), 0], dtype="float32"), id="phase"),
+    ),
+)
+def test_parse_data_derived(quantity, expected):
+    content = b"\x3f\x80\x00\x00\xc0\x00\x00\x00\x40\x40\x00\x00\x00\x00\x00\x00"
+
+    actual = array.parse_data(content, "C*8", quantity=quantity)
+    out = np.zeros_like(expected)
+    array.parse_data(content, "C*8", out=out, quantity=quantity)
+
+    assert actual.dtype == np.dtype("float32")
+    np.testing.assert_allclose(actual, expected, rtol=1e-6)
+    np.testing.assert_allclose(out, expected, rtol=1e-6)
+
+
 class TestArray:
     @pytest.mark.parametrize("shape", ((2, 10), (4, 10), (2, 20), (4, 20)))
     @pytest.mark.parametrize("dtype", ("uint16", "complex64"))
@@ -495,6 +794,34 @@ class TestArray:
                 (4, 3, 3),
                 id="3D-4",
             ),
+            pytest.param(
+                array.Array(
+                    fs=DirFileSystem(fs=fsspec.filesystem("memory"), path="/a"),
+                    url="image-file1",
+                    byte_ranges=[(0, 40), (40, 80), (80, 120), (120, 160)],
+                    shape=(4, 20),
+                    dtype="uint16",
+                    records_per_chunk=2,
+                    columns_per_chunk=8,
+                    type_code="IU2",
+                ),
+                (2, 8),
+                id="2D-columns",
+            ),
+            pytest.param(
+                array.Array(
+                    fs=DirFileSystem(fs=fsspec.filesystem("memory"), path="/a"),
+                    url="image-file1",
+                    byte_ranges=[(0, 40), (40, 80), (80, 120), (120, 160)],
+                    shape=(4, 20),
+                    dtype="uint16",
+                    records_per_chunk=2,
+                    columns_per_chunk="20B",
+                    type_code="IU2",
+                ),
+                (2, 5),
+                id="2D-column_bytes",
+            ),
         ),
     )
     def test_chunks(self, arr, expected):
@@ -574,3 +901,1014 @@ class TestArray:
         expected = data[indexers]
 
         np.testing.assert_equal(actual, expected)
+
+    def test_getitem_block_store(self, tmp_path):
+        fs = DirFileSystem(fs=fsspec.filesystem("memory"), path="/block-store")
+        url = "image-file"
+        data = np.arange(40, dtype="uint16").reshape(4, 10)
+        byte_ranges = [(index * 20, (index + 1) * 20) for index in range(4)]
+
+        block_store = blocks.BlockStore(root=tmp_path)
+        encoded = data.astype(">u2").tobytes()
+        block_store.put(blocks.block_url(fs, url), 0, encoded[:40])
+
+        # chunk 1 is not in the store and has to be read from the file
+        with fs.open(url, mode="wb") as f:
+            f.write(b"\x00" * 40 + encoded[40:])
+
+        arr = array.Array(
+            fs=fs,
+            url=url,
+            byte_ranges=byte_ranges,
+            shape=data.shape,
+            dtype=data.dtype,
+            type_code="IU2",
+            records_per_chunk=2,
+            block_store=block_store,
+        )
+
+        actual = arr[(slice(None), slice(None))]
+
+        np.testing.assert_equal(actual, data)
+
+    @pytest.mark.parametrize(
+        ["indexers", "max_gap", "expected_requests"],
+        (
+            pytest.param(
+                (slice(None), slice(2, 5)),
+                0,
+                [(24, 30), (64, 70), (104, 110), (144, 150)],
+                id="narrow-no_gap",
+            ),
+            pytest.param(
+                (slice(None), slice(2, 5)), None, [(24, 70), (104, 150)], id="narrow-default_gap"
+            ),
+            pytest.param(
+                (slice(None), slice(None)), None, [(20, 80), (100, 160)], id="wide-default_gap"
+            ),
+            pytest.param(
+                (slice(None), slice(None)),
+                "10B",
+                [(20, 40), (60, 80), (100, 120), (140, 160)],
+                id="wide-small_gap",
+            ),
+            pytest.param(
+                (slice(None, None, 3), slice(None)), None, [(20, 40), (140, 160)], id="strided"
+            ),
+        ),
+    )
+    def test_getitem_requests(self, monkeypatch, indexers, max_gap, expected_requests):
+        fs = DirFileSystem(fs=fsspec.filesystem("memory"), path="/column-subset")
+        url = "image-file"
+        data = np.arange(40, dtype="uint16").reshape(4, 10)
+        encoded = data.astype(">u2").tobytes()
+        # 20 bytes of prefix before each line
+        content = b"".join(b"\x00" * 20 + encoded[i * 20 : (i + 1) * 20] for i in range(4))
+        byte_ranges = [(index * 40 + 20, (index + 1) * 40) for index in range(4)]
+
+        with fs.open(url, mode="wb") as f:
+            f.write(content)
+
+        requested = []
+        cat_ranges = fs.cat_ranges
+        read_chunk = array.read_chunk
+
+        def spy_cat_ranges(paths, starts, ends, **kwargs):
+            requested.extend(zip(starts, ends))
+
+            return cat_ranges(paths, starts, ends, **kwargs)
+
+        def spy_read_chunk(f, offset, size):
+            requested.append((offset, offset + size))
+
+            return read_chunk(f, offset, size)
+
+        monkeypatch.setattr(fs, "cat_ranges", spy_cat_ranges)
+        monkeypatch.setattr(array, "read_chunk", spy_read_chunk)
+
+        arr = array.Array(
+            fs=fs,
+            url=url,
+            byte_ranges=byte_ranges,
+            shape=data.shape,
+            dtype=data.dtype,
+            type_code="IU2",
+            records_per_chunk=2,
+            max_gap=max_gap,
+        )
+
+        actual = arr[indexers]
+
+        np.testing.assert_equal(actual, data[indexers])
+        assert sorted(requested) == expected_requests
+
+    def test_getitem_column_chunks(self, monkeypatch):
+        fs = DirFileSystem(fs=fsspec.filesystem("memory"), path="/column-chunks")
+        data = np.arange(40, dtype="uint16").reshape(2, 20)
+        encoded = data.astype(">u2").tobytes()
+        fs.pipe(
+            "image-file", b"".join(b"\x00" * 8 + encoded[i * 40 : (i + 1) * 40] for i in range(2))
+        )
+
+        requested = []
+        read_chunk = array.read_chunk
+
+        def spy_read_chunk(f, offset, size):
+            requested.append((offset, offset + size))
+
+            return read_chunk(f, offset, size)
+
+        monkeypatch.setattr(array, "read_chunk", spy_read_chunk)
+
+        arr = array.Array(
+            fs=fs,
+            url="image-file",
+            byte_ranges=[(i * 48 + 8, (i + 1) * 48) for i in range(2)],
+            shape=data.shape,
+            dtype=data.dtype,
+            type_code="IU2",
+            records_per_chunk=2,
+            columns_per_chunk=14,
+        )
+
+        # wider than the subset threshold, but within a column chunk
+        actual = arr[slice(None), slice(0, 14)]
+
+        np.testing.assert_equal(actual, data[:, :14])
+        # cropped to the column chunk instead of the full records, (8, 96)
+        assert requested == [(8, 84)]
+
+    def create_array(self):
+        fs = DirFileSystem(fs=fsspec.filesystem("memory"), path="/output-buffer")
+        url = "image-file"
+        data = (np.arange(80, dtype="float32") * (1 - 1j)).astype("complex64").reshape(4, 20)
+        encoded = data.astype(">c8").tobytes()
+        content = b"".join(b"\x00" * 16 + encoded[i * 160 : (i + 1) * 160] for i in range(4))
+        byte_ranges = [(index * 176 + 16, (index + 1) * 176) for index in range(4)]
+
+        with fs.open(url, mode="wb") as f:
+            f.write(content)
+
+        arr = array.Array(
+            fs=fs,
+            url=url,
+            byte_ranges=byte_ranges,
+            shape=data.shape,
+            dtype=data.dtype,
+            type_code="C*8",
+            records_per_chunk=3,
+        )
+
+        return arr, data
+
+    @pytest.mark.parametrize(
+        "indexers",
+        (
+            pytest.param((slice(None), slice(None)), id="full"),
+            pytest.param((slice(1, 3), slice(2, 5)), id="window"),
+            pytest.param((slice(None), slice(None, None, -3)), id="strided"),
+            pytest.param((2, slice(None)), id="int-row"),
+            pytest.param((slice(None), 4), id="int-column"),
+            pytest.param((1, 3), id="int-both"),
+            pytest.param((slice(3, 1), slice(None)), id="empty"),
+            pytest.param((np.array([3, 0, 2]), slice(None)), id="array-rows"),
+            pytest.param((np.array([1, 3]), np.array([15, 2, 7])), id="array-both"),
+            pytest.param((np.int64(1), np.array([0, 19])), id="numpy_int-row"),
+        ),
+    )
+    def test_read(self, indexers):
+        arr, data = self.create_array()
+        # outer indexing
+        expected = data[indexers[0], :][..., indexers[1]]
+
+        actual = arr[indexers]
+        assert actual.dtype == expected.dtype
+        np.testing.assert_equal(actual, expected)
+
+        out = np.zeros_like(expected)
+        actual = arr.read(indexers, out=out)
+        assert actual is out
+        np.testing.assert_equal(out, expected)
+
+    def test_read_shape_mismatch(self):
+        arr, _ = self.create_array()
+
+        with pytest.raises(ValueError, match="shape mismatch"):
+            arr.read((slice(None), slice(None)), out=np.zeros((3, 20), dtype="complex64"))
+
+    @pytest.mark.parametrize(
+        "indexers",
+        (
+            pytest.param((slice(None), slice(None)), id="full"),
+            pytest.param((slice(1, 3), slice(2, 5)), id="window"),
+            pytest.param((slice(None, None, -1), slice(None, None, -3)), id="reversed"),
+            pytest.param((2, slice(None)), id="int-row"),
+            pytest.param((slice(None), 4), id="int-column"),
+            pytest.param((slice(3, 1), slice(None)), id="empty"),
+            pytest.param((np.array([3, 0, 2]), np.array([15, 2, 7])), id="array"),
+        ),
+    )
+    def test_read_chunk_cache(self, indexers):
+        arr, data = self.create_array()
+        arr.chunk_cache = array.ChunkCache("1kB")
+        # outer indexing
+        expected = data[indexers[0], :][..., indexers[1]]
+
+        first = arr[indexers]
+        second = arr[indexers]
+
+        np.testing.assert_equal(first, expected)
+        np.testing.assert_equal(second, expected)
+        assert arr.chunk_cache.hits == arr.chunk_cache.misses
+        assert arr.chunk_cache.nbytes <= 1000
+
+    @pytest.mark.parametrize(
+        ["decode_threshold", "expected_parallel"],
+        (
+            pytest.param(None, False, id="default"),
+            pytest.param("0B", True, id="zero"),
+            pytest.param(False, False, id="disabled"),
+        ),
+    )
+    @pytest.mark.parametrize("cached", [False, True], ids=["uncached", "cached"])
+    def test_read_parallel_decode(self, monkeypatch, decode_threshold, expected_parallel, cached):
+        arr, data = self.create_array()
+        arr.decode_threshold = decode_threshold
+        arr.__post_init__()
+        if cached:
+            arr.chunk_cache = array.ChunkCache("1kB")
+        monkeypatch.setattr(array, "decode_workers", 2)
+
+        calls = []
+        map_row_batches = array.map_row_batches
+
+        def spy_map_row_batches(func, n_rows, max_workers):
+            calls.append(n_rows)
+
+            return map_row_batches(func, n_rows, max_workers)
+
+        monkeypatch.setattr(array, "map_row_batches", spy_map_row_batches)
+
+        actual = arr[slice(None), slice(2, 19)]
+
+        np.testing.assert_equal(actual, data[:, 2:19])
+        assert bool(calls) == expected_parallel
+
+    @pytest.mark.parametrize("quantity", ["intensity", "amplitude", "phase"])
+    @pytest.mark.parametrize(
+        "options",
+        (
+            pytest.param({}, id="requests"),
+            pytest.param({"chunk_cache": "1kB"}, id="chunk_cache"),
+            pytest.param({"decode_threshold": 0}, id="parallel"),
+        ),
+    )
+    def test_read_derived(self, quantity, options):
+        arr, data = self.create_array()
+        derived = dataclasses.replace(
+            arr,
+            quantity=quantity,
+            dtype=np.dtype("float32"),
+            chunk_cache=array.ChunkCache.from_option(options.get("chunk_cache")),
+            decode_threshold=options.get("decode_threshold"),
+        )
+        expected = array.derived_quantities[quantity](data[1:4, 2:19])
+
+        actual = derived[slice(1, 4), slice(2, 19)]
+
+        assert actual.dtype == np.dtype("float32")
+        np.testing.assert_allclose(actual, expected, rtol=1e-6)
+
+    def test_init_unknown_quantity(self):
+        arr, _ = self.create_array()
+
+        with pytest.raises(ValueError, match="unknown derived quantity"):
+            dataclasses.replace(arr, quantity="coherence")
+
+    def test_init_memmap_remote(self):
+        arr, _ = self.create_array()
+
+        with pytest.raises(ValueError, match="can only map local files"):
+            dataclasses.replace(arr, memmap=True)
+
+    @pytest.mark.parametrize(
+        ["options", "expected"],
+        (
+            pytest.param({}, True, id="default"),
+            pytest.param({"memmap": False}, False, id="disabled"),
+            pytest.param({"chunk_cache": array.ChunkCache("1MB")}, False, id="chunk_cache"),
+            pytest.param({"readahead": array.Readahead(2)}, False, id="readahead"),
+            pytest.param(
+                {"memmap": True, "chunk_cache": array.ChunkCache("1MB")}, True, id="explicit"
+            ),
+        ),
+    )
+    def test_init_memmap_local(self, tmp_path, options, expected):
+        fs = DirFileSystem(fs=fsspec.filesystem("file"), path=str(tmp_path))
+        fs.pipe("image-file", b"\x00" * 80)
+
+        arr = array.Array(
+            fs=fs,
+            url="image-file",
+            byte_ranges=[(i * 20, (i + 1) * 20) for i in range(4)],
+            shape=(4, 10),
+            dtype="uint16",
+            type_code="IU2",
+            records_per_chunk=2,
+            **options,
+        )
+
+        assert arr.memmap == expected
+
+    @pytest.mark.parametrize("type_code", ["IU2", "C*8"])
+    @pytest.mark.parametrize(
+        "indexers",
+        (
+            pytest.param((slice(None), slice(None)), id="full"),
+            pytest.param((slice(1, 3), slice(2, 5)), id="window"),
+            pytest.param((slice(None, None, -1), slice(None, None, -3)), id="reversed"),
+            pytest.param((2, slice(None)), id="int-row"),
+            pytest.param((slice(None), 4), id="int-column"),
+            pytest.param((np.array([3, 0, 2]), np.array([15, 2, 7])), id="array"),
+        ),
+    )
+    def test_read_mapped(self, tmp_path, type_code, indexers):
+        dtype = {"IU2": np.dtype("uint16"), "C*8": np.dtype("complex64")}[type_code]
+        data = np.arange(80).astype(dtype).reshape(4, 20)
+        encoded = data.astype(dtype.newbyteorder(">")).tobytes()
+        size = len(encoded) // 4
+        (tmp_path / "image-file").write_bytes(
+            b"".join(b"\x00" * 12 + encoded[i * size : (i + 1) * size] for i in range(4))
+        )
+
+        fs = DirFileSystem(fs=fsspec.filesystem("file"), path=str(tmp_path))
+        arr = array.Array(
+            fs=fs,
+            url="image-file",
+            byte_ranges=[(i * (size + 12) + 12, (i + 1) * (size + 12)) for i in range(4)],
+            shape=data.shape,
+            dtype=dtype,
+            type_code=type_code,
+            records_per_chunk=2,
+        )
+        expected = data[indexers[0], :][..., indexers[1]]
+
+        assert arr.memmap
+        assert arr.stride == size + 12
+
+        actual = arr[indexers]
+        assert actual.dtype == dtype
+        np.testing.assert_equal(actual, expected)
+
+        out = np.zeros_like(expected)
+        assert arr.read(indexers, out=out) is out
+        np.testing.assert_equal(out, expected)
+
+        unpickled = pickle.loads(pickle.dumps(arr))
+        assert unpickled._view is None
+        np.testing.assert_equal(unpickled[indexers], expected)
+
+        arr.decode_threshold = 0
+        np.testing.assert_equal(arr[indexers], expected)
+
+        if type_code == "C*8":
+            derived = dataclasses.replace(arr, quantity="amplitude", dtype=np.dtype("float32"))
+            np.testing.assert_allclose(derived[indexers], np.abs(expected), rtol=1e-6)
+
+    @pytest.mark.parametrize(
+        "indexers",
+        (
+            pytest.param((slice(None), slice(None)), id="full"),
+            pytest.param((slice(1, 4), slice(2, 5)), id="window"),
+            pytest.param((2, slice(None)), id="int-row"),
+            pytest.param((np.array([3, 0, 3]), np.array([15, 2, 7])), id="repeated-rows"),
+            pytest.param((slice(3, 1), slice(None)), id="empty"),
+        ),
+    )
+    def test_async_read(self, monkeypatch, indexers):
+        wrapped = AsyncFileSystemWrapper(fsspec.filesystem("memory"), asynchronous=False)
+        fs = DirFileSystem(fs=wrapped, path="/async-read")
+        data = np.arange(80, dtype="uint16").reshape(4, 20)
+        encoded = data.astype(">u2").tobytes()
+        fs.pipe(
+            "image-file", b"".join(b"\x00" * 8 + encoded[i * 40 : (i + 1) * 40] for i in range(4))
+        )
+
+        calls = []
+        cat_ranges = fs._cat_ranges
+
+        async def spy_cat_ranges(paths, starts, ends, **kwargs):
+            calls.append(list(zip(starts, ends)))
+
+            return await cat_ranges(paths, starts, ends, **kwargs)
+
+        monkeypatch.setattr(fs, "_cat_ranges", spy_cat_ranges)
+
+        arr = array.Array(
+            fs=fs,
+            url="image-file",
+            byte_ranges=[(i * 48 + 8, (i + 1) * 48) for i in range(4)],
+            shape=data.shape,
+            dtype=data.dtype,
+            type_code="IU2",
+            records_per_chunk=2,
+            max_gap=0,
+        )
+        expected = data[indexers[0], :][..., indexers[1]]
+
+        actual = asyncio.run(arr.async_read(indexers))
+
+        np.testing.assert_equal(actual, expected)
+        # all chunks are requested at once
+        assert len(calls) == (1 if expected.size else 0)
+
+    def test_async_read_sync_fs(self):
+        arr, data = self.create_array()
+        indexers = (slice(1, 3), slice(None))
+
+        assert not array.is_async(arr.fs)
+
+        actual = asyncio.run(arr.async_read(indexers))
+        np.testing.assert_equal(actual, data[1:3])
+
+
+class TestValidSpans:
+    spans = np.array([[2, 8], [0, 10], [0, 0], [0, 0], [3, 5], [1, 9]])
+
+    def create_array(self, tmp_path, mode="request", records_per_chunk=2):
+        if mode == "memmap":
+            fs = DirFileSystem(fs=fsspec.filesystem("file"), path=str(tmp_path))
+        elif mode == "async":
+            wrapped = AsyncFileSystemWrapper(fsspec.filesystem("memory"), asynchronous=False)
+            fs = DirFileSystem(fs=wrapped, path=f"/valid-spans-{mode}")
+        else:
+            fs = DirFileSystem(fs=fsspec.filesystem("memory"), path=f"/valid-spans-{mode}")
+
+        # the fill pixels in the file are not zero
+        values = np.arange(1, 61, dtype="uint16").reshape(6, 10)
+        encoded = values.astype(">u2").tobytes()
+        fs.pipe(
+            "image-file", b"".join(b"\x00" * 4 + encoded[i * 20 : (i + 1) * 20] for i in range(6))
+        )
+
+        columns = np.arange(10)
+        mask = (columns >= self.spans[:, :1]) & (columns < self.spans[:, 1:])
+
+        arr = array.Array(
+            fs=fs,
+            url="image-file",
+            byte_ranges=[(i * 24 + 4, (i + 1) * 24) for i in range(6)],
+            shape=values.shape,
+            dtype=values.dtype,
+            type_code="IU2",
+            records_per_chunk=records_per_chunk,
+            valid_spans=self.spans,
+            max_gap=0,
+            memmap=mode == "memmap",
+            chunk_cache=array.ChunkCache("1MB") if mode == "cache" else None,
+        )
+
+        return arr, np.where(mask, values, 0).astype("uint16"), mask
+
+    @pytest.mark.parametrize(
+        "indexers",
+        (
+            pytest.param((slice(None), slice(None)), id="full"),
+            pytest.param((slice(1, 5), slice(4, 9)), id="window"),
+            pytest.param((4, slice(None)), id="int-row"),
+            pytest.param((slice(2, 4), slice(None)), id="fill-only"),
+            pytest.param((np.array([5, 0, 5]), np.array([8, 2, 3])), id="arrays"),
+        ),
+    )
+    @pytest.mark.parametrize("mode", ["request", "async", "memmap", "cache"])
+    def test_read(self, monkeypatch, tmp_path, indexers, mode):
+        arr, data, _ = self.create_array(tmp_path, mode=mode)
+
+        requested = []
+        if mode == "async":
+            cat_ranges = arr.fs._cat_ranges
+
+            async def spy(paths, starts, ends, **kwargs):
+                requested.extend(zip(starts, ends))
+                return await cat_ranges(paths, starts, ends, **kwargs)
+
+            monkeypatch.setattr(arr.fs, "_cat_ranges", spy)
+        else:
+            cat_ranges = arr.fs.cat_ranges
+
+            def spy(paths, starts, ends, **kwargs):
+                requested.extend(zip(starts, ends))
+                return cat_ranges(paths, starts, ends, **kwargs)
+
+            monkeypatch.setattr(arr.fs, "cat_ranges", spy)
+
+        expected = data[indexers[0], :][..., indexers[1]]
+
+        if mode == "async":
+            actual = asyncio.run(arr.async_read(indexers))
+        else:
+            actual = arr[indexers]
+
+        np.testing.assert_equal(actual, expected)
+        # the fill pixels are never requested
+        valid = [
+            (row * 24 + 4 + start * 2, row * 24 + 4 + stop * 2)
+            for row, (start, stop) in enumerate(self.spans)
+        ]
+        assert all(any(start >= lo and stop <= hi for lo, hi in valid) for start, stop in requested)
+        if mode == "memmap":
+            assert not requested
+
+    def test_read_out(self, tmp_path):
+        arr, data, _ = self.create_array(tmp_path)
+        out = np.full(data.shape, fill_value=99, dtype=data.dtype)
+
+        arr.read((slice(None), slice(None)), out=out)
+
+        np.testing.assert_equal(out, data)
+
+    @pytest.mark.parametrize(
+        "indexers",
+        (
+            pytest.param((slice(None), slice(None)), id="full"),
+            pytest.param((slice(1, 5), slice(4, 9)), id="window"),
+            pytest.param((4, slice(None)), id="int-row"),
+            pytest.param((slice(None), 3), id="int-column"),
+            pytest.param((0, 1), id="int-both"),
+            pytest.param((np.array([5, 0, 5]), np.array([8, 2, 3])), id="arrays"),
+        ),
+    )
+    def test_validity_mask(self, tmp_path, indexers):
+        arr, _, mask = self.create_array(tmp_path)
+
+        valid = array.ValidityMask(arr)
+
+        assert valid.shape == arr.shape
+        assert valid.dtype == np.dtype("bool")
+        assert valid.chunks == arr.chunks
+
+        actual = valid[indexers]
+        expected = mask[indexers[0], :][..., indexers[1]]
+
+        np.testing.assert_equal(actual, expected)
+
+
+class TestMultilookedArray:
+    def create_array(self, type_code="C*8", records_per_chunk=4):
+        fs = DirFileSystem(fs=fsspec.filesystem("memory"), path=f"/multilook-{type_code}")
+        dtype = {"IU2": np.dtype("uint16"), "C*8": np.dtype("complex64")}[type_code]
+        data = (np.arange(9 * 10) * (1 + 2j if dtype.kind == "c" else 1)).astype(dtype)
+        data = data.reshape(9, 10)
+        encoded = data.astype(dtype.newbyteorder(">")).tobytes()
+        size = len(encoded) // 9
+        fs.pipe(
+            "image-file",
+            b"".join(b"\x00" * 4 + encoded[i * size : (i + 1) * size] for i in range(9)),
+        )
+
+        arr = array.Array(
+            fs=fs,
+            url="image-file",
+            byte_ranges=[(i * (size + 4) + 4, (i + 1) * (size + 4)) for i in range(9)],
+            shape=data.shape,
+            dtype=dtype,
+            type_code=type_code,
+            records_per_chunk=records_per_chunk,
+        )
+
+        return arr, data
+
+    @staticmethod
+    def multilook(data, looks):
+        n_rows, n_columns = (size // looks_ for size, looks_ in zip(data.shape, looks))
+        blocks = data[: n_rows * looks[0], : n_columns * looks[1]].reshape(
+            n_rows, looks[0], n_columns, looks[1]
+        )
+
+        return blocks.mean(axis=(1, 3))
+
+    @pytest.mark.parametrize(
+        ["type_code", "expected_dtype"],
+        (("C*8", np.dtype("complex64")), ("IU2", np.dtype("float32"))),
+    )
+    def test_init(self, type_code, expected_dtype):
+        arr, _ = self.create_array(type_code=type_code)
+
+        multilooked = array.MultilookedArray(arr, looks=[2, 3])
+
+        assert multilooked.looks == (2, 3)
+        assert multilooked.shape == (4, 3)
+        assert multilooked.ndim == 2
+        assert multilooked.dtype == expected_dtype
+        assert multilooked.chunks == (2, 3)
+
+    @pytest.mark.parametrize(
+        ["records_per_chunk", "looks", "expected"],
+        (
+            pytest.param(4, (2, 3), (2, 3), id="multiple"),
+            pytest.param(3, (2, 3), (3, 3), id="lcm"),
+            pytest.param(4, (3, 3), (3, 3), id="lcm-clipped"),
+            pytest.param(2, (4, 5), (1, 2), id="looks_larger"),
+        ),
+    )
+    def test_chunks(self, records_per_chunk, looks, expected):
+        arr, _ = self.create_array(type_code="IU2", records_per_chunk=records_per_chunk)
+
+        multilooked = array.MultilookedArray(arr, looks=looks)
+
+        assert multilooked.chunks == expected
+        # every chunk starts at a chunk boundary of the wrapped array
+        assert (multilooked.chunks[0] * looks[0]) % records_per_chunk == 0 or (
+            multilooked.chunks[0] == multilooked.shape[0]
+        )
+
+    def test_getitem_decibel(self):
+        arr, data = self.create_array()
+        decibel = dataclasses.replace(
+            arr, quantity="intensity", decibel=True, dtype=np.dtype("float32")
+        )
+        multilooked = array.MultilookedArray(decibel, looks=(2, 3))
+        intensity = np.square(data.real) + np.square(data.imag)
+        with np.errstate(divide="ignore"):
+            expected = 10 * np.log10(self.multilook(intensity, (2, 3)))
+
+        actual = multilooked[slice(None), slice(None)]
+
+        np.testing.assert_allclose(actual, expected, rtol=1e-6)
+
+    @pytest.mark.parametrize("type_code", ["C*8", "IU2"])
+    @pytest.mark.parametrize(
+        "indexers",
+        (
+            pytest.param((slice(None), slice(None)), id="full"),
+            pytest.param((slice(1, 3), slice(1, 3)), id="window"),
+            pytest.param((slice(None, None, -1), slice(None, None, 2)), id="reversed"),
+            pytest.param((2, slice(None)), id="int-row"),
+            pytest.param((slice(None), 1), id="int-column"),
+            pytest.param((np.array([3, 0, 1]), np.array([2, 0])), id="array"),
+            pytest.param((slice(3, 1), slice(None)), id="empty"),
+        ),
+    )
+    def test_getitem(self, monkeypatch, type_code, indexers):
+        arr, data = self.create_array(type_code=type_code)
+        multilooked = array.MultilookedArray(arr, looks=(2, 3))
+        expected = self.multilook(data, (2, 3))[indexers[0], :][..., indexers[1]]
+
+        reads = []
+        read = array.Array.read
+
+        def spy_read(self, indexers, out=None):
+            reads.append(indexers)
+
+            return read(self, indexers, out=out)
+
+        monkeypatch.setattr(array.Array, "read", spy_read)
+
+        actual = multilooked[indexers]
+
+        assert actual.dtype == multilooked.dtype
+        np.testing.assert_allclose(actual, expected)
+        # only read whole chunks or less
+        assert all(rows.stop - rows.start <= arr.records_per_chunk for rows, _ in reads)
+
+
+class TestChunkCache:
+    @pytest.mark.parametrize(
+        ["option", "expected"],
+        (
+            pytest.param(None, None, id="none"),
+            pytest.param("2kB", 2000, id="str"),
+            pytest.param(1024, 1024, id="int"),
+        ),
+    )
+    def test_from_option(self, option, expected):
+        actual = array.ChunkCache.from_option(option)
+
+        if expected is None:
+            assert actual is None
+        else:
+            assert actual.max_bytes == expected
+
+    def test_from_option_instance(self):
+        cache = array.ChunkCache("1kB")
+
+        assert array.ChunkCache.from_option(cache) is cache
+
+    def test_lru(self):
+        cache = array.ChunkCache(200)
+        chunks = {index: np.full(10, index, dtype="float64") for index in range(3)}
+
+        cache.put(("a", 0), chunks[0])
+        cache.put(("a", 1), chunks[1])
+        assert cache.get(("a", 0)) is chunks[0]
+
+        # evicts the least recently used chunk
+        cache.put(("a", 2), chunks[2])
+
+        assert cache.get(("a", 1)) is None
+        assert cache.get(("a", 0)) is chunks[0]
+        assert cache.nbytes == 160
+        assert (cache.hits, cache.misses) == (2, 1)
+
+    def test_too_large(self):
+        cache = array.ChunkCache(10)
+
+        cache.put(("a", 0), np.zeros(10, dtype="float64"))
+
+        assert len(cache) == 0
+
+    @pytest.mark.parametrize(
+        ["url", "expected"],
+        (
+            pytest.param(None, [], id="all"),
+            pytest.param("file:///p/a/IMG-HH", [("file:///p/b/IMG-HH", 0)], id="url"),
+            pytest.param("/p/a", [("file:///p/b/IMG-HH", 0)], id="product"),
+            pytest.param("IMG-HH", [], id="filename"),
+            pytest.param(
+                "IMG",
+                [("file:///p/a/IMG-HH", 0), ("file:///p/a/IMG-HH", 1), ("file:///p/b/IMG-HH", 0)],
+                id="partial-name",
+            ),
+        ),
+    )
+    def test_invalidate(self, url, expected):
+        cache = array.ChunkCache(1000)
+        cache.put(("file:///p/a/IMG-HH", 0), np.zeros(10))
+        cache.put(("file:///p/a/IMG-HH", 1), np.zeros(10))
+        cache.put(("file:///p/b/IMG-HH", 0), np.zeros(10))
+
+        cache.invalidate(url)
+
+        assert list(cache._chunks) == expected
+        assert cache.nbytes == 80 * len(expected)
+
+    def test_pickle(self):
+        cache = array.ChunkCache(1000)
+        cache.put(("a", 0), np.zeros(10))
+
+        actual = pickle.loads(pickle.dumps(cache))
+
+        assert actual.max_bytes == 1000
+        assert len(actual) == 0
+
+
+class TestReadahead:
+    @pytest.mark.parametrize(
+        ["option", "expected"],
+        (
+            pytest.param(None, None, id="none"),
+            pytest.param(0, None, id="zero"),
+            pytest.param(True, 2, id="true"),
+            pytest.param(4, 4, id="int"),
+        ),
+    )
+    def test_from_option(self, option, expected):
+        actual = array.Readahead.from_option(option)
+
+        if expected is None:
+            assert actual is None
+        else:
+            assert actual.n_chunks == expected
+
+    def test_from_option_instance(self):
+        readahead = array.Readahead()
+
+        assert array.Readahead.from_option(readahead) is readahead
+
+    @pytest.mark.parametrize(
+        ["reads", "expected"],
+        (
+            pytest.param([[0]], [], id="first_read"),
+            pytest.param([[0], [1]], [2, 3], id="sequential"),
+            pytest.param([[0], [1, 2]], [3, 4], id="sequential-multiple_chunks"),
+            pytest.param([[0, 1], [1]], [2, 3], id="same_chunk"),
+            pytest.param([[0], [3]], [], id="jump"),
+            pytest.param([[2], [3], [4]], [5], id="end"),
+            pytest.param([[0], [1], [3], [4]], [5], id="jump-sequential"),
+        ),
+    )
+    def test_observe(self, reads, expected):
+        readahead = array.Readahead(n_chunks=2)
+
+        for indices in reads:
+            readahead.observe(indices, fetch=lambda index: f"chunk {index}", n_chunks_total=6)
+
+        actual = {index: readahead.take(index) for index in range(6)}
+
+        assert {index: value for index, value in actual.items() if value is not None} == {
+            index: f"chunk {index}" for index in expected
+        }
+        assert len(readahead) == 0
+
+    def test_take_error(self):
+        readahead = array.Readahead(n_chunks=1)
+
+        def fetch(index):
+            raise OSError("network failure")
+
+        readahead.observe([0], fetch, n_chunks_total=3)
+        readahead.observe([1], fetch, n_chunks_total=3)
+
+        assert readahead.take(2) is None
+
+    def test_pickle(self):
+        readahead = array.Readahead(n_chunks=3)
+        readahead.observe([0], str, n_chunks_total=5)
+        readahead.observe([1], str, n_chunks_total=5)
+
+        actual = pickle.loads(pickle.dumps(readahead))
+
+        assert actual.n_chunks == 3
+        assert len(actual) == 0
+
+    def test_array(self, monkeypatch):
+        fs = DirFileSystem(fs=fsspec.filesystem("memory"), path="/readahead")
+        data = np.arange(60, dtype="uint16").reshape(6, 10)
+        fs.pipe("image-file", data.astype(">u2").tobytes())
+
+        arr = array.Array(
+            fs=fs,
+            url="image-file",
+            byte_ranges=[(index * 20, (index + 1) * 20) for index in range(6)],
+            shape=data.shape,
+            dtype=data.dtype,
+            type_code="IU2",
+            records_per_chunk=1,
+            readahead=array.Readahead(n_chunks=2),
+        )
+
+        direct_reads = []
+        read_ranges = arr.read_ranges
+
+        def spy(chunk_info, ranges):
+            direct_reads.append(chunk_info["offset"] // 20)
+            return read_ranges(chunk_info, ranges)
+
+        monkeypatch.setattr(arr, "read_ranges", spy)
+
+        for row in range(6):
+            np.testing.assert_equal(arr[(slice(row, row + 1), slice(None))], data[row : row + 1])
+
+        assert direct_reads == [0, 1]
+
+    def test_shared(self):
+        fs = DirFileSystem(fs=fsspec.filesystem("memory"), path="/readahead-shared")
+        readahead = array.Readahead(n_chunks=2)
+
+        def create_array(url, value):
+            data = np.full((6, 10), fill_value=value, dtype="uint16")
+            fs.pipe(url, data.astype(">u2").tobytes())
+
+            arr = array.Array(
+                fs=fs,
+                url=url,
+                byte_ranges=[(index * 20, (index + 1) * 20) for index in range(6)],
+                shape=data.shape,
+                dtype=data.dtype,
+                type_code="IU2",
+                records_per_chunk=2,
+                readahead=readahead,
+            )
+            return arr, data
+
+        a, data_a = create_array("a", 0)
+        b, data_b = create_array("b", 1)
+
+        np.testing.assert_equal(a[slice(0, 2), slice(None)], data_a[0:2])
+        np.testing.assert_equal(a[slice(2, 4), slice(None)], data_a[2:4])
+        # the chunks prefetched for `a` are not used for `b`
+        np.testing.assert_equal(b[slice(4, 6), slice(None)], data_b[4:6])
+        np.testing.assert_equal(a[slice(4, 6), slice(None)], data_a[4:6])
+
+
+class TestFieldArray:
+    def create_array(self, records_per_chunk=None, max_gap=None):
+        fs = DirFileSystem(fs=fsspec.filesystem("memory"), path="/")
+        url = "field-array"
+
+        record_dtype = np.dtype([("a", ">u2"), ("b", ">u4"), ("c", ">u2")])
+        records = np.zeros(5, dtype=record_dtype)
+        records["a"] = np.arange(5)
+        records["b"] = np.arange(5) * 1000
+        with fs.open(url, mode="wb") as f:
+            f.write(b"\x00" * 6 + records.tobytes())
+
+        dtype = np.dtype({"names": ["b"], "formats": [">u4"], "offsets": [0], "itemsize": 4})
+        decoders = {"b": columns.Metadata(columns.Factor(columns.native, 1e-3), units="m")}
+
+        return array.FieldArray(
+            fs=fs,
+            url=url,
+            offset=6 + 2,
+            record_size=record_dtype.itemsize,
+            shape=(5,),
+            dtype="float64",
+            record_dtype=dtype,
+            decoders=decoders,
+            path=("b",),
+            records_per_chunk=records_per_chunk,
+            max_gap=max_gap,
+        )
+
+    @pytest.mark.parametrize(
+        ["records_per_chunk", "expected"],
+        ((None, (1024,)), (2, (2,)), (-1, (5,)), ("16B", (2,))),
+    )
+    def test_chunks(self, records_per_chunk, expected):
+        arr = self.create_array(records_per_chunk=records_per_chunk)
+
+        assert arr.ndim == 1
+        assert arr.chunks == expected
+
+    @pytest.mark.parametrize("records_per_chunk", [1, 2, 5])
+    @pytest.mark.parametrize(
+        "indexer",
+        (
+            slice(None),
+            slice(1, 4),
+            slice(None, None, -2),
+            [4, 0, 2],
+            -1,
+            slice(3, 1),
+        ),
+    )
+    def test_getitem(self, indexer, records_per_chunk):
+        arr = self.create_array(records_per_chunk=records_per_chunk)
+        expected = np.arange(5, dtype="float64")[indexer]
+
+        actual = arr[(indexer,)]
+
+        np.testing.assert_equal(actual, expected)
+
+    @pytest.mark.parametrize(
+        ["indexer", "max_gap", "expected"],
+        (
+            pytest.param(
+                slice(None), 0, [(8, 12), (16, 20), (24, 28), (32, 36), (40, 44)], id="all"
+            ),
+            pytest.param(slice(None, None, -2), 0, [(40, 44), (8, 12), (24, 28)], id="strided"),
+            pytest.param([4, 0, 2], 0, [(40, 44), (8, 12), (24, 28)], id="list"),
+            pytest.param(slice(None), 4, [(8, 36), (40, 44)], id="all-merged"),
+        ),
+    )
+    def test_getitem_requests(self, monkeypatch, indexer, max_gap, expected):
+        arr = self.create_array(records_per_chunk=4, max_gap=max_gap)
+
+        requests = []
+        cat_ranges = arr.fs.cat_ranges
+
+        def spy_cat_ranges(paths, starts, ends, **kwargs):
+            requests.extend(zip(starts, ends))
+            return cat_ranges(paths, starts, ends, **kwargs)
+
+        def spy_read_chunk(f, offset, size):
+            requests.append((offset, offset + size))
+            return array_read_chunk(f, offset, size)
+
+        array_read_chunk = array.read_chunk
+        monkeypatch.setattr(arr.fs, "cat_ranges", spy_cat_ranges)
+        monkeypatch.setattr(array, "read_chunk", spy_read_chunk)
+
+        actual = arr[(indexer,)]
+
+        np.testing.assert_equal(actual, np.arange(5, dtype="float64")[indexer])
+        assert requests == expected
+
+    def test_getitem_payload(self, monkeypatch):
+        fs = DirFileSystem(fs=fsspec.filesystem("memory"), path="/field-array-payload")
+        record_size = 60_000
+        n_records = 64
+
+        record_dtype = np.dtype([("a", ">u4")])
+        content = bytearray(n_records * record_size)
+        for row in range(n_records):
+            content[row * record_size : row * record_size + 4] = row.to_bytes(4, "big")
+        fs.pipe("image-file", bytes(content))
+
+        arr = array.FieldArray(
+            fs=fs,
+            url="image-file",
+            offset=0,
+            record_size=record_size,
+            shape=(n_records,),
+            dtype="uint32",
+            record_dtype=record_dtype,
+            decoders={},
+            path=("a",),
+            records_per_chunk=16,
+        )
+
+        requested = []
+        cat_ranges = fs.cat_ranges
+
+        def spy(paths, starts, ends, **kwargs):
+            requested.extend(zip(starts, ends))
+            return cat_ranges(paths, starts, ends, **kwargs)
+
+        monkeypatch.setattr(fs, "cat_ranges", spy)
+
+        actual = arr[(slice(None),)]
+
+        np.testing.assert_equal(actual, np.arange(n_records))
+        # only the fields are requested, not the payloads in between
+        assert sum(stop - start for start, stop in requested) == n_records * 4
@@ -0,0 +1,55 @@
+import pathlib
+
+import fsspec
+import pytest
+from fsspec.implementations.dirfs import DirFileSystem
+
+from ceos_alos2 import blocks
+from ceos_alos2.sar_image.caching.path import cache_root
+
+
+@pytest.mark.parametrize(
+    ["option", "expected"],
+    (
+        pytest.param(None, None, id="none"),
+        pytest.param(False, None, id="false"),
+        pytest.param(True, blocks.BlockStore(root=cache_root / "blocks"), id="default"),
+        pytest.param("/tmp/blocks", blocks.BlockStore(root=pathlib.Path("/tmp/blocks")), id="str"),
+    ),
+)
+def test_block_store_from_option(option, expected):
+    actual = blocks.BlockStore.from_option(option)
+
+    assert actual == expected
+
+
+def test_block_url():
+    fs = DirFileSystem(fs=fsspec.filesystem("memory"), path="/a/b")
+
+    actual = blocks.block_url(fs, "c")
+
+    assert actual == "memory:///a/b/c"
+
+
+class TestBlockStore:
+    def test_roundtrip(self, tmp_path):
+        store = blocks.BlockStore(root=tmp_path)
+
+        store.put("memory:///a", 1, b"abcd")
+
+        assert store.get("memory:///a", 1, size=4) == b"abcd"
+        assert list(tmp_path.glob("*/*")) == [store.location("memory:///a", 1)]
+
+    @pytest.mark.parametrize(
+        ["url", "index", "size"],
+        (
+            pytest.param("memory:///b", 1, 4, id="different_url"),
+            pytest.param("memory:///a", 2, 4, id="different_index"),
+            pytest.param("memory:///a", 1, 5, id="different_size"),
+        ),
+    )
+    def test_get_missing(self, tmp_path, url, index, size):
+        store = blocks.BlockStore(root=tmp_path)
+        store.put("memory:///a", 1, b"abcd")
+
+        assert store.get(url, index, size=size) is None
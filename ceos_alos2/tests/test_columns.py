@@ -0,0 +1,161 @@
+import numpy as np
+import pytest
+from construct import Enum, Int16ub
+
+from ceos_alos2 import columns
+
+
+@pytest.mark.parametrize(
+    ["column", "expected"],
+    (
+        pytest.param(np.array([1, 2], dtype=">u4"), np.array([1, 2], dtype="u4"), id="u4"),
+        pytest.param(np.array([3], dtype=">u2"), np.array([3], dtype="u2"), id="u2"),
+    ),
+)
+def test_native(column, expected):
+    actual = columns.native(column, {})
+
+    assert actual.dtype == expected.dtype
+    assert actual.dtype.isnative
+    np.testing.assert_equal(actual, expected)
+
+
+def test_factor():
+    decoder = columns.Factor(columns.native, 1e-3)
+
+    actual = decoder(np.array([1000, 2500], dtype=">u4"), {})
+
+    np.testing.assert_allclose(actual, [1.0, 2.5])
+
+
+def test_metadata():
+    decoder = columns.Metadata(columns.native, units="m")
+
+    data, attrs = decoder(np.array([1, 2], dtype=">u4"), {})
+
+    np.testing.assert_equal(data, [1, 2])
+    assert attrs == {"units": "m"}
+
+
+def test_enum():
+    decoder = columns.Enum(Enum(Int16ub, a=0, b=1))
+
+    actual = decoder(np.array([1, 0, 1, 7], dtype=">u2"), {})
+    expected = np.array(["b", "a", "b", 7], dtype=object)
+
+    np.testing.assert_equal(actual, expected)
+
+
+def test_flag():
+    actual = columns.flag(np.array([0, 1, 15], dtype=">u2"), {})
+
+    np.testing.assert_equal(actual, [False, True, True])
+
+
+def test_datetime_ydms():
+    dtype = np.dtype([("year", ">u4"), ("day_of_year", ">u4"), ("milliseconds", ">u4")])
+    column = np.array([(2020, 1, 0), (2021, 32, 45_296_789)], dtype=dtype)
+
+    actual = columns.datetime_ydms(column, {})
+    expected = np.array(["2020-01-01", "2021-02-01T12:34:56.789"], dtype="datetime64[ns]")
+
+    np.testing.assert_equal(actual, expected)
+
+
+def test_datetime_ydus():
+    context = {"date": np.array(["2020-01-01T12:00", "2020-01-02T23:59"], dtype="M8[ns]")}
+    decoder = columns.DatetimeYdus("date")
+
+    actual = decoder(np.array([1, 43_200_000_000], dtype=">u8"), context)
+    expected = np.array(["2020-01-01T00:00:00.000001", "2020-01-02T12:00"], dtype="M8[ns]")
+
+    assert decoder.dependencies == ["date"]
+    np.testing.assert_equal(actual, expected)
+
+
+def test_decode_columns():
+    dtype = np.dtype(
+        [
+            ("a", ">u2"),
+            ("blanks", "V3"),
+            ("b", [("x", ">u4"), ("y", ">u4")]),
+            ("c", ">u4"),
+        ]
+    )
+    records = np.array([(1, b"\x00" * 3, (2, 3), 4), (5, b"\x00" * 3, (6, 7), 8)], dtype=dtype)
+    decoders = {
+        "b": {"y": columns.Metadata(columns.native, units="m")},
+        "c": columns.Factor(columns.native, 2),
+    }
+
+    actual = columns.decode_columns(records, decoders)
+
+    assert list(actual) == ["a", "b", "c"]
+    np.testing.assert_equal(actual["a"][0], [1, 5])
+    assert actual["a"][1] == {}
+    np.testing.assert_equal(actual["b"]["x"][0], [2, 6])
+    assert actual["b"]["y"][1] == {"units": "m"}
+    np.testing.assert_equal(actual["c"][0], [8, 16])
+
+
+def test_records_to_columns():
+    records = [
+        {"a": 1, "b": (2.0, {"units": "m"}), "c": {"x": 3}},
+        {"a": 4, "b": (5.0, {"units": "m"}), "c": {"x": 6}},
+    ]
+
+    actual = columns.records_to_columns(records)
+
+    np.testing.assert_equal(actual["a"][0], [1, 4])
+    np.testing.assert_equal(actual["b"][0], [2.0, 5.0])
+    assert actual["b"][1] == {"units": "m"}
+    np.testing.assert_equal(actual["c"]["x"][0], [3, 6])
+
+
+def test_concat_columns():
+    chunks = [
+        {"a": (np.array([1, 2]), {"units": "m"}), "b": {"x": (np.array([3]), {})}},
+        {"a": (np.array([4]), {"units": "m"}), "b": {"x": (np.array([5, 6]), {})}},
+    ]
+
+    actual = columns.concat_columns(chunks)
+
+    np.testing.assert_equal(actual["a"][0], [1, 2, 4])
+    assert actual["a"][1] == {"units": "m"}
+    np.testing.assert_equal(actual["b"]["x"][0], [3, 5, 6])
+
+
+@pytest.mark.parametrize(
+    ["names", "expected_offset", "expected"],
+    (
+        pytest.param(["b"], 2, {"names": ["b"], "offsets": [0], "itemsize": 4}, id="single"),
+        pytest.param(
+            ["d", "b"], 2, {"names": ["b", "d"], "offsets": [0, 6], "itemsize": 8}, id="multiple"
+        ),
+    ),
+)
+def test_subset_dtype(names, expected_offset, expected):
+    dtype = np.dtype([("a", ">u2"), ("b", ">u4"), ("c", ">u2"), ("d", ">u2")])
+
+    offset, actual = columns.subset_dtype(dtype, names)
+
+    assert offset == expected_offset
+    assert list(actual.names) == expected["names"]
+    assert [actual.fields[name][1] for name in actual.names] == expected["offsets"]
+    assert actual.itemsize == expected["itemsize"]
+
+
+@pytest.mark.parametrize(
+    ["name", "expected"],
+    (
+        pytest.param("a", ["a"], id="no_decoder"),
+        pytest.param("b", ["b"], id="no_dependencies"),
+        pytest.param("c", ["c", "b"], id="dependencies"),
+    ),
+)
+def test_field_dependencies(name, expected):
+    decoders = {"b": columns.flag, "c": columns.DatetimeYdus("b")}
+
+    actual = columns.field_dependencies(name, decoders)
+
+    assert actual == expected
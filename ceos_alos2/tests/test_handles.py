@@ -0,0 +1,141 @@
+import pickle
+import threading
+
+import fsspec
+import pytest
+from fsspec.implementations.dirfs import DirFileSystem
+
+from ceos_alos2 import handles
+from ceos_alos2.array import Array
+
+
+@pytest.fixture
+def fs(tmp_path):
+    # memory files are shared between handles, so use local files
+    (tmp_path / "a").write_bytes(b"abcd")
+    (tmp_path / "b").write_bytes(b"efgh")
+
+    return DirFileSystem(fs=fsspec.filesystem("file"), path=str(tmp_path))
+
+
+class TestHandlePool:
+    def test_reuse(self, fs):
+        pool = handles.HandlePool()
+
+        with pool.open(fs, "a") as f:
+            first = f
+            assert f.read() == b"abcd"
+
+        with pool.open(fs, "a") as f:
+            f.seek(1)
+            assert f is first
+            assert f.read(2) == b"bc"
+
+        with pool.open(fs, "b") as f:
+            assert f is not first
+
+        assert len(pool) == 2
+
+    def test_concurrent(self, fs):
+        pool = handles.HandlePool()
+
+        with pool.open(fs, "a") as f1, pool.open(fs, "a") as f2:
+            assert f1 is not f2
+
+        assert len(pool) == 2
+
+    def test_maxsize(self, fs):
+        pool = handles.HandlePool(maxsize=1)
+
+        with pool.open(fs, "a") as f1:
+            pass
+        with pool.open(fs, "b") as f2:
+            pass
+
+        assert len(pool) == 1
+        assert f1.closed
+        assert not f2.closed
+
+    def test_idle_timeout(self, fs, monkeypatch):
+        pool = handles.HandlePool(idle_timeout=10)
+        now = 100
+
+        monkeypatch.setattr(handles.time, "monotonic", lambda: now)
+        with pool.open(fs, "a") as f1:
+            pass
+
+        now = 120
+        with pool.open(fs, "a") as f2:
+            pass
+
+        assert f1 is not f2
+        assert f1.closed
+
+    def test_error(self, fs):
+        pool = handles.HandlePool()
+
+        with pytest.raises(RuntimeError):
+            with pool.open(fs, "a") as f:
+                raise RuntimeError("read failed")
+
+        assert f.closed
+        assert len(pool) == 0
+
+    def test_fork(self, fs, monkeypatch):
+        pool = handles.HandlePool()
+        with pool.open(fs, "a") as f1:
+            pass
+
+        monkeypatch.setattr(handles.os, "getpid", lambda: -1)
+        with pool.open(fs, "a") as f2:
+            pass
+
+        assert f1 is not f2
+        assert len(pool) == 1
+
+    def test_clear(self, fs):
+        pool = handles.HandlePool()
+        with pool.open(fs, "a") as f:
+            pass
+
+        pool.clear()
+
+        assert f.closed
+        assert len(pool) == 0
+
+    def test_threads(self, fs):
+        pool = handles.HandlePool(maxsize=4)
+        results = []
+
+        def read(offset):
+            for _ in range(50):
+                with pool.open(fs, "a") as f:
+                    f.seek(offset)
+                    results.append(f.read(1) == b"abcd"[offset : offset + 1])
+
+        threads = [threading.Thread(target=read, args=(index % 4,)) for index in range(8)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+
+        assert all(results)
+        assert len(results) == 400
+        assert len(pool) <= 4
+
+
+def test_pickle_array(fs):
+    arr = Array(
+        fs=fs,
+        url="a",
+        byte_ranges=[(0, 2), (2, 4)],
+        shape=(2, 1),
+        dtype="uint16",
+        type_code="IU2",
+        records_per_chunk=2,
+    )
+    expected = arr[(slice(None), slice(None))]
+
+    actual = pickle.loads(pickle.dumps(arr))[(slice(None), slice(None))]
+
+    assert (actual == expected).all()
@@ -1,15 +1,23 @@
 import datetime as dt
+import time
 from dataclasses import dataclass
 
 import fsspec
 import numpy as np
 import pytest
 from construct import Int8ub, Int16ub, Seek, Struct, Tell, this
+from tlz.functoolz import curry, pipe
 
 from ceos_alos2 import sar_image
+from ceos_alos2.array import ChunkCache, FieldArray, MultilookedArray, ValidityMask
+from ceos_alos2.columns import records_to_columns
+from ceos_alos2.dicttoolz import dissoc
 from ceos_alos2.hierarchy import Group, Variable
-from ceos_alos2.sar_image import enums, io, metadata
+from ceos_alos2.sar_image import caching, calibration, enums, io, metadata
+from ceos_alos2.sar_image.processed_data import processed_data_dtype
+from ceos_alos2.sar_image.signal_data import signal_data_dtype
 from ceos_alos2.testing import assert_identical
+from ceos_alos2.tests.utils import create_dummy_array, create_dummy_records
 
 
 @dataclass
@@ -153,6 +161,34 @@ class TestMetadata:
 
         assert actual == expected
 
+    @pytest.mark.parametrize(
+        ["header", "expected"],
+        (
+            pytest.param(
+                {
+                    "number_of_sar_data_records": 2,
+                    "sar_data_record_length": 100,
+                    "record_data_in_the_file": {"number_of_bytes_of_prefix_data_per_record": 40},
+                },
+                [(760, 820), (860, 920)],
+                id="2records",
+            ),
+            pytest.param(
+                {
+                    "number_of_sar_data_records": 3,
+                    "sar_data_record_length": 30,
+                    "record_data_in_the_file": {"number_of_bytes_of_prefix_data_per_record": 12},
+                },
+                [(732, 750), (762, 780), (792, 810)],
+                id="3records",
+            ),
+        ),
+    )
+    def test_compute_byte_ranges(self, header, expected):
+        actual = metadata.compute_byte_ranges(header)
+
+        assert actual == expected
+
     @pytest.mark.parametrize(
         "overrides",
         (
@@ -183,6 +219,14 @@ class TestMetadata:
 
         assert actual == expected
 
+    def test_flatten_columns(self):
+        columns = {"a": ([1], {}), "b": {"x": ([2], {"units": "m"}), "y": {"z": ([3], {})}}}
+
+        actual = metadata.flatten_columns(columns)
+        expected = {"a": ([1], {}), "b_x": ([2], {"units": "m"}), "b_y_z": ([3], {})}
+
+        assert actual == expected
+
     @pytest.mark.parametrize(
         ["mapping", "expected"],
         (
@@ -191,9 +235,6 @@ class TestMetadata:
                     {
                         "preamble": {},
                         "record_start": 1,
-                        "actual_count_of_left_fill_pixels": 0,
-                        "actual_count_of_right_fill_pixels": 0,
-                        "actual_count_of_data_pixels": 0,
                         "palsar_auxiliary_data": b"",
                         "blanks2": "",
                         "data": {},
@@ -202,6 +243,26 @@ class TestMetadata:
                 Group(path=None, url=None, data={}, attrs={}),
                 id="ignored",
             ),
+            pytest.param(
+                [
+                    {
+                        "actual_count_of_left_fill_pixels": 2,
+                        "actual_count_of_right_fill_pixels": 1,
+                        "actual_count_of_data_pixels": 5,
+                    }
+                ],
+                Group(
+                    path=None,
+                    url=None,
+                    data={
+                        "actual_count_of_left_fill_pixels": Variable("rows", [2], {}),
+                        "actual_count_of_right_fill_pixels": Variable("rows", [1], {}),
+                        "actual_count_of_data_pixels": Variable("rows", [5], {}),
+                    },
+                    attrs={},
+                ),
+                id="fill_counts",
+            ),
             pytest.param(
                 [{"a": (1, {"units": "m"})}, {"a": (2, {"units": "m"})}],
                 Group(
@@ -548,6 +609,281 @@ class TestIO:
         assert header == dummy_header
         assert metadata_ == expected
 
+    @pytest.mark.parametrize("max_workers", [1, 2, 3])
+    def test_iter_chunks_window(self, max_workers):
+        started = []
+
+        def func(index):
+            started.append(index)
+
+            return index
+
+        consumed = []
+        for index in io.iter_chunks(func, range(20), max_workers=max_workers):
+            # chunks are only submitted once earlier chunks have been consumed
+            assert len(started) - len(consumed) <= 2 * max_workers
+            consumed.append(index)
+
+        assert consumed == list(range(20))
+
+    @pytest.mark.parametrize("max_workers", [1, 2, None])
+    def test_map_chunks(self, max_workers):
+        def func(index, delay):
+            time.sleep(delay)
+
+            return index
+
+        delays = [0.03, 0.0, 0.02, 0.01]
+        actual = io.map_chunks(func, range(len(delays)), delays, max_workers=max_workers)
+
+        assert actual == [0, 1, 2, 3]
+
+    @pytest.mark.parametrize("offset", [0, 720])
+    def test_parse_chunk_columns(self, offset):
+        content = create_dummy_records(processed_data_dtype, 11, n_records=3, record_length=200)
+
+        actual = io.parse_chunk_columns(content, 200, offset=offset)
+
+        np.testing.assert_equal(actual["record_start"][0], [offset, offset + 200, offset + 400])
+        np.testing.assert_equal(
+            actual["data"]["start"][0], [offset + 192, offset + 392, offset + 592]
+        )
+        np.testing.assert_equal(
+            actual["data"]["stop"][0], [offset + 200, offset + 400, offset + 600]
+        )
+        assert actual["prf"][1] == {"units": "mHz"}
+        assert "blanks1" not in actual
+
+    def test_parse_chunk_columns_signal_data(self):
+        from ceos_alos2.utils import to_dict
+
+        record_length = 560
+        content = create_dummy_records(
+            signal_data_dtype,
+            10,
+            n_records=3,
+            record_length=record_length,
+            overrides={"sensor_acquisition_date_microseconds": [1, 43_200_000_000, 86_399_999_999]},
+        )
+
+        def assert_columns_equal(actual, expected):
+            assert sorted(actual) == sorted(expected)
+            for name, value in expected.items():
+                if isinstance(value, dict):
+                    assert_columns_equal(actual[name], value)
+                    continue
+
+                (actual_data, actual_attrs), (expected_data, expected_attrs) = actual[name], value
+                if isinstance(expected_data[0], dt.datetime):
+                    expected_data = expected_data.astype("datetime64[ns]")
+
+                np.testing.assert_equal(actual_data, expected_data)
+                assert actual_attrs == expected_attrs
+
+        actual = io.parse_chunk_columns(content, record_length)
+        expected = pipe(
+            io.parse_chunk(content, record_length),
+            curry(to_dict),
+            curry(records_to_columns),
+            curry(dissoc, ["blanks1", "blanks2", "palsar_auxiliary_data"]),
+        )
+
+        assert_columns_equal(actual, expected)
+
+    def test_parse_chunk_columns_fallback(self, monkeypatch):
+        content = (
+            b"\x00\x00\x00\x01\x00\x0a\x00\x00\x00\x00\x00\x10\x02\x03\x00\x1f"
+            + b"\x00\x00\x00\x02\x00\x0a\x00\x00\x00\x00\x00\x10\x04\x05\x00\x2f"
+        )
+        dummy_record_types = {
+            10: Struct(
+                "record_start" / Tell,
+                "preamble" / io.record_preamble,
+                "a" / Int8ub,
+                "data" / Struct("start" / Tell, "stop" / Seek(this._.record_start + 16)),
+            )
+        }
+        monkeypatch.setattr(io, "record_types", dummy_record_types)
+        monkeypatch.setattr(io, "column_types", {})
+
+        actual = io.parse_chunk_columns(content, 16, offset=10)
+
+        np.testing.assert_equal(actual["a"][0], [2, 4])
+        np.testing.assert_equal(actual["record_start"][0], [10, 26])
+        np.testing.assert_equal(actual["data"]["start"][0], [23, 39])
+
+    @pytest.mark.parametrize("max_workers", [1, 4])
+    @pytest.mark.parametrize("rpc", [1, 2, 5])
+    def test_read_columns(self, monkeypatch, rpc, max_workers):
+        record_length = 210
+        header = {
+            "number_of_sar_data_records": 4,
+            "sar_data_record_length": record_length,
+            "prefix_suffix_data_locators": {"sar_data_format_type_code": "IU2"},
+            "sar_related_data_in_the_record": {
+                "number_of_lines_per_dataset": 4,
+                "number_of_data_groups_per_line": 9,
+            },
+        }
+        content = b"\x00" * 720 + create_dummy_records(
+            processed_data_dtype, 11, n_records=4, record_length=record_length
+        )
+
+        mapper = fsspec.get_mapper("memory://")
+        mapper["path"] = content
+
+        def dummy_read_file_descriptor(f):
+            f.read(720)
+
+            return header
+
+        def normalize(group):
+            data = {
+                name: Variable(var.dims, np.asarray(var.data), var.attrs)
+                for name, var in group.variables.items()
+            }
+            return Group(path=group.path, url=group.url, data=data, attrs=group.attrs)
+
+        monkeypatch.setattr(io, "read_file_descriptor", dummy_read_file_descriptor)
+
+        with mapper.fs.open("path", mode="rb") as f:
+            _, records = io.read_metadata(f, records_per_chunk=rpc)
+        spilled = []
+
+        def spill(index, offset, content, columns):
+            spilled.append((index, offset, len(content)))
+
+        _, columns = io.read_columns(
+            mapper.fs, "path", records_per_chunk=rpc, spill=spill, max_workers=max_workers
+        )
+
+        expected_group, expected_array = metadata.transform_metadata(header, records)
+        actual_group, actual_array = metadata.transform_columns(header, columns)
+
+        assert actual_array == expected_array
+        assert_identical(actual_group, normalize(expected_group))
+        chunksizes = io.compute_chunksizes(4, rpc)
+        assert spilled == [
+            (index, offset, chunksize * record_length)
+            for index, (chunksize, offset) in enumerate(
+                zip(chunksizes, io.compute_chunk_offsets(chunksizes, record_length))
+            )
+        ]
+
+    @pytest.mark.parametrize("rpc", [1, 3, 5])
+    def test_read_prefix_columns(self, monkeypatch, rpc):
+        record_length = 230
+        header = {"number_of_sar_data_records": 4, "sar_data_record_length": record_length}
+        content = b"\x00" * 720 + create_dummy_records(
+            processed_data_dtype, 11, n_records=4, record_length=record_length
+        )
+
+        fs = fsspec.filesystem("memory")
+        fs.pipe("/prefix-columns/path", content)
+
+        def dummy_read_file_descriptor(f):
+            f.read(720)
+
+            return header
+
+        requested = []
+
+        def cat_ranges(paths, starts, ends, **kwargs):
+            requested.extend(zip(starts, ends))
+
+            return [content[start:end] for start, end in zip(starts, ends)]
+
+        monkeypatch.setattr(io, "read_file_descriptor", dummy_read_file_descriptor)
+        monkeypatch.setattr(fs, "cat_ranges", cat_ranges)
+
+        _, expected = io.read_columns(fs, "/prefix-columns/path", records_per_chunk=rpc)
+        _, actual = io.read_prefix_columns(fs, "/prefix-columns/path", records_per_chunk=rpc)
+
+        assert all(end - start == processed_data_dtype.itemsize for start, end in requested)
+        np.testing.assert_equal(actual["data"]["start"][0], expected["data"]["start"][0])
+        np.testing.assert_equal(actual["data"]["stop"][0], expected["data"]["stop"][0])
+        np.testing.assert_equal(actual["prf"][0], expected["prf"][0])
+        np.testing.assert_equal(
+            actual["sensor_acquisition_date"][0], expected["sensor_acquisition_date"][0]
+        )
+
+    def test_read_prefix_columns_unknown_record_type(self, monkeypatch):
+        header = {"number_of_sar_data_records": 1, "sar_data_record_length": 230}
+        content = b"\x00" * 720 + create_dummy_records(
+            processed_data_dtype, 12, n_records=1, record_length=230
+        )
+
+        fs = fsspec.filesystem("memory")
+        fs.pipe("/prefix-columns/unknown", content)
+
+        def dummy_read_file_descriptor(f):
+            f.read(720)
+
+            return header
+
+        monkeypatch.setattr(io, "read_file_descriptor", dummy_read_file_descriptor)
+
+        with pytest.raises(ValueError, match="record.*type code 12"):
+            io.read_prefix_columns(fs, "/prefix-columns/unknown")
+
+
+class TestCalibration:
+    def create_leader(self, factor=-83.0, incidence_angle=30.0):
+        return Group(
+            path=None,
+            url=None,
+            data={
+                "radiometric_data": Group(
+                    path=None,
+                    url=None,
+                    data={"calibration_factor": Variable((), factor, {})},
+                    attrs={},
+                ),
+                "dataset_summary": Group(
+                    path=None,
+                    url=None,
+                    data={"incidence_angle_at_scene_center": Variable((), incidence_angle, {})},
+                    attrs={},
+                ),
+            },
+            attrs={},
+        )
+
+    def test_from_leader(self):
+        actual = calibration.Calibration.from_leader(self.create_leader(), unit="dB")
+
+        assert actual == calibration.Calibration(factor=-83.0, incidence_angle=30.0, unit="dB")
+
+    def test_from_leader_missing(self):
+        leader = Group(path=None, url=None, data={}, attrs={})
+
+        with pytest.raises(ValueError, match="cannot calibrate"):
+            calibration.Calibration.from_leader(leader)
+
+    def test_from_leader_unknown_unit(self):
+        with pytest.raises(ValueError, match="unknown calibration unit"):
+            calibration.Calibration.from_leader(self.create_leader(), unit="dBm")
+
+    @pytest.mark.parametrize(
+        ["quantity", "type_code", "expected"],
+        (
+            pytest.param("sigma0", "C*8", 10**-11.2, id="sigma0-complex"),
+            pytest.param("sigma0", "IU2", 1e-8, id="sigma0-detected"),
+            pytest.param("beta0", "C*8", 2 * 10**-11.2, id="beta0-complex"),
+            pytest.param("gamma0", "C*8", ValueError("unknown calibrated quantity"), id="unknown"),
+        ),
+    )
+    def test_scale(self, quantity, type_code, expected):
+        calibration_ = calibration.Calibration(factor=-80.0, incidence_angle=30.0)
+
+        if isinstance(expected, Exception):
+            with pytest.raises(type(expected), match=expected.args[0]):
+                calibration_.scale(quantity, type_code)
+
+            return
+
+        assert calibration_.scale(quantity, type_code) == pytest.approx(expected)
+
 
 class TestInit:
     @pytest.mark.parametrize(
@@ -561,3 +897,456 @@ class TestInit:
         actual = sar_image.filename_to_groupname(path)
 
         assert actual == expected
+
+    @pytest.mark.parametrize(
+        ["type_code", "quantities", "expected"],
+        (
+            pytest.param("C*8", [], ["data"], id="none"),
+            pytest.param(
+                "C*8", ["intensity", "phase"], ["data", "intensity", "phase"], id="complex"
+            ),
+            pytest.param(
+                "IU2", ["amplitude"], ValueError("can only derive quantities"), id="unsigned_int"
+            ),
+        ),
+    )
+    def test_add_derived_variables(self, type_code, quantities, expected):
+        data = create_dummy_array(shape=(4, 3), dtype="complex64", type_code=type_code)
+        group = Group(
+            path=None, url=None, data={"data": Variable(["rows", "columns"], data, {})}, attrs={}
+        )
+
+        if isinstance(expected, Exception):
+            with pytest.raises(type(expected), match=expected.args[0]):
+                sar_image.add_derived_variables(group, quantities)
+
+            return
+
+        actual = sar_image.add_derived_variables(group, quantities)
+
+        assert list(actual.variables) == expected
+        for quantity in quantities:
+            variable = actual[quantity]
+            assert variable.dims == ["rows", "columns"]
+            assert variable.data.quantity == quantity
+            assert variable.dtype == np.dtype("float32")
+            assert variable.data.chunks == data.chunks
+
+    @pytest.mark.parametrize(
+        ["type_code", "unit"],
+        (("C*8", "linear"), ("C*8", "dB"), ("IU2", "linear")),
+    )
+    def test_add_calibrated_variables(self, type_code, unit):
+        data = create_dummy_array(shape=(4, 3), dtype="complex64", type_code=type_code)
+        group = Group(
+            path=None, url=None, data={"data": Variable(["rows", "columns"], data, {})}, attrs={}
+        )
+        calibration_ = calibration.Calibration(factor=-80.0, incidence_angle=30.0, unit=unit)
+
+        actual = sar_image.add_calibrated_variables(group, ["sigma0", "beta0"], calibration_)
+
+        assert list(actual.variables) == ["data", "sigma0", "beta0"]
+        for quantity in ["sigma0", "beta0"]:
+            variable = actual[quantity]
+            assert variable.attrs == {"units": unit}
+            assert variable.dtype == np.dtype("float32")
+            assert variable.data.quantity == "intensity"
+            assert variable.data.scale == calibration_.scale(quantity, type_code)
+            assert variable.data.decibel == (unit == "dB")
+
+    @pytest.mark.parametrize("lazy", [False, True])
+    def test_crop_fill_pixels(self, lazy):
+        data = create_dummy_array(
+            path="/crop-fill", shape=(4, 6), dtype="complex64", type_code="C*8"
+        )
+        left_fill = np.array([2, 1, 0, 3])
+        data_pixels = np.array([3, 4, 0, 1])
+        data.fs.pipe("fill-counts", np.stack([left_fill, data_pixels]).astype(">u4").tobytes())
+
+        def counts(values, offset):
+            if not lazy:
+                return Variable("rows", values, {})
+
+            field_array = FieldArray(
+                fs=data.fs,
+                url="fill-counts",
+                offset=offset,
+                record_size=4,
+                shape=values.shape,
+                dtype=values.dtype,
+                record_dtype=np.dtype([("count", ">u4")]),
+                decoders={},
+                path=("count",),
+            )
+            return Variable("rows", field_array, {})
+
+        group = Group(
+            path=None,
+            url=None,
+            data={
+                "data": Variable(["rows", "columns"], data, {"a": 1}),
+                "actual_count_of_left_fill_pixels": counts(left_fill, offset=0),
+                "actual_count_of_data_pixels": counts(data_pixels, offset=16),
+            },
+            attrs={},
+        )
+
+        actual = sar_image.crop_fill_pixels(group)
+
+        cropped = actual["data"].data
+        assert cropped.shape == (4, 4)
+        assert cropped.byte_ranges == [(x * 10 + 5 + 8, x * 10 + 5 + 40) for x in range(4)]
+        np.testing.assert_equal(cropped.valid_spans, [[1, 4], [0, 4], [0, 0], [2, 3]])
+        assert actual["data"].attrs == {"a": 1, "column_offset": 1}
+
+        valid = actual["valid"]
+        assert isinstance(valid.data, ValidityMask)
+        assert valid.dims == ["rows", "columns"]
+        assert valid.data.array is cropped
+
+    def test_crop_fill_pixels_without_metadata(self):
+        data = create_dummy_array(shape=(4, 6), dtype="complex64", type_code="C*8")
+        group = Group(
+            path=None,
+            url=None,
+            data={"data": Variable(["rows", "columns"], data, {})},
+            attrs={},
+        )
+
+        with pytest.raises(ValueError, match="requires the line metadata"):
+            sar_image.crop_fill_pixels(group)
+
+    @pytest.mark.parametrize("looks", [None, (2, 3)])
+    def test_multilook_variables(self, looks):
+        data = create_dummy_array(shape=(4, 6), dtype="complex64", type_code="C*8")
+        group = Group(
+            path=None,
+            url=None,
+            data={
+                "data": Variable(["rows", "columns"], data, {"a": 1}),
+                "time": Variable("rows", np.arange(4), {}),
+            },
+            attrs={},
+        )
+        group = sar_image.add_derived_variables(group, ["intensity"])
+
+        actual = sar_image.multilook_variables(group, looks)
+
+        assert actual["time"].dims == ["rows"]
+        if looks is None:
+            assert actual["data"].data is data
+            return
+
+        for name in ["data", "intensity"]:
+            variable = actual[name]
+            assert isinstance(variable.data, MultilookedArray)
+            assert variable.dims == ["multilooked_rows", "multilooked_columns"]
+            assert variable.shape == (2, 2)
+        assert actual["data"].attrs == {"a": 1}
+        assert actual["intensity"].data.array.quantity == "intensity"
+
+    def test_open_image_cached(self, monkeypatch):
+        path = "IMG-HH-ALOS2290760600-191011-WWDR1.5RUA"
+        cached = create_dummy_array(path="/open-image-cached", url=path, shape=(4, 6))
+
+        def dummy_read_cache(mapper, path, records_per_chunk):
+            return Group(
+                path=None,
+                url=None,
+                data={"data": Variable(["rows", "columns"], cached, {"a": 1})},
+                attrs={},
+            )
+
+        monkeypatch.setattr(caching, "read_cache", dummy_read_cache)
+
+        mapper = fsspec.get_mapper("memory://open-image-cached")
+        chunk_cache = ChunkCache("1MB")
+        actual = sar_image.open_image(
+            mapper,
+            path,
+            records_per_chunk=2,
+            columns_per_chunk=3,
+            chunk_cache=chunk_cache,
+            max_gap="1kB",
+            decode_threshold=False,
+            readahead=2,
+        )
+
+        data = actual["data"].data
+        assert data is not cached
+        assert actual["data"].attrs == {"a": 1}
+        assert data.columns_per_chunk == 3
+        assert data.chunk_cache is chunk_cache
+        assert data.max_gap == 1000
+        assert data.decode_threshold is False
+        assert data.readahead.n_chunks == 2
+        assert not data.memmap
+
+    def test_open_image_cached_memmap_remote(self, monkeypatch):
+        path = "IMG-HH-ALOS2290760600-191011-WWDR1.5RUA"
+        cached = create_dummy_array(path="/open-image-cached", url=path, shape=(4, 6))
+
+        def dummy_read_cache(mapper, path, records_per_chunk):
+            return Group(
+                path=None,
+                url=None,
+                data={"data": Variable(["rows", "columns"], cached, {})},
+                attrs={},
+            )
+
+        monkeypatch.setattr(caching, "read_cache", dummy_read_cache)
+
+        mapper = fsspec.get_mapper("memory://open-image-cached")
+        with pytest.raises(ValueError, match="can only map local files"):
+            sar_image.open_image(mapper, path, records_per_chunk=2, memmap=True)
+
+    def test_open_image_cached_without_fill_counts(self, monkeypatch):
+        path = "IMG-HH-ALOS2290760600-191011-WWDR1.5RUA"
+        cached = create_dummy_array(path="/open-image-cached", url=path, shape=(4, 6))
+
+        def dummy_read_cache(mapper, path, records_per_chunk):
+            return Group(
+                path=None,
+                url=None,
+                data={"data": Variable(["rows", "columns"], cached, {})},
+                attrs={},
+            )
+
+        class ImageRead(Exception):
+            pass
+
+        def dummy_read_image_metadata(*args, **kwargs):
+            raise ImageRead()
+
+        monkeypatch.setattr(caching, "read_cache", dummy_read_cache)
+        monkeypatch.setattr(sar_image, "read_image_metadata", dummy_read_image_metadata)
+
+        mapper = fsspec.get_mapper("memory://open-image-cached")
+        with pytest.raises(ImageRead):
+            sar_image.open_image(mapper, path, records_per_chunk=2, metadata="lazy", crop_fill=True)
+
+    @pytest.mark.parametrize(
+        ["kwargs", "expected"],
+        (
+            pytest.param({"metadata": "full"}, "unknown metadata mode", id="unknown_mode"),
+            pytest.param(
+                {"metadata": "none", "create_cache": True},
+                "can only create cache files",
+                id="create_cache",
+            ),
+            pytest.param(
+                {"metadata": "lazy", "block_cache": True},
+                "can only fill the block cache",
+                id="block_cache-lazy",
+            ),
+            pytest.param(
+                {"prefix_only": True, "block_cache": True},
+                "can only fill the block cache",
+                id="block_cache-prefix_only",
+            ),
+            pytest.param(
+                {"derived": ["intensity", "coherence"]},
+                "unknown derived quantities: 'coherence'",
+                id="derived-unknown",
+            ),
+            pytest.param({"multilook": (2, 0)}, "invalid number of looks", id="multilook"),
+            pytest.param(
+                {"metadata": "none", "crop_fill": True},
+                "requires the line metadata",
+                id="crop_fill-no_metadata",
+            ),
+            pytest.param(
+                {"calibrated": ["gamma0"]},
+                "unknown calibrated quantities: 'gamma0'",
+                id="calibrated-unknown",
+            ),
+            pytest.param(
+                {"calibrated": ["sigma0"]},
+                "require the calibration",
+                id="calibrated-no_calibration",
+            ),
+        ),
+    )
+    def test_open_image_invalid(self, kwargs, expected):
+        mapper = fsspec.get_mapper("memory://")
+
+        with pytest.raises(ValueError, match=expected):
+            sar_image.open_image(mapper, "IMG-HH-ALOS2290760600-191011-WWDR1.5RUA", **kwargs)
+
+    def test_open_image_without_metadata(self, monkeypatch):
+        header = {
+            "preamble": {},
+            "number_of_sar_data_records": 3,
+            "sar_data_record_length": 210,
+            "record_data_in_the_file": {"number_of_bytes_of_prefix_data_per_record": 192},
+            "prefix_suffix_data_locators": {"sar_data_format_type_code": "IU2"},
+            "sar_related_data_in_the_record": {
+                "number_of_lines_per_dataset": 3,
+                "number_of_data_groups_per_line": 9,
+            },
+        }
+        path = "IMG-HH-ALOS2290760600-191011-WWDR1.5RUA"
+
+        mapper = fsspec.get_mapper("memory://image-without-metadata")
+        mapper[path] = b"\x00" * 720
+
+        def dummy_read_file_descriptor(f):
+            f.read(720)
+
+            return header
+
+        monkeypatch.setattr(sar_image, "read_file_descriptor", dummy_read_file_descriptor)
+
+        actual = sar_image.open_image(
+            mapper, path, use_cache=False, records_per_chunk=2, metadata="none"
+        )
+
+        assert list(actual.variables) == ["data"]
+        assert actual.attrs == {"coordinates": []}
+        assert actual["data"].data.byte_ranges == [(912, 930), (1122, 1140), (1332, 1350)]
+        assert actual["data"].data.shape == (3, 9)
+
+    def test_open_image_auto_records_per_chunk(self, monkeypatch):
+        header = {
+            "preamble": {},
+            "number_of_sar_data_records": 3,
+            "sar_data_record_length": 210,
+            "record_data_in_the_file": {"number_of_bytes_of_prefix_data_per_record": 192},
+            "prefix_suffix_data_locators": {"sar_data_format_type_code": "IU2"},
+            "sar_related_data_in_the_record": {
+                "number_of_lines_per_dataset": 3,
+                "number_of_data_groups_per_line": 9,
+            },
+        }
+        path = "IMG-HH-ALOS2290760600-191011-WWDR1.5RUA"
+
+        mapper = fsspec.get_mapper("memory://image-auto-records-per-chunk")
+        mapper[path] = b"\x00" * 720
+
+        def dummy_read_file_descriptor(f):
+            f.read(720)
+
+            return header
+
+        probes = []
+
+        def dummy_probe_records_per_chunk(fs, url, offset, record_size, n_records):
+            probes.append((url, offset, record_size, n_records))
+
+            return 2
+
+        monkeypatch.setattr(sar_image, "read_file_descriptor", dummy_read_file_descriptor)
+        monkeypatch.setattr(sar_image, "probe_records_per_chunk", dummy_probe_records_per_chunk)
+
+        actual = sar_image.open_image(
+            mapper, path, use_cache=False, records_per_chunk="auto", metadata="none"
+        )
+
+        assert probes == [(path, 720, 210, 3)]
+        assert actual["data"].data.records_per_chunk == 2
+        assert actual["data"].attrs == {"records_per_chunk": 2}
+
+    @pytest.mark.parametrize(
+        ["dtype", "record_type", "record_length"],
+        (
+            pytest.param(processed_data_dtype, 11, 210, id="processed_data"),
+            pytest.param(signal_data_dtype, 10, 560, id="signal_data"),
+        ),
+    )
+    def test_open_image_lazy_metadata(self, monkeypatch, dtype, record_type, record_length):
+        n_records = 5
+        header = {
+            "preamble": {},
+            "number_of_sar_data_records": n_records,
+            "sar_data_record_length": record_length,
+            "record_data_in_the_file": {
+                "number_of_bytes_of_prefix_data_per_record": dtype.itemsize
+            },
+            "prefix_suffix_data_locators": {"sar_data_format_type_code": "IU2"},
+            "sar_related_data_in_the_record": {
+                "number_of_lines_per_dataset": n_records,
+                "number_of_data_groups_per_line": (record_length - dtype.itemsize) // 2,
+            },
+        }
+        overrides = (
+            {"sensor_acquisition_date_microseconds": np.arange(n_records) * 1000}
+            if "sensor_acquisition_date_microseconds" in dtype.names
+            else {}
+        )
+        path = "IMG-HH-ALOS2290760600-191011-WWDR1.5RUA"
+
+        mapper = fsspec.get_mapper(f"memory://image-lazy-{record_type}")
+        mapper[path] = b"\x00" * 720 + create_dummy_records(
+            dtype, record_type, n_records, record_length, overrides=overrides
+        )
+
+        def dummy_read_file_descriptor(f):
+            f.read(720)
+
+            return header
+
+        monkeypatch.setattr(io, "read_file_descriptor", dummy_read_file_descriptor)
+        monkeypatch.setattr(sar_image, "read_file_descriptor", dummy_read_file_descriptor)
+
+        eager = sar_image.open_image(mapper, path, use_cache=False, records_per_chunk=2)
+        lazy = sar_image.open_image(
+            mapper, path, use_cache=False, records_per_chunk=2, metadata="lazy"
+        )
+
+        assert lazy.attrs == eager.attrs
+        assert list(lazy.variables) == list(eager.variables)
+        assert lazy["data"] == eager["data"]
+        np.testing.assert_equal(lazy["rows"].data, eager["rows"].data)
+        for name, var in lazy.variables.items():
+            if name in ("data", "rows"):
+                continue
+
+            assert isinstance(var.data, FieldArray)
+            assert var.dtype == eager[name].dtype
+            assert var.attrs == eager[name].attrs
+            np.testing.assert_equal(var.data[(slice(None),)], eager[name].data)
+            np.testing.assert_equal(var.data[(slice(None, None, -2),)], eager[name].data[::-2])
+            np.testing.assert_equal(var.data[(3,)], eager[name].data[3])
+
+    def test_open_image_block_cache(self, monkeypatch, tmp_path):
+        n_records = 5
+        record_length = 210
+        header = {
+            "preamble": {},
+            "number_of_sar_data_records": n_records,
+            "sar_data_record_length": record_length,
+            "record_data_in_the_file": {"number_of_bytes_of_prefix_data_per_record": 192},
+            "prefix_suffix_data_locators": {"sar_data_format_type_code": "IU2"},
+            "sar_related_data_in_the_record": {
+                "number_of_lines_per_dataset": n_records,
+                "number_of_data_groups_per_line": 9,
+            },
+        }
+        path = "IMG-HH-ALOS2290760600-191011-WWDR1.5RUA"
+
+        mapper = fsspec.get_mapper("memory://image-block-cache")
+        mapper[path] = b"\x00" * 720 + create_dummy_records(
+            processed_data_dtype, 11, n_records, record_length
+        )
+
+        def dummy_read_file_descriptor(f):
+            f.read(720)
+
+            return header
+
+        monkeypatch.setattr(io, "read_file_descriptor", dummy_read_file_descriptor)
+
+        expected = sar_image.open_image(mapper, path, use_cache=False, records_per_chunk=2)
+        actual = sar_image.open_image(
+            mapper, path, use_cache=False, records_per_chunk=2, block_cache=tmp_path
+        )
+
+        assert len(list(tmp_path.glob("*/*.block"))) == 3
+
+        indexers = (slice(None), slice(None))
+        expected_data = expected["data"].data[indexers]
+
+        # the image data must not be requested again
+        del mapper[path]
+
+        np.testing.assert_equal(actual["data"].data[indexers], expected_data)
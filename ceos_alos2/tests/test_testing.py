@@ -2,6 +2,7 @@ import numpy as np
 import pytest
 
 from ceos_alos2 import testing
+from ceos_alos2.array import MultilookedArray, ValidityMask
 from ceos_alos2.hierarchy import Group, Variable
 from ceos_alos2.tests.utils import create_dummy_array
 
@@ -47,6 +48,19 @@ def test_format_item(item, expected):
                 ["Array(shape=(4, 3), dtype=int16, rpc=2)", "    url: memory:///path/to/file"]
             ),
         ),
+        (
+            MultilookedArray(create_dummy_array(shape=(4, 3)), looks=(2, 1)),
+            "\n".join(
+                [
+                    "MultilookedArray(shape=(2, 3), dtype=float32, looks=(2, 1))",
+                    "    url: memory:///path/to/file",
+                ]
+            ),
+        ),
+        (
+            ValidityMask(create_dummy_array(shape=(4, 3))),
+            "\n".join(["ValidityMask(shape=(4, 3))", "    url: memory:///path/to/file"]),
+        ),
     ),
 )
 def test_format_array(arr, expected):
@@ -0,0 +1,95 @@
+import fsspec
+import pytest
+from fsspec.implementations.dirfs import DirFileSystem
+
+from ceos_alos2 import tuning
+
+
+@pytest.mark.parametrize(
+    ["small", "large", "expected"],
+    (
+        pytest.param((1000, 0.011), (101000, 0.111), (0.01, 1e6), id="exact"),
+        pytest.param((1000, 0.001), (101000, 0.0005), (0.001, 1e14), id="noisy"),
+    ),
+)
+def test_estimate_throughput(small, large, expected):
+    latency, bandwidth = tuning.estimate_throughput(small, large)
+
+    assert latency == pytest.approx(expected[0])
+    assert bandwidth == pytest.approx(expected[1], rel=1e-3)
+
+
+@pytest.mark.parametrize(
+    ["latency", "bandwidth", "n_records", "expected"],
+    (
+        pytest.param(0.05, 100e6, 100000, 45000, id="remote"),
+        pytest.param(1e-5, 5e9, 100000, 16 * 2**20 // 1000, id="local"),
+        pytest.param(1.0, 1e9, 10**6, 256 * 2**20 // 1000, id="high_latency"),
+        pytest.param(0.05, 100e6, 100, 100, id="few_records"),
+    ),
+)
+def test_choose_records_per_chunk(latency, bandwidth, n_records, expected):
+    actual = tuning.choose_records_per_chunk(latency, bandwidth, 1000, n_records)
+
+    assert actual == pytest.approx(expected, abs=1)
+
+
+def test_probe_records_per_chunk(monkeypatch, caplog):
+    fs = DirFileSystem(fs=fsspec.filesystem("memory"), path="/probe")
+    fs.pipe("image", b"\x00" * (720 + 4 * 1000))
+
+    reads = []
+
+    def dummy_time_read(fs, url, start, stop, repeats=2):
+        reads.append((start, stop))
+
+        # 10 ms latency, 1 MB/s
+        return 0.01 + (stop - start) / 1e6
+
+    monkeypatch.setattr(tuning, "time_read", dummy_time_read)
+
+    with caplog.at_level("INFO", logger="ceos_alos2.tuning"):
+        actual = tuning.probe_records_per_chunk(
+            fs, "image", offset=720, record_size=1000, n_records=4
+        )
+
+    assert reads == [(720, 1720), (720, 4720)]
+    assert actual == 4
+    assert "4 records per chunk" in caplog.text
+
+
+@pytest.mark.parametrize(
+    ["record_size", "n_records", "expected"],
+    (
+        pytest.param(1000, 1, 1, id="single_record"),
+        pytest.param(16 * 2**20, 3, 1, id="large_records"),
+    ),
+)
+def test_probe_records_per_chunk_single_record(monkeypatch, record_size, n_records, expected):
+    reads = []
+
+    def dummy_time_read(fs, url, start, stop, repeats=2):
+        reads.append((start, stop))
+
+        return 0.01
+
+    monkeypatch.setattr(tuning, "time_read", dummy_time_read)
+
+    actual = tuning.probe_records_per_chunk(
+        None, "image", offset=720, record_size=record_size, n_records=n_records
+    )
+
+    assert reads == []
+    assert actual == expected
+
+
+def test_estimate_throughput_same_sizes():
+    with pytest.raises(ValueError, match="has to be larger"):
+        tuning.estimate_throughput((1000, 0.01), (1000, 0.02))
+
+
+def test_time_read():
+    fs = DirFileSystem(fs=fsspec.filesystem("memory"), path="/time-read")
+    fs.pipe("image", b"\x00" * 100)
+
+    assert tuning.time_read(fs, "image", 10, 20) >= 0
@@ -1,9 +1,16 @@
+import asyncio
+import threading
+from concurrent.futures import ThreadPoolExecutor
+
+import fsspec
 import numpy as np
 import pytest
 import xarray as xr
-from xarray.core.indexing import BasicIndexer, VectorizedIndexer
+from fsspec.implementations.dirfs import DirFileSystem
+from xarray.core.indexing import BasicIndexer, OuterIndexer, VectorizedIndexer
 
 from ceos_alos2 import xarray
+from ceos_alos2.array import Array, ChunkCache, MultilookedArray, Readahead
 from ceos_alos2.hierarchy import Group, Variable
 from ceos_alos2.tests.utils import create_dummy_array
 
@@ -39,6 +46,163 @@ class TestLazilyIndexedWrapper:
 
         np.testing.assert_equal(actual, expected)
 
+    @pytest.mark.parametrize(
+        ["indexer", "expected_key"],
+        (
+            pytest.param(
+                OuterIndexer((np.array([3, 0, 2]), slice(None))),
+                (np.array([0, 2, 3]), slice(None)),
+                id="outer",
+            ),
+            pytest.param(
+                VectorizedIndexer((np.array([[3, 0], [3, 1]]), np.array([[1, 2], [0, 2]]))),
+                (np.array([0, 1, 3]), np.array([0, 1, 2])),
+                id="vectorized",
+            ),
+        ),
+    )
+    def test_getitem_pushdown(self, indexer, expected_key):
+        fs = DirFileSystem(fs=fsspec.filesystem("memory"), path="/indexing-pushdown")
+        data = np.arange(12, dtype="uint16").reshape(4, 3)
+        fs.pipe("image", data.astype(">u2").tobytes())
+        arr = Array(
+            fs=fs,
+            url="image",
+            byte_ranges=[(index * 6, (index + 1) * 6) for index in range(4)],
+            shape=data.shape,
+            dtype=data.dtype,
+            type_code="IU2",
+            records_per_chunk=2,
+        )
+
+        keys = []
+
+        class Recorder:
+            shape = arr.shape
+            dtype = arr.dtype
+
+            def __getitem__(self, key):
+                keys.append(key)
+                return arr[key]
+
+        wrapped = xarray.LazilyIndexedWrapper(Recorder(), xarray.SerializableLock())
+
+        actual = wrapped[indexer]
+
+        np.testing.assert_equal(actual, data[indexer.tuple])
+        assert len(keys) == 1
+        for actual_key, expected_key_ in zip(keys[0], expected_key):
+            np.testing.assert_equal(actual_key, expected_key_)
+
+    def test_async_getitem(self):
+        fs = DirFileSystem(fs=fsspec.filesystem("memory"), path="/async-getitem")
+        data = np.arange(12, dtype="uint16").reshape(4, 3)
+        fs.pipe("image", data.astype(">u2").tobytes())
+        arr = Array(
+            fs=fs,
+            url="image",
+            byte_ranges=[(index * 6, (index + 1) * 6) for index in range(4)],
+            shape=data.shape,
+            dtype=data.dtype,
+            type_code="IU2",
+            records_per_chunk=2,
+        )
+        wrapped = xarray.LazilyIndexedWrapper(arr, xarray.SerializableLock())
+        indexer = VectorizedIndexer((np.array([3, 0]), np.array([1, 2])))
+
+        actual = asyncio.run(wrapped.async_getitem(indexer))
+
+        np.testing.assert_equal(actual, data[indexer.tuple])
+
+    @pytest.mark.parametrize(
+        ["lock", "expected"],
+        (
+            pytest.param(None, True, id="no_lock"),
+            pytest.param(xarray.SerializableLock(), False, id="lock"),
+        ),
+    )
+    def test_getitem_concurrent(self, lock, expected):
+        n_threads = 4
+        barrier = threading.Barrier(n_threads, timeout=1)
+
+        class Waiting:
+            shape = (4, 3)
+            dtype = np.dtype("int64")
+
+            def __getitem__(self, key):
+                # only passes if all threads are reading at the same time
+                barrier.wait()
+                return np.zeros(self.shape)[key]
+
+        wrapped = xarray.LazilyIndexedWrapper(Waiting(), lock)
+
+        def read(_):
+            try:
+                wrapped[BasicIndexer((slice(None), slice(None)))]
+            except threading.BrokenBarrierError:
+                return False
+
+            return True
+
+        with ThreadPoolExecutor(max_workers=n_threads) as executor:
+            results = list(executor.map(read, range(n_threads)))
+
+        assert all(results) == expected
+
+    @pytest.mark.parametrize(
+        "options",
+        (
+            pytest.param({"memmap": False}, id="requests"),
+            pytest.param({"memmap": True}, id="memmap"),
+            pytest.param({"memmap": False, "chunk_cache": "1kB"}, id="chunk_cache"),
+            pytest.param({"memmap": False, "readahead": 2}, id="readahead"),
+        ),
+    )
+    def test_getitem_threaded_stress(self, tmp_path, options):
+        n_rows, n_columns = 64, 24
+        data = np.arange(n_rows * n_columns, dtype="uint16").reshape(n_rows, n_columns)
+        encoded = data.astype(">u2").tobytes()
+        record_size = n_columns * 2 + 10
+        (tmp_path / "image").write_bytes(
+            b"".join(
+                b"\x00" * 10 + encoded[i * n_columns * 2 : (i + 1) * n_columns * 2]
+                for i in range(n_rows)
+            )
+        )
+
+        fs = DirFileSystem(fs=fsspec.filesystem("file"), path=str(tmp_path))
+        arr = Array(
+            fs=fs,
+            url="image",
+            byte_ranges=[(i * record_size + 10, (i + 1) * record_size) for i in range(n_rows)],
+            shape=data.shape,
+            dtype=data.dtype,
+            type_code="IU2",
+            records_per_chunk=8,
+            chunk_cache=ChunkCache.from_option(options.get("chunk_cache")),
+            readahead=Readahead.from_option(options.get("readahead")),
+            memmap=options["memmap"],
+        )
+        var = xarray.to_variable(Variable(["rows", "columns"], arr, {}))
+
+        rng = np.random.default_rng(seed=0)
+        selections = []
+        for _ in range(200):
+            start = int(rng.integers(0, n_rows - 1))
+            stop = int(rng.integers(start + 1, n_rows + 1))
+            columns = np.sort(rng.choice(n_columns, size=5, replace=False))
+            selections.append({"rows": slice(start, stop), "columns": columns})
+
+        def read(selection):
+            return var[selection].values
+
+        with ThreadPoolExecutor(max_workers=16) as executor:
+            results = list(executor.map(read, selections))
+
+        for selection, actual in zip(selections, results):
+            expected = data[selection["rows"]][:, selection["columns"]]
+            np.testing.assert_equal(actual, expected)
+
 
 @pytest.mark.parametrize(
     ["var", "expected"],
@@ -54,6 +218,15 @@ class TestLazilyIndexedWrapper:
             {"preferred_chunksizes": {"a": 1, "b": 3}},
             id="array-chunks2d",
         ),
+        pytest.param(
+            Variable(
+                ["a", "b"],
+                create_dummy_array(shape=(4, 3), records_per_chunk=1, columns_per_chunk=2),
+                {},
+            ),
+            {"preferred_chunksizes": {"a": 1, "b": 2}},
+            id="array-chunks2d-columns",
+        ),
     ),
 )
 def test_extract_encoding(var, expected):
@@ -91,6 +264,11 @@ def test_decode_coords(ds, expected):
     (
         pytest.param(Variable("x", np.array([1, 2], dtype="int8"), {"a": 1}), True, id="in_memory"),
         pytest.param(Variable(["x", "y"], create_dummy_array(), {"b": 3}), False, id="lazy"),
+        pytest.param(
+            Variable(["x", "y"], MultilookedArray(create_dummy_array(), looks=(2, 1)), {}),
+            False,
+            id="lazy-multilooked",
+        ),
     ),
 )
 def test_to_variable(var, expected):
@@ -101,6 +279,23 @@ def test_to_variable(var, expected):
     assert var.attrs == actual.attrs
 
 
+@pytest.mark.parametrize(
+    ["lock", "expected"],
+    (
+        pytest.param(None, type(None), id="none"),
+        pytest.param(False, type(None), id="false"),
+        pytest.param(True, xarray.SerializableLock, id="true"),
+        pytest.param(threading.Lock(), type(threading.Lock()), id="lock"),
+    ),
+)
+def test_normalize_lock(lock, expected):
+    actual = xarray.normalize_lock(lock)
+
+    assert isinstance(actual, expected)
+    if lock not in (None, False, True):
+        assert actual is lock
+
+
 @pytest.mark.parametrize("chunks", [None, {}, {"x": 1, "y": 2}])
 @pytest.mark.parametrize(
     ["group", "expected"],
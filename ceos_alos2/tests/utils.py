@@ -1,4 +1,5 @@
 import fsspec
+import numpy as np
 
 from ceos_alos2.array import Array
 
@@ -12,6 +13,7 @@ def create_dummy_array(
     shape=(4, 3),
     dtype="int16",
     records_per_chunk=2,
+    columns_per_chunk=None,
     type_code="IU2",
 ):
     if byte_ranges is None:
@@ -28,4 +30,30 @@ def create_dummy_array(
         dtype=dtype,
         type_code=type_code,
         records_per_chunk=records_per_chunk,
+        columns_per_chunk=columns_per_chunk,
     )
+
+
+def create_dummy_records(dtype, record_type, n_records, record_length, seed=0, overrides={}):
+    rng = np.random.default_rng(seed)
+
+    raw = rng.integers(0, 256, size=(n_records, record_length), dtype="uint8")
+    records = raw[:, : dtype.itemsize].copy().view(dtype)[:, 0]
+
+    records["preamble"]["record_sequence_number"] = np.arange(n_records) + 2
+    records["preamble"]["first_record_subtype"] = 50
+    records["preamble"]["record_type"] = record_type
+    records["preamble"]["second_record_subtype"] = 18
+    records["preamble"]["third_record_subtype"] = 20
+    records["preamble"]["record_length"] = record_length
+    records["sar_image_data_line_number"] = np.arange(n_records) + 1
+    records["sensor_acquisition_date"]["year"] = 2020
+    records["sensor_acquisition_date"]["day_of_year"] = rng.integers(1, 366, size=n_records)
+    records["sensor_acquisition_date"]["milliseconds"] = rng.integers(0, 86_400_000, size=n_records)
+
+    for name, values in overrides.items():
+        records[name] = values
+
+    raw[:, : dtype.itemsize] = records[:, None].view("uint8")
+
+    return raw.tobytes()
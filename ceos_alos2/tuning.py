@@ -0,0 +1,100 @@
+import logging
+import time
+
+logger = logging.getLogger(__name__)
+
+# fraction of the time per chunk that may be spent waiting for the request
+default_latency_fraction = 0.1
+# bounds of the chunk size in bytes
+default_min_chunksize = 16 * 2**20
+default_max_chunksize = 256 * 2**20
+
+# size of the large probe read in bytes
+probe_size = 8 * 2**20
+
+
+def time_read(fs, url, start, stop, repeats=2):
+    """time reading a byte range, returning the fastest of the repeated reads"""
+
+    def measure():
+        before = time.perf_counter()
+        fs.cat_file(url, start=start, end=stop)
+        return time.perf_counter() - before
+
+    return min(measure() for _ in range(repeats))
+
+
+def estimate_throughput(small, large):
+    """estimate latency and bandwidth from the timings of a small and a large read
+
+    Both timings are given as ``(size, duration)``, assuming that the duration
+    of a read is the latency plus the size divided by the bandwidth.
+    """
+    (small_size, small_duration), (large_size, large_duration) = small, large
+    if large_size <= small_size:
+        raise ValueError(
+            f"the large read ({large_size} bytes) has to be larger than the small read"
+        )
+
+    # guard against timing noise, where the larger read is not slower
+    transfer_duration = max(large_duration - small_duration, 1e-9)
+    bandwidth = (large_size - small_size) / transfer_duration
+    latency = max(small_duration - small_size / bandwidth, 0.0)
+
+    return latency, bandwidth
+
+
+def choose_records_per_chunk(
+    latency,
+    bandwidth,
+    record_size,
+    n_records,
+    *,
+    latency_fraction=default_latency_fraction,
+    min_chunksize=default_min_chunksize,
+    max_chunksize=default_max_chunksize,
+):
+    """choose the number of records per chunk
+
+    The chunks are large enough that the latency of a request is at most
+    ``latency_fraction`` of the time to read the chunk, limited to chunk
+    sizes between ``min_chunksize`` and ``max_chunksize`` bytes.
+    """
+    chunksize = latency * bandwidth * (1 - latency_fraction) / latency_fraction
+    chunksize = min(max(chunksize, min_chunksize), max_chunksize)
+
+    return min(max(int(chunksize // record_size), 1), n_records)
+
+
+def probe_records_per_chunk(fs, url, offset, record_size, n_records):
+    """determine the number of records per chunk by timing reads of the image data
+
+    The reads start at ``offset`` and are limited to the records.
+    """
+    total_size = record_size * n_records
+    large_size = min(probe_size, total_size)
+    if large_size <= record_size:
+        # no read larger than a single record is possible, so use the smallest chunks
+        records_per_chunk = choose_records_per_chunk(0, 0, record_size, n_records)
+        logger.info(
+            "%s: cannot probe with a single record, using %d records per chunk",
+            url,
+            records_per_chunk,
+        )
+
+        return records_per_chunk
+
+    small = (record_size, time_read(fs, url, offset, offset + record_size))
+    large = (large_size, time_read(fs, url, offset, offset + large_size))
+
+    latency, bandwidth = estimate_throughput(small, large)
+    records_per_chunk = choose_records_per_chunk(latency, bandwidth, record_size, n_records)
+    logger.info(
+        "%s: measured a latency of %.1f ms and a bandwidth of %.1f MB/s, using %d records per chunk",
+        url,
+        latency * 1e3,
+        bandwidth / 1e6,
+        records_per_chunk,
+    )
+
+    return records_per_chunk
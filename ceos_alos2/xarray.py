@@ -1,3 +1,5 @@
+import asyncio
+
 import numpy as np
 import numpy.typing
 import xarray as xr
@@ -6,11 +8,11 @@ from xarray.backends.locks import SerializableLock
 from xarray.core import indexing
 
 from ceos_alos2 import io
-from ceos_alos2.array import Array
+from ceos_alos2.array import lazy_array_types
 
 
 class LazilyIndexedWrapper(BackendArray):
-    def __init__(self, array, lock):
+    def __init__(self, array, lock=None):
         self.array = array
         self.lock = lock
         self.shape = array.shape
@@ -20,14 +22,32 @@ class LazilyIndexedWrapper(BackendArray):
         return indexing.explicit_indexing_adapter(
             key,
             self.shape,
-            indexing.IndexingSupport.BASIC,
+            indexing.IndexingSupport.OUTER,
             self._raw_indexing_method,
         )
 
+    async def async_getitem(self, key: indexing.ExplicitIndexer) -> np.typing.ArrayLike:
+        return await indexing.async_explicit_indexing_adapter(
+            key,
+            self.shape,
+            indexing.IndexingSupport.OUTER,
+            self._async_raw_indexing_method,
+        )
+
     def _raw_indexing_method(self, key: tuple) -> np.typing.ArrayLike:
+        if self.lock is None:
+            # reads don't share state, so they can run concurrently
+            return self.array[key]
+
         with self.lock:
             return self.array[key]
 
+    async def _async_raw_indexing_method(self, key: tuple) -> np.typing.ArrayLike:
+        if not hasattr(self.array, "async_read"):
+            return await asyncio.to_thread(self._raw_indexing_method, key)
+
+        return await self.array.async_read(key)
+
 
 def extract_encoding(var):
     chunks = var.chunks
@@ -43,12 +63,18 @@ def extract_encoding(var):
     return {"preferred_chunksizes": normalized_chunks}
 
 
-def to_variable(var):
-    # only need a read lock, we don't support writing
-    # TODO: do we even need the lock?
-    if isinstance(var.data, Array):
-        lock = SerializableLock()
-        data = indexing.LazilyIndexedArray(LazilyIndexedWrapper(var.data, lock))
+def normalize_lock(lock):
+    if lock in (None, False):
+        return None
+    elif lock is True:
+        return SerializableLock()
+
+    return lock
+
+
+def to_variable(var, lock=None):
+    if isinstance(var.data, lazy_array_types):
+        data = indexing.LazilyIndexedArray(LazilyIndexedWrapper(var.data, normalize_lock(lock)))
     else:
         data = var.data
 
@@ -61,8 +87,8 @@ def decode_coords(ds):
     return ds.set_coords(coords)
 
 
-def to_dataset(group, chunks=None):
-    variables = {name: to_variable(var) for name, var in group.variables.items()}
+def to_dataset(group, chunks=None, lock=None):
+    variables = {name: to_variable(var, lock=lock) for name, var in group.variables.items()}
     ds = xr.Dataset(variables, attrs=group.attrs).pipe(decode_coords)
     if chunks is None:
         return ds
@@ -71,9 +97,9 @@ def to_dataset(group, chunks=None):
     return ds.chunk(filtered_chunks)
 
 
-def to_datatree(group, chunks=None):
-    mapping = {"/": to_dataset(group, chunks=chunks)} | {
-        path: to_dataset(subgroup, chunks=chunks) for path, subgroup in group.subtree
+def to_datatree(group, chunks=None, lock=None):
+    mapping = {"/": to_dataset(group, chunks=chunks, lock=lock)} | {
+        path: to_dataset(subgroup, chunks=chunks, lock=lock) for path, subgroup in group.subtree
     }
     return xr.DataTree.from_dict(mapping)
 
@@ -102,13 +128,71 @@ def open_alos2(path, chunks=None, backend_options={}):
           metadata. Default: False
         - 'records_per_chunk': The image metadata is stored line by line. In order to
           avoid sending potentially thousands of requests, read this many lines
-          at once. Default: 1024
+          at once. With ``"auto"``, the number of lines is chosen once per
+          product by timing reads of the first image file. Default: 1024
+        - 'columns_per_chunk': Split the chunks of image data along the columns,
+          either into this many columns or into chunks of this many bytes (e.g.
+          ``"64MB"``). Each chunk then only requests its part of the records.
+          Default: all columns
+        - 'metadata': How to read the per-line image metadata. With ``"eager"``,
+          all records are parsed when opening. With ``"lazy"``, each per-line
+          variable only reads its own field from the records once accessed. With
+          ``"none"``, only the file descriptor is read and the line metadata is
+          skipped. Default: "eager"
+        - 'prefix_only': When reading the image metadata eagerly, only request
+          the metadata prefix of each record instead of whole records. By
+          default, this is enabled for all but local filesystems.
+        - 'max_workers': The number of threads used to concurrently request
+          the chunks of the image metadata. With ``1``, the chunks are
+          requested one after another. Default: chosen by
+          `concurrent.futures.ThreadPoolExecutor`.
+        - 'block_cache': Write the image data of the records read while opening
+          to a local block store, and read from that store before requesting the
+          image data again. Either ``True`` to use the default location or the
+          path of the store. Requires reading whole records eagerly. Default: None
+        - 'chunk_cache': Keep decoded chunks of image data in memory, up to the
+          given number of bytes (e.g. ``"2GB"``) shared by all images. Can also
+          be a `ceos_alos2.array.ChunkCache` object. Default: None
+        - 'max_gap': When reading image data, selected records separated by
+          at most this many bytes are fetched in a single request. Default: "64kiB"
+        - 'decode_threshold': Decode image data of at least this many bytes in
+          multiple threads. ``False`` always decodes in a single thread.
+          Default: "16MiB"
+        - 'memmap': Map local image files into memory instead of reading them.
+          Takes precedence over 'chunk_cache' and 'readahead'. Default: enabled
+          for local files unless 'chunk_cache' or 'readahead' are set
+        - 'readahead': Once chunks of image data are read in row order, request
+          this many of the following chunks in background threads. Default: None
+        - 'derived': Names of quantities to compute from complex image data
+          while decoding, added next to ``data`` in the imagery groups. Any of
+          ``"intensity"``, ``"amplitude"``, and ``"phase"``. Default: None
+        - 'calibrated': Names of radiometrically calibrated quantities to add
+          next to ``data`` in the imagery groups, computed while decoding. Any
+          of ``"sigma0"`` and ``"beta0"``. Default: None
+        - 'calibration_unit': Unit of the calibrated quantities, either
+          ``"linear"`` or ``"dB"``. Default: "linear"
+        - 'multilook': Number of looks along the rows and the columns, e.g.
+          ``(2, 8)``. Replaces the image data, derived, and calibrated
+          quantities with the block averages, computed while reading. The
+          reduced variables use the ``multilooked_rows`` and
+          ``multilooked_columns`` dimensions.
+          Default: None
+        - 'crop_fill': Restrict the image data to the columns containing data
+          pixels, skip reading the fill pixels of each line, and add a lazy
+          ``valid`` mask of the data pixels. Requires the line metadata.
+          Default: False
+        - 'lock': Serialize the reads of each variable using a lock. Either
+          ``True`` to create a lock per variable, or a lock object shared by
+          all variables. By default, reads run concurrently. Default: None
 
     Returns
     -------
     tree : xarray.DataTree
         The newly created datatree.
     """
-    root = io.open(path, **backend_options)
+    options = dict(backend_options)
+    lock = options.pop("lock", None)
+
+    root = io.open(path, **options)
 
-    return to_datatree(root, chunks=chunks)
+    return to_datatree(root, chunks=chunks, lock=lock)